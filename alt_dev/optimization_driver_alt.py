@@ -17,6 +17,8 @@ import threading
 import multiprocessing
 from typing import Callable
 
+from alt_dev.task_broker import connect_broker, run_worker, candidate_from, task_id_from
+
 
 def get_best_from_cache(cache: Cache, objective: Callable) -> tuple:
     """
@@ -189,6 +191,14 @@ class OptimizationDriver():
     
     retry : initializer(bool), optional
         ``True`` if any evaluations ending in an exception should be retried on restart
+
+    broker : initializer(str), optional
+        URL of a task broker (see ``alt_dev.task_broker.connect_broker``, e.g. ``'sqlite:///shared/broker.db'``). If
+        given, parallel evaluations are leased to broker workers, which may also run on other hosts using
+        ``alt_dev.task_broker.run_worker``, instead of the local task queue
+
+    lease_time : initializer(float), optional
+        Time in seconds a broker task is leased to a worker without a heartbeat, before it is re-queued
     """
     DEFAULT_KWARGS = dict(time_limit=np.inf,  # total time limit in seconds
                           eval_limit=np.inf,  # objective evaluation limit (counts new evaluations only)
@@ -200,7 +210,9 @@ class OptimizationDriver():
                           dataframe_file='study_results.df.gz',  # filename for the driver cache dataframe file
                           csv_file='study_results.csv',  # filename for the driver cache csv file
                           scaled=True,  # True if the sample/optimizer candidates need to be scaled to problem units
-                          retry=True)  # True if any evaluations ending in an exception should be retried on restart
+                          retry=True,  # True if any evaluations ending in an exception should be retried on restart
+                          broker=None,  # task broker URL, distributes parallel evaluations to broker workers
+                          lease_time=60.)  # time in seconds a broker task is leased without a worker heartbeat
 
     def __init__(self,
                  setup: Callable,
@@ -268,6 +280,10 @@ class OptimizationDriver():
             self.tasks = multiprocessing.JoinableQueue()
             self.lock = threading.Lock()
 
+        if self.options['broker'] is not None:
+            self.init_broker_workers(num_workers)
+            return
+
         print(f"Creating {num_workers} workers")
         self.workers = [Worker(self.tasks, self.cache, self.setup)
                         for _ in range(num_workers)]
@@ -276,12 +292,83 @@ class OptimizationDriver():
         for w in self.workers:
             w.start()
 
+    def init_broker_workers(self, num_workers: int) -> None:
+        """
+        Connect to the task broker, start local broker worker processes and a thread collecting completed results from
+        the broker into the cache. Workers on other hosts connect to the same broker with
+        ``alt_dev.task_broker.run_worker``.
+
+        :param num_workers: Number of local process-independent workers, which evaluate the objective.
+        :return: None
+        """
+        url = self.options['broker']
+        self.broker = connect_broker(url)
+        self.broker.reset()
+
+        print(f"Creating {num_workers} broker workers")
+        self.workers = [multiprocessing.Process(target=run_worker,
+                                                args=(url, self.setup, None, self.options['lease_time']))
+                        for _ in range(num_workers)]
+        for w in self.workers:
+            w.start()
+
+        self.collector_stop = threading.Event()
+        self.collector = threading.Thread(target=self.collect_broker_results, daemon=True)
+        self.collector.start()
+
+    def collect_broker_results(self, poll_interval: float = 1.) -> None:
+        """
+        Move completed broker results into the cache, until the collector is stopped
+
+        :param poll_interval: time between checks for completed results [s]
+        :return: None
+        """
+        broker = connect_broker(self.options['broker'])
+        while True:
+            stopping = self.collector_stop.wait(poll_interval)
+            for task_id, result in broker.pop_results():
+                self.cache.set(candidate_from(task_id), result, tag='exception' if 'exception' in result else 'result')
+
+            if stopping:
+                break
+        broker.close()
+
+    def submit_task(self, candidate: tuple, caller: tuple) -> None:
+        """
+        Queue a candidate for evaluation by a worker, using the task broker if one is given
+
+        :param candidate: tuple of field, value pairs
+        :param caller: caller information to insert into the result dictionary
+        :return: None
+        """
+        if self.options['broker'] is not None:
+            self.broker.submit(task_id_from(candidate), caller)
+        else:
+            self.tasks.put((candidate, caller))
+
+    def cleanup_broker(self) -> None:
+        """
+        Signal broker workers to exit after their current task, then collect any remaining results
+
+        :return: None
+        """
+        self.broker.shutdown()
+        for w in self.workers:
+            w.join()
+
+        self.collector_stop.set()
+        self.collector.join()
+        self.broker.close()
+
     def cleanup_parallel(self) -> None:
         """
         Cleanup all worker processes, signal them to exit cleanly, mark any pending tasks as complete
 
         :return: None
         """
+        if self.options['broker'] is not None:
+            self.cleanup_broker()
+            return
 
         # If the driver receives a KeyboardInterrupt then the task queue needs to be emptied
         if self.force_stop:
@@ -579,7 +666,7 @@ class OptimizationDriver():
                 self.cache[candidate] = idx  # indicates waiting condition for any other thread
 
                 # Insert candidate and caller information into task queue
-                self.tasks.put((candidate, (name, eval_count)))
+                self.submit_task(candidate, (name, eval_count))
 
                 self.lock.release()
                 self.cache_info['misses'] += 1
@@ -87,6 +87,7 @@ class HybridSizingProblem():  # OptimizationProblem (unwritten base)
         """
 
         self.simulation = None
+        self.initial_state = None
         self.init_simulation = init_simulation
         self._parse_design_variables(design_variables, fixed_variables)
         self.options = self.DEFAULT_OPTIONS.copy()
@@ -270,12 +271,15 @@ class HybridSizingProblem():  # OptimizationProblem (unwritten base)
             result = {field: val for field, val in candidate}
 
             ## We are doing this because it ensures we start from a clean plant state
-            # if the simulation has been initialized, then delete
-            if self.simulation is not None:
-                del self.simulation
-
-            # Initialize (or re-initialize the simulation)
-            self.simulation = self.init_simulation()
+            # restore the initialized simulation if its state could be saved, otherwise re-initialize it
+            if self.simulation is not None and self.initial_state is not None:
+                self.simulation.restore(self.initial_state)
+            else:
+                self.simulation = self.init_simulation()
+                try:
+                    self.initial_state = self.simulation.snapshot()
+                except NotImplementedError:
+                    self.initial_state = None
 
             # Check if valid candidate, update simulation, execute simulation
             self._check_candidate(candidate)
@@ -0,0 +1,372 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from abc import abstractmethod
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def task_id_from(candidate: tuple) -> str:
+    """
+    Helper function for creating the broker task id of a design candidate
+
+    :param candidate: tuple of field, value pairs
+    :return: JSON string of the candidate
+    """
+    return json.dumps(candidate, cls=ResultEncoder)
+
+
+def candidate_from(task_id: str) -> tuple:
+    """
+    Helper function for recreating a design candidate from its broker task id
+
+    :param task_id: JSON string of the candidate, as from task_id_from
+    :return: tuple of field, value pairs
+    """
+    return tuple(tuple(pair) for pair in json.loads(task_id))
+
+
+class ResultEncoder(json.JSONEncoder):
+    """
+    JSON encoder of evaluation results, which may hold NumPy arrays and scalars (e.g., time series outputs)
+    """
+    def default(self, o):
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+
+class TaskBroker:
+    """
+    Interface of a task broker distributing objective evaluations to workers, which may run on other hosts.
+
+    Workers lease tasks for a limited time and extend their leases with heartbeats while evaluating. Tasks of workers
+    that stop sending heartbeats (e.g., the worker process or host died) are re-queued once their lease expires, up to
+    ``max_attempts`` leases per task.
+    """
+
+    @abstractmethod
+    def submit(self, task_id: str, caller: object) -> None:
+        """
+        Queues a task, ignored if the task is already queued or leased
+
+        :param task_id: task id, e.g. from task_id_from
+        :param caller: JSON serializable caller information, added to the result
+        """
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_time: float) -> Optional[tuple]:
+        """
+        Leases the oldest queued task to a worker, after re-queueing tasks with expired leases
+
+        :param worker_id: unique worker name
+        :param lease_time: time the task is leased for, unless extended by a heartbeat [s]
+        :return: tuple of (task id, caller), or None if no task is queued
+        """
+        pass
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, lease_time: float) -> None:
+        """
+        Signals that a worker is alive, extending the leases of its tasks
+
+        :param worker_id: unique worker name
+        :param lease_time: time from now the leases are extended to [s]
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, task_id: str, worker_id: str, result: dict) -> None:
+        """
+        Stores the result of a task. Results of tasks that were already completed by another worker are discarded.
+
+        :param task_id: task id
+        :param worker_id: unique worker name
+        :param result: result, JSON serializable using ResultEncoder
+        """
+        pass
+
+    @abstractmethod
+    def pop_results(self) -> list:
+        """
+        Gets and removes the results of completed tasks, including tasks that failed after ``max_attempts`` leases
+        (their result has an 'exception' key)
+
+        :return: list of (task id, result) tuples
+        """
+        pass
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        """
+        Signals all workers to exit once their current task is completed
+        """
+        pass
+
+    @abstractmethod
+    def is_shutdown(self) -> bool:
+        """
+        :return: True if workers should exit
+        """
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        """
+        Clears the state of earlier runs (tasks, results and the shutdown signal) before a new run
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Closes the connection of this process (and thread) to the broker
+        """
+        pass
+
+
+class SQLiteBroker(TaskBroker):
+    """
+    Task broker backed by a SQLite database file, used as the default so a distributed run needs no outside services.
+
+    Workers on other hosts need the database on a shared file system with working file locks. Each process and thread
+    opens its own connection, so the broker can be passed to forked or spawned worker processes and used by the
+    driver's optimizer threads.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, timeout: float = 60.) -> None:
+        """
+        :param path: database file
+        :param max_attempts: number of leases before a task is failed, e.g. because it kills its workers
+        :param timeout: time to wait for other connections to release the database lock [s]
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self._local = threading.local()
+
+        with self._transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, caller TEXT, status TEXT, worker TEXT, "
+                       "lease_expires REAL, attempts INTEGER, result TEXT, submitted REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, submitted)")
+            db.execute("CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, last_heartbeat REAL)")
+            db.execute("CREATE TABLE IF NOT EXISTS flags (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def __getstate__(self):
+        """
+        This prevents the connections from being pickled, each process connects to the database
+        """
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, 'connection', None) is None or local.pid != os.getpid():
+            local.connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            local.pid = os.getpid()
+        return local.connection
+
+    def _transaction(self):
+        """
+        :return: context manager of a transaction holding the database write lock
+        """
+        broker = self
+
+        class Transaction:
+            def __enter__(self):
+                self.db = broker._connect()
+                self.db.execute("BEGIN IMMEDIATE")
+                return self.db
+
+            def __exit__(self, exc_type, exc_value, exc_traceback):
+                self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+        return Transaction()
+
+    def submit(self, task_id: str, caller: object) -> None:
+        with self._transaction() as db:
+            db.execute("INSERT OR IGNORE INTO tasks (id, caller, status, attempts, submitted) "
+                       "VALUES (?, ?, 'queued', 0, ?)", (task_id, json.dumps(caller, cls=ResultEncoder), time.time()))
+
+    def requeue_expired(self, db: sqlite3.Connection) -> None:
+        """
+        Re-queues tasks with expired leases, or fails them after max_attempts leases
+        """
+        now = time.time()
+        failed = db.execute("SELECT id, attempts FROM tasks WHERE status = 'leased' AND lease_expires < ? "
+                            "AND attempts >= ?", (now, self.max_attempts)).fetchall()
+        for task_id, attempts in failed:
+            result = {'exception': f"Task lease expired {attempts} times without a result, "
+                                   f"workers may have died while evaluating it",
+                      'eval_time': 0.0}
+            db.execute("UPDATE tasks SET status = 'done', result = ? WHERE id = ?",
+                       (json.dumps(result, cls=ResultEncoder), task_id))
+        db.execute("UPDATE tasks SET status = 'queued', worker = NULL WHERE status = 'leased' AND lease_expires < ?",
+                   (now,))
+
+    def lease(self, worker_id: str, lease_time: float) -> Optional[tuple]:
+        with self._transaction() as db:
+            self.requeue_expired(db)
+            row = db.execute("SELECT id, caller FROM tasks WHERE status = 'queued' ORDER BY submitted LIMIT 1"
+                             ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                       "WHERE id = ?", (worker_id, time.time() + lease_time, row[0]))
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, worker_id: str, lease_time: float) -> None:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO workers (id, last_heartbeat) VALUES (?, ?)", (worker_id, now))
+            db.execute("UPDATE tasks SET lease_expires = ? WHERE status = 'leased' AND worker = ?",
+                       (now + lease_time, worker_id))
+
+    def complete(self, task_id: str, worker_id: str, result: dict) -> None:
+        result = json.dumps(result, cls=ResultEncoder)
+        with self._transaction() as db:
+            db.execute("UPDATE tasks SET status = 'done', worker = ?, result = ? WHERE id = ? AND status != 'done'",
+                       (worker_id, result, task_id))
+
+    def pop_results(self) -> list:
+        with self._transaction() as db:
+            self.requeue_expired(db)
+            rows = db.execute("SELECT id, caller, result FROM tasks WHERE status = 'done'").fetchall()
+            db.execute("DELETE FROM tasks WHERE status = 'done'")
+
+        results = []
+        for task_id, caller, result in rows:
+            result = json.loads(result)
+            result.setdefault('caller', [json.loads(caller)])
+            results.append((task_id, result))
+        return results
+
+    def worker_heartbeats(self) -> dict:
+        """
+        :return: dict of worker name: time of its last heartbeat
+        """
+        return dict(self._connect().execute("SELECT id, last_heartbeat FROM workers").fetchall())
+
+    def shutdown(self) -> None:
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO flags (name, value) VALUES ('shutdown', 1)")
+
+    def is_shutdown(self) -> bool:
+        row = self._connect().execute("SELECT value FROM flags WHERE name = 'shutdown'").fetchone()
+        return row is not None and row[0] == 1
+
+    def reset(self) -> None:
+        """
+        Clears the tasks, results, worker heartbeats and shutdown signal of earlier runs, e.g. before a new run with the
+        same database. Late results of workers still evaluating tasks of an earlier run are discarded, unless the same
+        task is submitted again.
+        """
+        with self._transaction() as db:
+            db.execute("DELETE FROM tasks")
+            db.execute("DELETE FROM workers")
+            db.execute("DELETE FROM flags WHERE name = 'shutdown'")
+
+    def close(self) -> None:
+        local = self._local
+        if getattr(local, 'connection', None) is not None and local.pid == os.getpid():
+            local.connection.close()
+        local.connection = None
+
+
+# Broker backends by URL scheme, e.g. 'sqlite:///path/to/broker.db'. Other backends (e.g. socket or message queue
+# based) can be registered here
+BROKER_BACKENDS = {'sqlite': SQLiteBroker}
+
+
+def connect_broker(url: str, **kwargs) -> TaskBroker:
+    """
+    Helper function for creating a task broker from its URL
+
+    :param url: '<backend>://<location>', e.g. 'sqlite:///path/to/broker.db' (a plain path uses the SQLite backend)
+    :param kwargs: backend options
+    :return: task broker
+    """
+    scheme, sep, location = url.partition('://')
+    if not sep:
+        scheme, location = 'sqlite', url
+    if scheme not in BROKER_BACKENDS:
+        raise ValueError(f"Unknown broker backend '{scheme}', expected one of {list(BROKER_BACKENDS.keys())}")
+    return BROKER_BACKENDS[scheme](location, **kwargs)
+
+
+def run_worker(broker_url: str,
+               setup: Callable,
+               worker_id: Optional[str] = None,
+               lease_time: float = 60.,
+               poll_interval: float = 1.) -> int:
+    """
+    Evaluates tasks leased from a broker until the broker is shut down. Run on each host contributing workers, e.g.
+    ``run_worker('sqlite:////shared/broker.db', init_problem)``.
+
+    :param broker_url: broker URL, see connect_broker
+    :param setup: function to create a new instance of the design problem
+    :param worker_id: unique worker name, defaults to '<host name>-<process id>'
+    :param lease_time: time a task is leased for without heartbeat, heartbeats are sent at a third of this [s]
+    :param poll_interval: time between checks for new tasks when none are queued [s]
+    :return: number of evaluated tasks
+    """
+    broker = connect_broker(broker_url)
+    worker_id = worker_id if worker_id is not None else f"{socket.gethostname()}-{os.getpid()}"
+    problem = setup()
+    num_tasks = 0
+
+    # Heartbeats are sent from a thread, so leases are extended while long evaluations run
+    stop = threading.Event()
+
+    def send_heartbeats():
+        heartbeat_broker = connect_broker(broker_url)
+        while not stop.wait(lease_time / 3):
+            heartbeat_broker.heartbeat(worker_id, lease_time)
+        heartbeat_broker.close()
+
+    heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+    heartbeat_thread.start()
+
+    try:
+        while not broker.is_shutdown():
+            task = broker.lease(worker_id, lease_time)
+            if task is None:
+                time.sleep(poll_interval)
+                continue
+
+            task_id, caller = task
+            start_time = time.time()
+            try:
+                result = problem.evaluate_objective(candidate_from(task_id))
+            except Exception:
+                result = {'exception': traceback.format_exc()}
+            result['eval_time'] = time.time() - start_time
+            result['caller'] = [caller]
+
+            # A result that cannot be stored is reported as an exception, so the task is not leased again
+            try:
+                broker.complete(task_id, worker_id, result)
+            except (TypeError, ValueError):
+                broker.complete(task_id, worker_id, {'exception': traceback.format_exc(),
+                                                     'eval_time': result['eval_time'],
+                                                     'caller': result['caller']})
+            num_tasks += 1
+
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+        broker.close()
+
+    return num_tasks
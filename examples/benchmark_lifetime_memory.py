@@ -0,0 +1,108 @@
+"""
+Peak memory of the project lifetime time series path of a hybrid simulation
+
+Each path runs in a separate process that reports its peak resident set size (RSS):
+
+    ``lists``: lifetime series replicated as Python lists, as in earlier versions of HybridSimulation, Grid and
+    PowerSource (generation tiled and converted to lists, ``list(gen) * project_life`` for the financial models and
+    list comprehensions for the missed load and schedule curtailment)
+
+    ``arrays``: the NumPy path used by HybridSimulation.simulate_power, Grid.simulate_grid_connection and
+    PowerSource.simulate_financials
+
+Usage:
+    python examples/benchmark_lifetime_memory.py --years 30 --steps_per_hour 12
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def yearly_series(n_timesteps: int, n_technologies: int) -> tuple:
+    rng = np.random.default_rng(0)
+    generation = [rng.uniform(0, 20000, n_timesteps).tolist() for _ in range(n_technologies)]
+    schedule = rng.uniform(0, 40, n_timesteps).tolist()     # [MW]
+    return generation, schedule
+
+
+def lifetime_lists(generation: list, schedule: list, project_life: int):
+    total_gen = np.zeros(len(schedule) * project_life)
+    for gen in generation:
+        total_gen += np.tile(gen, project_life)
+    financial_gen = [list(gen) * project_life for gen in generation]
+    pre_curtailment_gen = [list(gen) * project_life for gen in generation]
+
+    lifetime_schedule = np.tile([x * 1e3 for x in schedule], project_life)
+    delivered = list(np.minimum(total_gen, lifetime_schedule))
+    missed_load = [s - g if g > 0 else s for (s, g) in zip(lifetime_schedule, delivered)]
+    schedule_curtailed = [g - s if g > s else 0. for (g, s) in zip(total_gen, lifetime_schedule)]
+    return sum(missed_load) / sum(lifetime_schedule), sum(schedule_curtailed) / sum(lifetime_schedule), \
+        len(financial_gen) + len(pre_curtailment_gen)
+
+
+def lifetime_arrays(generation: list, schedule: list, project_life: int):
+    from hybrid.power_source import lifetime_series
+    from hybrid.grid import calc_schedule_deviation
+
+    total_gen = np.zeros(len(schedule) * project_life)
+    for gen in generation:
+        gen = np.asarray(gen, dtype=float)
+        total_gen.reshape(-1, len(gen))[:] += gen
+    financial_gen = [lifetime_series(gen, project_life) for gen in generation]     # also used as pre-curtailment
+
+    lifetime_schedule = np.tile(np.asarray(schedule, dtype=float) * 1e3, project_life)
+    delivered, missed_load, schedule_curtailed = calc_schedule_deviation(total_gen, lifetime_schedule)
+    return missed_load.sum() / lifetime_schedule.sum(), schedule_curtailed.sum() / lifetime_schedule.sum(), \
+        len(financial_gen)
+
+
+def run_path(path: str, years: int, steps_per_hour: int, n_technologies: int):
+    generation, schedule = yearly_series(8760 * steps_per_hour, n_technologies)
+    baseline_mb = peak_rss_mb()
+    start = time.perf_counter()
+    lifetime = lifetime_lists if path == 'lists' else lifetime_arrays
+    missed_load_fraction, curtailed_fraction, _ = lifetime(generation, schedule, years)
+    elapsed = time.perf_counter() - start
+    print(f"{path},{baseline_mb:.1f},{peak_rss_mb():.1f},{elapsed:.2f},{missed_load_fraction:.12f},"
+          f"{curtailed_fraction:.12f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=30, help="project life [years]")
+    parser.add_argument('--steps_per_hour', type=int, default=12, help="time steps per hour")
+    parser.add_argument('--technologies', type=int, default=3, help="number of generating technologies")
+    parser.add_argument('--path', choices=('lists', 'arrays'), help="run a single path in this process")
+    args = parser.parse_args()
+
+    if args.path:
+        run_path(args.path, args.years, args.steps_per_hour, args.technologies)
+        return
+
+    print(f"{args.years} years, {args.steps_per_hour} steps per hour, {args.technologies} technologies")
+    print(f"{'path':>8} {'input RSS [MB]':>15} {'peak RSS [MB]':>14} {'time [s]':>9}")
+    results = {}
+    for path in ('lists', 'arrays'):
+        output = subprocess.run([sys.executable, __file__, '--path', path, '--years', str(args.years),
+                                 '--steps_per_hour', str(args.steps_per_hour),
+                                 '--technologies', str(args.technologies)],
+                                check=True, capture_output=True, text=True).stdout.strip().splitlines()[-1]
+        name, baseline_mb, peak_mb, elapsed, missed, curtailed = output.split(',')
+        results[name] = (float(missed), float(curtailed))
+        print(f"{name:>8} {float(baseline_mb):>15.1f} {float(peak_mb):>14.1f} {float(elapsed):>9.2f}")
+    print(f"Missed load and schedule curtailment fractions match: "
+          f"{np.allclose(results['lists'], results['arrays'], rtol=1e-9)}")
+
+
+if __name__ == '__main__':
+    main()
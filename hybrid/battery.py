@@ -9,15 +9,15 @@ from hybrid.power_source import *
 
 class BatteryOutputs:
     def __init__(self, n_timesteps):
-        """Class for storing stateful battery and dispatch outputs."""
+        """Class for storing stateful battery and dispatch outputs in preallocated arrays."""
         self.stateful_attributes = ['I', 'P', 'Q', 'SOC', 'T_batt', 'gen']
         for attr in self.stateful_attributes:
-            setattr(self, attr, [0.0]*n_timesteps)
+            setattr(self, attr, np.zeros(n_timesteps))
 
         # dispatch output storage
         dispatch_attributes = ['I', 'P', 'SOC']
         for attr in dispatch_attributes:
-            setattr(self, 'dispatch_'+attr, [0.0]*n_timesteps)
+            setattr(self, 'dispatch_'+attr, np.zeros(n_timesteps))
 
 
 class Battery(PowerSource):
@@ -25,6 +25,8 @@ class Battery(PowerSource):
     _financial_model: Singleowner.Singleowner
 
     module_specs = {'capacity': 400, 'surface_area': 30} # 400 [kWh] -> 30 [m^2]
+    # Dispatch properties read when simulating with dispatch
+    dispatch_solution_names = ('control_variable', 'power', 'current', 'soc', 'time_duration')
 
     def __init__(self,
                  site: SiteInfo,
@@ -168,34 +170,65 @@ class Battery(PowerSource):
         :param sim_start_time: Start hour of simulation horizon
         """
         # Set stateful control value [Discharging (+) + Charging (-)]
-        if self.value("control_mode") == 1.0:
-            control = [pow_MW*1e3 for pow_MW in self.dispatch.power]    # MW -> kW
-        elif self.value("control_mode") == 0.0:
-            control = [cur_MA * 1e6 for cur_MA in self.dispatch.current]    # MA -> A
+        control_mode = self._system_model.Controls.control_mode
+        if control_mode == 1.0:
+            control = np.array(self.dispatch.power[0:n_periods]) * 1e3      # MW -> kW
+        elif control_mode == 0.0:
+            control = np.array(self.dispatch.current[0:n_periods]) * 1e6    # MA -> A
         else:
             raise ValueError("Stateful battery module 'control_mode' invalid value.")
 
-        time_step_duration = self.dispatch.time_duration
-        for t in range(n_periods):
-            self.value('dt_hr', time_step_duration[t])
-            self.value(self.dispatch.control_variable, control[t])
-
-            # Only store information if passed the previous day simulations (used in clustering)
-            try:
-                index_time_step = sim_start_time + t  # Store information
-            except TypeError:
-                index_time_step = None  # Don't store information
-            self.simulate_power(time_step=index_time_step)
+        outputs = self.simulate_control_sequence(control, self.dispatch.time_duration[0:n_periods])
 
-        # Store Dispatch model values
+        # Only store information if passed the previous day simulations (used in clustering)
         if sim_start_time is not None:
             time_slice = slice(sim_start_time, sim_start_time + n_periods)
+            for attr, values in outputs.items():
+                getattr(self.Outputs, attr)[time_slice] = values
+
+            # Store Dispatch model values
             self.Outputs.dispatch_SOC[time_slice] = self.dispatch.soc[0:n_periods]
             self.Outputs.dispatch_P[time_slice] = self.dispatch.power[0:n_periods]
             self.Outputs.dispatch_I[time_slice] = self.dispatch.current[0:n_periods]
 
         # logger.info("Battery Outputs at start time {}".format(sim_start_time, self.Outputs))
 
+    def simulate_control_sequence(self, control: Sequence, time_step_duration: Sequence) -> dict:
+        """
+        Steps the stateful battery through a sequence of control values. Control and state model groups are resolved
+        once for the sequence, and outputs are written into preallocated arrays.
+
+        :param control: Control value for each time step, in units of the battery's control variable (kW or A)
+        :param time_step_duration: Duration of each time step [hr]
+
+        :returns: Dictionary of stateful output arrays, keyed by ``BatteryOutputs.stateful_attributes``
+        """
+        n_periods = len(control)
+        outputs = {attr: np.zeros(n_periods) for attr in self.Outputs.stateful_attributes}
+        if not self._system_model:
+            return outputs
+
+        controls = self._system_model.Controls
+        state = self._system_model.StatePack
+        control_variable = self.dispatch.control_variable
+        state_attributes = [attr for attr in self.Outputs.stateful_attributes if hasattr(state, attr)]
+
+        dt_hr = None
+        for t in range(n_periods):
+            # dt_hr is only changed when the time step duration changes
+            if time_step_duration[t] != dt_hr:
+                dt_hr = time_step_duration[t]
+                controls.dt_hr = dt_hr
+            setattr(controls, control_variable, control[t])
+            self._system_model.execute(0)
+
+            for attr in state_attributes:
+                outputs[attr][t] = getattr(state, attr)
+
+        if 'gen' not in state_attributes:
+            outputs['gen'][:] = outputs['P']
+        return outputs
+
     def simulate_power(self, time_step=None):
         """
         Runs battery simulate and stores values if time step is provided
@@ -215,12 +248,13 @@ class Battery(PowerSource):
 
         :param time_step: time step where outputs will be stored.
         """
+        state = self._system_model.StatePack
         for attr in self.Outputs.stateful_attributes:
-            if hasattr(self._system_model.StatePack, attr):
-                getattr(self.Outputs, attr)[time_step] = self.value(attr)
+            if hasattr(state, attr):
+                getattr(self.Outputs, attr)[time_step] = getattr(state, attr)
             else:
                 if attr == 'gen':
-                    getattr(self.Outputs, attr)[time_step] = self.value('P')
+                    getattr(self.Outputs, attr)[time_step] = state.P
 
 
     def validate_replacement_inputs(self, project_life):
@@ -275,13 +309,16 @@ class Battery(PowerSource):
         self._financial_model.value('ppa_soln_mode', 1)
 
         if len(self.Outputs.gen) == self.site.n_timesteps:
-            single_year_gen = self.Outputs.gen
-            self._financial_model.value('gen', list(single_year_gen) * project_life)
-
-            self._financial_model.value('system_pre_curtailment_kwac', list(single_year_gen) * project_life)
-            self._financial_model.value('annual_energy_pre_curtailment_ac', sum(single_year_gen))
-            self._financial_model.value('batt_annual_discharge_energy', [sum(i for i in single_year_gen if i > 0)] * project_life)
-            self._financial_model.value('batt_annual_charge_energy', [sum(i for i in single_year_gen if i < 0)] * project_life)
+            single_year_gen = np.asarray(self.Outputs.gen, dtype=float)
+            lifetime_gen = lifetime_series(single_year_gen, project_life)
+            self._financial_model.value('gen', lifetime_gen)
+
+            self._financial_model.value('system_pre_curtailment_kwac', lifetime_gen)
+            self._financial_model.value('annual_energy_pre_curtailment_ac', float(single_year_gen.sum()))
+            self._financial_model.value('batt_annual_discharge_energy',
+                                        [float(single_year_gen[single_year_gen > 0].sum())] * project_life)
+            self._financial_model.value('batt_annual_charge_energy',
+                                        [float(single_year_gen[single_year_gen < 0].sum())] * project_life)
             # Do not calculate LCOS, so skip these inputs for now by unassigning or setting to 0
             self._financial_model.unassign("battery_total_cost_lcos")
             self._financial_model.value('batt_annual_charge_from_system', (0,))
@@ -306,23 +343,19 @@ class Battery(PowerSource):
         :return: maximum feasible capacity [kWh]: list of floats
         """
         t_step = self.site.interval / 60                                                # hr
-        df = pd.DataFrame()
-        df['E_delivered'] = [max(0, x * t_step) for x in self.Outputs.P]                # [kWh]
-        df['SOC_perc'] = self.Outputs.SOC                                               # [%]
-        df['E_stored'] = df.SOC_perc / 100 * self.system_capacity_kwh                   # [kWh]
-
-        def max_feasible_kwh(row):
-            return min(self.system_capacity_kw * t_step, row.E_delivered + row.E_stored)
+        E_delivered = np.maximum(np.asarray(self.Outputs.P, dtype=float) * t_step, 0)   # [kWh]
+        SOC_perc = np.asarray(self.Outputs.SOC, dtype=float)                            # [%]
+        E_stored = SOC_perc / 100 * self.system_capacity_kwh                            # [kWh]
 
         if use_avail_storage:
-            E_max_feasible = df.apply(max_feasible_kwh, axis=1)                             # [kWh]
+            E_max_feasible = np.minimum(E_delivered + E_stored, self.system_capacity_kw * t_step)  # [kWh]
         else:
-            E_max_feasible = df['E_delivered']
+            E_max_feasible = E_delivered
 
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
-        E_max_feasible = np.minimum(E_max_feasible, W_ac_nom*t_step) 
-        
-        return list(E_max_feasible)
+        E_max_feasible = np.minimum(E_max_feasible, W_ac_nom*t_step)
+
+        return E_max_feasible.tolist()
 
     @property
     def generation_profile(self) -> Sequence:
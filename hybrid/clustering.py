@@ -2,12 +2,101 @@
 Functions for clustering weather data and electricity pricing, and calculations of full-year or Cluster-average values
 """
 
+import hashlib
+import os
+import pickle
+import tempfile
+
 import numpy as np
 import pysolar
 import datetime
 
+from hybrid.resource.resource_store import load_solar_table, file_hash
+
+
+# Clustering results in this process, keyed by the fingerprint of the clustering inputs and parameters
+_results = {}
+
+
+def clear_cached_results():
+    """Clears clustering results stored in this process"""
+    _results.clear()
+
+
+def squared_distances(data: np.ndarray, other: np.ndarray = None, max_block_size: int = 2**22) -> np.ndarray:
+    """
+    Squared Euclidean distances between data points, computed in blocks of rows to bound the memory of the
+    intermediate (rows, points, features) array
+
+    :param data: (n_obs, n_features) array of data points
+    :param other: (n_other, n_features) array of points to compute the distances to, defaults to data
+    :param max_block_size: maximum number of elements of the intermediate array per block
+    :returns: (n_obs, n_other) array of squared distances
+    """
+    other = data if other is None else other
+    n_obs = data.shape[0]
+    n_rows = max(1, int(max_block_size / max(1, other.shape[0] * data.shape[1])))
+    distsqr = np.empty((n_obs, other.shape[0]))
+    for start in range(0, n_obs, n_rows):
+        distsqr[start:start + n_rows] = ((data[start:start + n_rows, None, :] - other[None, :, :]) ** 2).sum(2)
+    return distsqr
+
+
+def compute_wcss(data: np.ndarray, cluster_index: np.ndarray, means: np.ndarray) -> float:
+    """
+    :param data: (n_obs, n_features) array of data points
+    :param cluster_index: cluster of each data point
+    :param means: (n_clusters, n_features) array of cluster means or exemplars
+    :returns: within-cluster sum-of-squares
+    """
+    n_clusters = means.shape[0]
+    wcss = 0.0
+    for k in range(n_clusters):
+        dist = ((data - means[k, :]) ** 2).sum(1)  # Distance to Cluster k centroid
+        wcss += (dist * (cluster_index == k)).sum()
+    return wcss
+
+
+def division_weights(n_pts: int, n_div: int) -> tuple:
+    """
+    Sparse weight matrix for averaging the points within a day over each of its divisions. Averages with non-integer
+    number of time points in a division are computed from weighted averages.
+
+    :param n_pts: number of time points in the averaging bounds
+    :param n_div: number of divisions
+    :returns: tuple of (points, divisions, weights), the point index within the bounds, division and weighting factor of
+        each non-empty entry in the order the weighted average is accumulated
+    """
+    n = float(n_pts) / n_div  # Number of time points per division
+    pts = []
+    divs = []
+    wts = []
+    for i in range(n_div):
+        pstart = i * n  # Start time pt
+        pend = (i + 1) * n  # End time pt
+        # Number of discrete points which are at least partially included in the time period average
+        npt = int(pend) - int(pstart) + 1
+        w = 1. / n * np.ones(npt)
+        w[0] = float(1.0 - (pstart - int(pstart))) / n  # Weighting factor for first point
+        w[npt - 1] = float(pend - int(pend)) / n  # Weighting factor for last point
+        pts.append(np.linspace(int(pstart), int(pend), npt, dtype=int))
+        divs.append(np.full(npt, i))
+        wts.append(w)
+    pts, divs, wts = [np.concatenate(x) for x in (pts, divs, wts)]
+
+    # Points outside of the allowed number of points in the day are only allowed if the weighting factor is 0
+    outside = pts == n_pts
+    for i in np.unique(divs[outside & (wts > 0.0)]):
+        print('Error calculating weighted average for division ' + str(i))
+    inside = ~outside
+    return pts[inside], divs[inside], wts[inside]
+
 
 class Clustering:
+    # Attributes calculated by run_clustering(), cached by fingerprint of all other attributes
+    result_names = ('weights', 'divisions', 'bounds', 'data', 'data_first', 'data_last', 'clusters', 'sim_start_days',
+                    'index_first', 'index_last', 'daily_resource', 'daylight_cutoffs', 'afp_preference_mult', 'afp_damping')
+    dict_result_names = ('weights', 'divisions', 'bounds', 'clusters', 'daily_resource')
 
     def __init__(self, power_sources, solar_resource_file, wind_resource_data = None, price_data =None):
         
@@ -28,7 +117,7 @@ class Clustering:
         self.bounds = {}         # Bounds ('fullday' or 'summer_daylight') to use for averaging.  Currently only defined default values are possible and will be filled in automatically
 
         # Clustering parameters
-        self.algorithm = 'affinity-propagation'  # Clustering algorithm     
+        self.algorithm = 'affinity-propagation'  # Clustering algorithm ('affinity-propagation' or 'k-medoids' for exactly n_cluster clusters)
         self.n_cluster = 20                      # Number of clusters
         self.Nmaxiter = 200                      # Maximum iterations for clustering algorithm
         self.sim_hard_partitions = True          # Use hard partitioning for simulation weighting factors?
@@ -39,6 +128,12 @@ class Clustering:
         self.afp_enforce_Ncluster = True        # Iterate on afp_preference_mult to create the number of clusters specified in n_cluster?
         self.afp_enforce_Ncluster_tol = 0       # Tolerance for number of clusters
         self.afp_enforce_Ncluster_maxiter = 50  # Maximum number of iterations
+        self.afp_warm_start = False             # Start each iteration on afp_preference_mult from the responsibility and availability matrices of the previous iteration?
+        self._afp_state = None                  # (availability, responsibility) matrices of the last affinity propagation run
+
+        # Cached results
+        self.use_cache = True   # Reuse results of clustering with the same inputs and parameters in this process?
+        self.cache_dir = ''     # Directory of results shared between processes and runs, keyed by fingerprint of the inputs and parameters ('' = no disk cache)
 
         # Results
         self.data = {}             # Classification data for complete groups (calculated in calculate_metrics())
@@ -49,6 +144,7 @@ class Clustering:
         self.index_first = -1      # Cluster index that best represents incomplete first group
         self.index_last = -1       # Cluster index that best represents incomplete last group
         self.daily_resource = {}     # Daily DNI, GHI, and wind resource (used only for CSP initial charge state heuristic)
+        self.daylight_cutoffs = ()   # Sunrise and sunset time step on the summer solstice (calculated in calculate_metrics())
 
 
 
@@ -139,18 +235,13 @@ class Clustering:
     def read_weather(self):
         weather = {k:[] for k in ['year', 'month', 'day', 'hour', 'ghi', 'dhi', 'dni', 'tdry', 'wspd']}
 
-        # Get header info
-        header = np.genfromtxt(self.solar_resource_file, delimiter = ',', dtype = 'str', skip_header = 0, max_rows = 2)
-        i = np.where(header[0,:] == 'Latitude')[0][0]
-        weather['lat' ] = float(header[1,i])
-        i = np.where(header[0,:] == 'Longitude')[0][0]
-        weather['lon'] = float(header[1,i])
-        i = np.where(header[0,:] == 'Time Zone')[0][0]
-        weather['tz'] = float(header[1,i])
-        i = np.where(header[0,:] == 'Elevation')[0][0]
-        weather['elev'] = float(header[1,i]) 
-
-        # Read in weather data
+        # Get header info and weather data, parsed once per resource file
+        table = load_solar_table(self.solar_resource_file)
+        weather['lat'] = table.meta_float('Latitude')
+        weather['lon'] = table.meta_float('Longitude')
+        weather['tz'] = table.meta_float('Time Zone')
+        weather['elev'] = table.meta_float('Elevation')
+
         labels = {'year': ['Year'],
                 'month': ['Month'],
                 'day': ['Day'],
@@ -161,16 +252,11 @@ class Clustering:
                 'tdry': ['Tdry', 'Temperature'],
                 'wspd': ['Wspd', 'Wind Speed']}
 
-        header = np.genfromtxt(self.solar_resource_file, dtype=str, delimiter=',', max_rows=1, skip_header=2)
-        data = np.genfromtxt(self.solar_resource_file, dtype=float, delimiter=',', skip_header=3)
         for k in labels.keys():
-            found = False
-            for j in labels[k]:
-                if j in header:
-                    found = True
-                    c = header.tolist().index(j)
-                    weather[k] = data[:, c]
-            if not found:
+            column = table.column(labels[k])
+            if column is not None:
+                weather[k] = column.copy()
+            else:
                 print('Failed to find data for ' + k + ' in weather file')
 
         return weather
@@ -266,11 +352,11 @@ class Clustering:
                 print ('Warning: Wind speed data for wind generation was not supplied to clustering algorithm. Using wind speed from solar resource file')
         
  
-        self.daily_resource = {k:np.zeros(365) for k in ['dni', 'ghi', 'wspd']}
-        for d in range(365):
-            self.daily_resource['dni'][d] = hourly_data['dni'][d*n_pts_day : (d+1)*n_pts_day].sum() / 1000.  # kWh/m2/day
-            self.daily_resource['ghi'][d] = hourly_data['ghi'][d*n_pts_day : (d+1)*n_pts_day].sum() / 1000.  # kWh/m2/day
-            self.daily_resource['wspd'][d] = hourly_data['wspd'][d*n_pts_day : (d+1)*n_pts_day].sum()  
+        daily_sums = {k: np.asarray(hourly_data[k][:365*n_pts_day], dtype=float).reshape(365, n_pts_day).sum(1)
+                      for k in ['dni', 'ghi', 'wspd']}
+        self.daily_resource = {'dni': daily_sums['dni'] / 1000.,  # kWh/m2/day
+                               'ghi': daily_sums['ghi'] / 1000.,  # kWh/m2/day
+                               'wspd': daily_sums['wspd']}
 
         #--- Replace dni, ghi or wind speed at all points with wind speed > stow limit
         csp_stow_wspd = None
@@ -326,91 +412,65 @@ class Clustering:
         location = {k:weather[k] for k in ['lat', 'lon', 'tz', 'elev']}
         location['year'] = int(weather['year'][0])
         sunrise_idx, sunset_idx = self.get_daylight_cutoffs(location, 172, n_per_hour, csky_cutoff = 50)
+        self.daylight_cutoffs = (sunrise_idx, sunset_idx)
         
 
         #--- Calculate daily values for classification metrics
+        day_start = np.arange(365) * n_pts_day  # First point of each day in yearly arrays
+        weight_matrices = {}  # (bounds, divisions): division weight matrix shared by metrics
         daily_metrics = {k:[] for k in self.weights.keys()}
         n_metrics = 0
         for key in self.weights.keys():
             if self.weights[key] > 0.0:  # Metric weighting factor is non-zero
                 data_name = key.split('_')[0]
                 n_div = self.divisions[key]  # Number of divisions per day
-                daily_metrics[key] = np.zeros((365, n_div))
                 if '_prev' in key or '_next' in key:
                     n_metrics += n_div  # TODO: should this *Nnext or *Nprev depending?? (This assumes 1 day for each)
                 else:
                     n_metrics += n_div * self.ndays
 
-                # Calculate average value in each division
-                # (Averages with non-integer number of time points in a division are computed from weighted averages)
                 n_pts = n_pts_day if bounds[key] == 'fullday' else sunset_idx - sunrise_idx  # Total points
                 p1 = 0 if bounds[key] == 'fullday' else sunrise_idx    # First relevant point within this day
-                n = float(n_pts) / n_div  # Number of time points per division
-                pts = []
-                wts = []
-                for i in range(n_div):
-                    pstart = i * n  # Start time pt
-                    pend = (i + 1) * n  # End time pt
-                    # Number of discrete hourly points included in the time period average
-                    npt = int(pend) - int(pstart) + 1
-                    # Discrete points which are at least partially included in the time period average
-                    pts.append(np.linspace(int(pstart), int(pend), npt, dtype=int))
-                    wts.append(1. / n * np.ones(npt))
-                    wts[i][0] = float(1.0 - (pstart - int(pstart))) / n  # Weighting factor for first point
-                    wts[i][npt - 1] = float(pend - int(pend)) / n  # Weighting factor for last point   
-
-                # Calculate metrics for each day and each division
-                for d in range(365):
-                    for i in range(n_div):
-                        for h in range(len(pts[i])):  # Loop over hours which are at least partially contained in division i
-                            if pts[i][h] == n_pts:
-                                # Hour falls outside of allowed number of hours in the day (allowed as long as weighting factor is 0)
-                                if wts[i][h] > 0.0:
-                                    print('Error calculating weighted average for key ' + key + ' and division ' + str(i))
-                            else:
-                                p = d * n_pts_day + p1 + pts[i][h]  # Point in yearly array
-                                daily_metrics[key][d, i] += (hourly_data[data_name][p] * wts[i][h])
+                if (bounds[key], n_div) not in weight_matrices:
+                    weight_matrices[(bounds[key], n_div)] = division_weights(n_pts, n_div)
+                pts, divs, wts = weight_matrices[(bounds[key], n_div)]
+
+                # Weighted average in each day and division, accumulated point by point for all days at once
+                weighted_data = np.asarray(hourly_data[data_name])[day_start[:, None] + p1 + pts] * wts  # (day, entry)
+                daily_metrics[key] = np.zeros((365, n_div))
+                np.add.at(daily_metrics[key].T, divs, weighted_data.T)
 
                 # Normalize daily metrics
                 max_metric = daily_metrics[key].max()
                 min_metric = daily_metrics[key].min()
                 daily_metrics[key] = (daily_metrics[key] - min_metric) / max(1e-6, max_metric - min_metric)
 
-
-        
-
         #--- Create arrays of classification data for groups of days
-        def get_data_for_group(d1, name):  # Get data for metric "name" for group starting on day d1
+        def get_data_for_groups(first_days, name):  # Get data for metric "name" for groups starting on first_days
             if '_prev' in name:
-                days = [d1-1]
+                offsets = [-1]
             elif '_next' in name:
-                days = [d1+self.ndays]
+                offsets = [self.ndays]
             else:
-                days = [d1+i for i in range(self.ndays)]
-            ndays = len(days)
-            ndiv = self.divisions[name]
-            data = np.zeros(ndiv*ndays)
-            for j in range(ndays):
-                d = days[j]
-                if (d >= 0) and (d < 365):
-                    data[j*ndiv:(j+1)*ndiv] = daily_metrics[name][d, :] * self.weights[name]
-                else:
-                    data[j*ndiv:(j+1)*ndiv] = -1e8  # Use a large neative value to designate metrics that don't exist for this group (all others are scaled between 0-1)
-            return data          
+                offsets = list(range(self.ndays))
+            days = np.asarray(first_days)[:, None] + offsets  # (group, day in group)
+            exists = (days >= 0) & (days < 365)
+            data = daily_metrics[name][np.clip(days, 0, 364)] * self.weights[name]  # (group, day in group, division)
+            data[~exists] = -1e8  # Use a large neative value to designate metrics that don't exist for this group (all others are scaled between 0-1)
+            return data.reshape(len(days), -1)
 
         n_group = int(((365-2) / self.ndays))            # Number of complete groups (with existing days before/after)
         self.data = np.zeros((n_group, int(n_metrics)))  # Classification data for complete groups
         self.data_first, self.data_last = [np.zeros(n_metrics) for v in range(2)]  # Classification data for incomplete groups at beginning/end of year
+        first_days = np.arange(n_group) * self.ndays + 1
         j = 0
         for k, wt in self.weights.items():
             if wt>0:
-                for g in range(n_group):
-                    d1 = g * self.ndays + 1
-                    groupdata = get_data_for_group(d1, k)
-                    n = len(groupdata)
-                    self.data[g,j:j+n] = groupdata
-                self.data_first[j:j+n] = get_data_for_group(0, k)
-                self.data_last[j:j+n] = get_data_for_group(self.ndays*n_group+1, k)
+                groupdata = get_data_for_groups(first_days, k)
+                n = groupdata.shape[1]
+                self.data[:, j:j+n] = groupdata
+                self.data_first[j:j+n] = get_data_for_groups([0], k)[0]
+                self.data_last[j:j+n] = get_data_for_groups([self.ndays*n_group+1], k)[0]
                 j+=n
 
         return 
@@ -418,8 +478,13 @@ class Clustering:
     def create_clusters(self, verbose=False):
         # Create clusters from classification data.
         # Includes iterations of affinity propagation algorithm to create desired number of clusters if specified.
-        if not self.afp_enforce_Ncluster:  # 
-            self.form_clusters_using_current_parameters()
+        self._afp_state = None
+        similarity = None  # Computed once for all iterations of affinity propagation algorithm
+        if self.algorithm == 'affinity-propagation' and self.data.shape[0] > 1:
+            similarity = -squared_distances(self.data)
+
+        if not self.afp_enforce_Ncluster or self.algorithm == 'k-medoids':  # k-medoids creates n_cluster clusters
+            self.form_clusters_using_current_parameters(similarity)
         else:
             maxiter = self.afp_enforce_Ncluster_maxiter
             Ntarget = self.n_cluster
@@ -432,10 +497,11 @@ class Clustering:
             i = 0
             finished = False
             damping_original = self.afp_damping
+            bracket = [0.0, np.inf]  # Preference multipliers creating too many and too few clusters
 
             while i < maxiter and not finished:
                 self.afp_preference_mult = mult
-                self.form_clusters_using_current_parameters()
+                self.form_clusters_using_current_parameters(similarity)
                 converged = self.clusters['converged']  # Did affinity propagation algorithm converge?  
 
                 if verbose:
@@ -469,6 +535,16 @@ class Clustering:
                         if mult_new <= 0:
                             mult_new = mult * float(self.clusters['n_cluster']) / Ntarget
 
+                        if self.afp_warm_start:
+                            # Number of clusters also depends on the solution the algorithm starts from
+                            #   -> bisect between the multipliers bracketing the target if the update leaves the bracket
+                            if Nc > Ntarget:
+                                bracket[0] = max(bracket[0], mult)
+                            else:
+                                bracket[1] = min(bracket[1], mult)
+                            if not bracket[0] < mult_new < bracket[1] and bracket[1] < np.inf:
+                                mult_new = 0.5 * (bracket[0] + bracket[1])
+
                         mult_prev = mult
                         Nc_prev = Nc
                         mult = mult_new
@@ -507,8 +583,9 @@ class Clustering:
         self.clusters = clusters_sorted
         return 
 
-    def form_clusters_using_current_parameters(self):
+    def form_clusters_using_current_parameters(self, similarity: np.ndarray = None):
         # Create clusters from classification data using currently specified input parameters
+        # similarity = negative squared distances between data points, computed if not provided
         clusters = {}
         data = self.data
         n_group = data.shape[0]
@@ -523,16 +600,24 @@ class Clustering:
             clusters['exemplars'] = np.zeros(1, int)
             return clusters
 
-        if self.afp_preference_mult == 1.0:  # Run with default preference
-            pref = None
-        else:
-            distsqr = np.zeros((n_group,n_group))
-            for g in range(n_group):
-                distsqr[g,:] =  -((data[g,:] - data[:,:])**2).sum(1)  
-            pref = (np.median(distsqr)) * self.afp_preference_mult
+        if self.algorithm == 'k-medoids':
+            alg = KMedoids(n_clusters=self.n_cluster, max_iter=self.Nmaxiter)
+            alg.fit_predict(data)
+        elif self.algorithm == 'affinity-propagation':
+            if similarity is None:
+                similarity = -squared_distances(data)
 
-        alg = AffinityPropagation(damping = self.afp_damping, max_iter=self.Nmaxiter, convergence_iter=self.afp_Nconverge, preference=pref)
-        alg.fit_predict(data)
+            if self.afp_preference_mult == 1.0:  # Run with default preference
+                pref = None
+            else:
+                pref = (np.median(similarity)) * self.afp_preference_mult
+
+            initial_state = self._afp_state if self.afp_warm_start else None
+            alg = AffinityPropagation(damping = self.afp_damping, max_iter=self.Nmaxiter, convergence_iter=self.afp_Nconverge, preference=pref)
+            alg.fit_predict(data, similarity, initial_state)
+            self._afp_state = (alg.availability, alg.responsibility)
+        else:
+            raise ValueError("Clustering algorithm must be 'affinity-propagation' or 'k-medoids'")
         clusters['index'] = alg.cluster_index
         clusters['n_cluster'] = alg.n_clusters
         clusters['means'] = alg.cluster_means
@@ -602,12 +687,113 @@ class Clustering:
         return  
 
     def run_clustering(self, verbose = False):
+        key = self.fingerprint() if self.use_cache or self.cache_dir else None
+        if key is not None and self.load_cached_results(key):
+            return
+
         self.calculate_metrics() 
         self.create_clusters(verbose)
         self.set_sim_days()
         self.adjust_weighting_for_incomplete_groups()  
+
+        if key is not None:
+            self.save_cached_results(key)
         return
 
+    def fingerprint(self):
+        """
+        Content hash of the clustering inputs (resource and price data) and all parameters that are not results
+        """
+        inputs = {k: v for k, v in vars(self).items()
+                  if k not in self.result_names + ('power_sources', 'solar_resource_file', 'use_cache', 'cache_dir')
+                  and not k.startswith('_')}
+        # Results that are also inputs, unless overwritten by run_clustering()
+        if not self.use_default_weights and len(self.weights.keys()) > 0:
+            inputs.update({'weights': self.weights, 'divisions': self.divisions})
+        if not self.afp_enforce_Ncluster:
+            inputs['afp_preference_mult'] = self.afp_preference_mult
+        inputs['afp_damping'] = self.afp_damping
+        inputs['power_sources'] = list(self.power_sources)
+        inputs['solar_resource'] = file_hash(self.solar_resource_file)
+        inputs['price'] = None if self.price is None or self.price == {} else np.asarray(self.price, dtype=float)
+        inputs['wind_resource'] = None if self.wind_resource is None else np.asarray(self.wind_resource, dtype=float)
+        return hashlib.sha1(pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+    def results_to_arrays(self) -> dict:
+        """
+        :returns: flat dictionary of results, 'name:key' for entries of dictionary results
+        """
+        arrays = {}
+        for name in self.result_names:
+            value = getattr(self, name)
+            if name in self.dict_result_names:
+                arrays.update({name + ':' + k: np.array(v) for k, v in value.items()})
+            else:
+                arrays[name] = np.array(value)
+        return arrays
+
+    def results_from_arrays(self, arrays: dict):
+        """
+        Sets results from a flat dictionary of results_to_arrays()
+        """
+        def value(array):
+            return array.item() if array.ndim == 0 else array.copy()
+
+        for name in self.dict_result_names:
+            setattr(self, name, {})
+        for key, array in arrays.items():
+            name, _, entry = key.partition(':')
+            if name in self.dict_result_names:
+                getattr(self, name)[entry] = value(array)
+            else:
+                setattr(self, name, value(array))
+        self.sim_start_days = self.sim_start_days.tolist()
+        self.daylight_cutoffs = tuple(self.daylight_cutoffs.tolist())
+
+    def cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, 'clusters_{}.npz'.format(key))
+
+    def load_cached_results(self, key: str) -> bool:
+        """
+        Sets results from this process or the cache directory
+
+        :param key: fingerprint of the inputs and parameters
+        :returns: True if cached results were found
+        """
+        arrays = _results.get(key) if self.use_cache else None
+        if arrays is None and self.cache_dir and os.path.isfile(self.cache_path(key)):
+            try:
+                with np.load(self.cache_path(key), allow_pickle=False) as cached:
+                    arrays = {k: cached[k] for k in cached.files}
+            except (OSError, ValueError, KeyError):
+                arrays = None
+        if arrays is None:
+            return False
+        if self.use_cache:
+            _results[key] = arrays
+        self.results_from_arrays(arrays)
+        return True
+
+    def save_cached_results(self, key: str):
+        """
+        Stores results in this process and the cache directory. Cache files are written to a temporary file and
+        renamed, so processes sharing the directory never read partially written results.
+
+        :param key: fingerprint of the inputs and parameters
+        """
+        arrays = self.results_to_arrays()
+        if self.use_cache:
+            _results[key] = arrays
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as f:
+                    np.savez(f, **arrays)
+                os.replace(f.name, self.cache_path(key))
+            except OSError as e:
+                print('Warning: Clustering results could not be cached: ' + str(e))
+
+
     def get_sim_start_end_times(self, clusterid: int):
         # Times (hour) to start and end simulation for designated cluster
         d = self.sim_start_days[clusterid]
@@ -835,24 +1021,25 @@ class AffinityPropagation:
         self.wcss = None
         self.exemplars = None
         self.converged = None
+        self.availability = None
+        self.responsibility = None
+        self.n_iter = None
 
     def compute_wcss(self, data, cluster_index, means):
         # Computes the within-cluster sum-of-squares
-        n_clusters = means.shape[0]
-        self.wcss = 0.0
-        for k in range(n_clusters):
-            dist = ((data - means[k, :]) ** 2).sum(1)  # Distance to Cluster k centroid
-            self.wcss += (dist * (cluster_index == k)).sum()
+        self.wcss = compute_wcss(data, cluster_index, means)
 
-    def fit_predict(self, data):
+    def fit_predict(self, data, similarity=None, initial_state=None):
+        # similarity = negative squared Euclidean distances between data points, computed if not provided
+        # initial_state = (availability, responsibility) matrices to start from, e.g., from a run with a different preference
         n_obs, n_features = data.shape  # Number of observations and features
 
         # Compute similarities between data points (negative of Euclidean distance)
-        S = np.zeros((n_obs, n_obs))
+        if similarity is None:
+            S = -squared_distances(data)
+        else:
+            S = similarity.copy()
         inds = np.arange(n_obs)
-        for p in range(n_obs):
-            # Negative squared Euclidean distance between pt p and all other points
-            S[p, :] = -((data[p, :] - data[:, :]) ** 2).sum(1)
 
         if self.preference:  # Preference is specified
             S[inds, inds] = self.preference
@@ -865,8 +1052,11 @@ class AffinityPropagation:
         S += 1.e-8*mag * S * (np.random.random_sample((n_obs, n_obs)) - 0.5)
 
         # Initialize availability and responsibility matrices
-        A = np.zeros((n_obs, n_obs))
-        R = np.zeros((n_obs, n_obs))
+        if initial_state is None:
+            A = np.zeros((n_obs, n_obs))
+            R = np.zeros((n_obs, n_obs))
+        else:
+            A, R = [x.copy() for x in initial_state]
         exemplars = np.zeros(n_obs, bool)
 
         q = 0
@@ -924,10 +1114,8 @@ class AffinityPropagation:
             pts = np.where(clusters == k)[0]  # All points in Cluster k
             n_pts = len(pts)
             if n_pts > 2:
-                dist_sum = np.zeros(n_pts)
-                for p in range(n_pts):
-                    # Calculate total distance between point p and all other points in Cluster k
-                    dist_sum[p] += (S[pts[p], pts]).sum()
+                # Total distance between each point and all other points in Cluster k
+                dist_sum = S[np.ix_(pts, pts)].sum(1)
                 i = dist_sum.argmin()
                 exemplars[k] = pts[i]  # Replace exemplar k with point that minimizes wcss
 
@@ -942,6 +1130,75 @@ class AffinityPropagation:
         self.cluster_index = cluster_index
         self.exemplars = exemplars
         self.converged = converged
+        self.availability = A
+        self.responsibility = R
+        self.n_iter = q
+
+        return self
+
+
+class KMedoids:
+    # k-medoids algorithm (alternating assignment and medoid update) for a fixed number of clusters.
+    # Minimizes the same within-cluster sum-of-squares as the exemplar refinement in AffinityPropagation, with
+    # memory proportional to n_obs x n_clusters and the size of the largest cluster
+
+    def __init__(self, n_clusters=20, max_iter=300, n_init=10):
+        self.n_clusters = n_clusters  # Number of clusters
+        self.max_iter = max_iter  # Maximum number of iterations
+        self.n_init = n_init  # Number of initializations, the solution with the lowest wcss is kept
+        self.random_seed = 123
+
+        # This attributes are filled by fit_predict()
+        self.cluster_means = None
+        self.cluster_index = None
+        self.wcss = None
+        self.exemplars = None
+        self.converged = None
+
+    def initial_medoids(self, data, rng):
+        # k-medoids++ initialization: first medoid sampled at random, then points sampled with probability
+        # proportional to the squared distance to the closest chosen medoid
+        medoids = [rng.randint(len(data))]
+        distsqr = squared_distances(data, data[medoids])[:, 0]
+        for k in range(1, self.n_clusters):
+            if distsqr.sum() > 0:
+                medoid = rng.choice(len(data), p=distsqr / distsqr.sum())
+            else:
+                medoid = np.setdiff1d(np.arange(len(data)), medoids)[0]
+            medoids.append(medoid)
+            distsqr = np.minimum(distsqr, squared_distances(data, data[[medoid]])[:, 0])
+        return np.array(medoids)
+
+    def fit_predict(self, data):
+        n_obs = data.shape[0]
+        self.n_clusters = min(self.n_clusters, n_obs)
+        rng = np.random.RandomState(self.random_seed)
+        for i in range(self.n_init):
+            exemplars, converged = self.fit_medoids(data, self.initial_medoids(data, rng))
+            cluster_index = squared_distances(data, data[exemplars]).argmin(1)
+            wcss = compute_wcss(data, cluster_index, data[exemplars, :])
+            if i == 0 or wcss < self.wcss:
+                self.cluster_means = data[exemplars, :]
+                self.cluster_index = cluster_index
+                self.wcss = wcss
+                self.exemplars = exemplars
+                self.converged = converged
 
         return self
 
+    def fit_medoids(self, data, exemplars):
+        # Alternates assignment of points to the closest medoid and update of the medoids from initial medoids
+        converged = False
+        q = 0
+        while q < self.max_iter and not converged:
+            clusters = squared_distances(data, data[exemplars]).argmin(1)  # Assign points to closest medoid
+            exemplars_prev = exemplars.copy()
+            for k in range(self.n_clusters):
+                pts = np.where(clusters == k)[0]  # All points in Cluster k
+                if len(pts) > 2:
+                    # Replace medoid k with point that minimizes the total distance to all other points in Cluster k
+                    exemplars[k] = pts[squared_distances(data[pts]).sum(1).argmin()]
+            converged = (exemplars == exemplars_prev).all()
+            q += 1
+        return exemplars, converged
+
@@ -8,6 +8,7 @@ import datetime
 import os
 
 from hybrid.pySSC_daotk.ssc_wrap import ssc_wrap
+from hybrid.resource.resource_store import load_solar_table
 import PySAM.Singleowner as Singleowner
 
 from hybrid.dispatch.power_sources.csp_dispatch import CspDispatch
@@ -17,6 +18,14 @@ from hybrid.sites import SiteInfo
 
 class CspOutputs:
     """Object for storing CSP outputs from SSC (SAM's Simulation Core) and dispatch optimization."""
+    # Dispatch model outputs stored for post-processing analysis
+    dispatch_output_keys = ('available_thermal_generation', 'cycle_ambient_efficiency_correction', 'condenser_losses',
+                            'thermal_energy_storage', 'receiver_startup_inventory', 'receiver_thermal_power',
+                            'receiver_startup_consumption', 'is_field_generating', 'is_field_starting',
+                            'incur_field_start', 'cycle_startup_inventory', 'system_load', 'cycle_generation',
+                            'cycle_thermal_ramp', 'cycle_thermal_power', 'is_cycle_generating', 'is_cycle_starting',
+                            'incur_cycle_start')
+
     def __init__(self):
         self.ssc_time_series = {}
         self.dispatch = {}
@@ -44,8 +53,8 @@ class CspOutputs:
 
         if is_empty:
             for name, val in ssc_outputs.items():
-                if isinstance(val, list) and len(val) == ntot:  
-                    self.ssc_time_series[name] = [0.0]*ntot
+                if isinstance(val, (list, np.ndarray)) and np.ndim(val) == 1 and len(val) == ntot:
+                    self.ssc_time_series[name] = np.zeros(ntot)
         
         for name in self.ssc_time_series.keys():
             self.ssc_time_series[name][i:i+n] = ssc_outputs[name][s1:s1+n]
@@ -58,18 +67,12 @@ class CspOutputs:
         :param n_periods: Number of periods to store dispatch outputs
         :param sim_start_time: The first simulation hour of the dispatch horizon
         """
-        outputs_keys = ['available_thermal_generation', 'cycle_ambient_efficiency_correction', 'condenser_losses',
-                        'thermal_energy_storage', 'receiver_startup_inventory', 'receiver_thermal_power',
-                        'receiver_startup_consumption', 'is_field_generating', 'is_field_starting', 'incur_field_start',
-                        'cycle_startup_inventory', 'system_load', 'cycle_generation', 'cycle_thermal_ramp',
-                        'cycle_thermal_power', 'is_cycle_generating', 'is_cycle_starting', 'incur_cycle_start']
-
         is_empty = (len(self.dispatch) == 0)
         if is_empty:
-            for key in outputs_keys:
+            for key in self.dispatch_output_keys:
                 self.dispatch[key] = [0.0] * 8760
 
-        for key in outputs_keys:
+        for key in self.dispatch_output_keys:
             self.dispatch[key][sim_start_time: sim_start_time + n_periods] = getattr(dispatch, key)[0: n_periods]
 
 
@@ -79,8 +82,14 @@ class CspPlant(PowerSource):
     # _layout: TroughLayout
     _dispatch: CspDispatch
 
+    # Dispatch properties read when simulating with dispatch, see set_dispatch_targets and store_dispatch_outputs
+    dispatch_solution_names = CspOutputs.dispatch_output_keys + ('allowable_cycle_startup_power',
+                                                                 'maximum_cycle_thermal_power')
+
     param_files: dict
     """Files contain default SSC parameter values"""
+    ssc_time_series_outputs: Optional[list] = None
+    """SSC time series stored during simulation with dispatch (if None, all SSC outputs are returned and stored)"""
 
     def __init__(self,
                  name: str,
@@ -116,7 +125,8 @@ class CspPlant(PowerSource):
             wrapper='pyssc',  # ['pyssc' | 'pysam']
             tech_name=tech_name,  # ['tcsmolten_salt' | 'trough_physical]
             financial_name=None,
-            defaults_name=None)  # ['MSPTSingleOwner' | 'PhysicalTroughSingleOwner']  NOTE: not used for pyssc
+            defaults_name=None,  # ['MSPTSingleOwner' | 'PhysicalTroughSingleOwner']  NOTE: not used for pyssc
+            persistent=True)  # reuse ssc data table between horizons, only changed inputs are pushed
         self.initialize_params()
 
         self.year_weather_df = self.tmy3_to_df()  # read entire weather file
@@ -172,25 +182,21 @@ class CspPlant(PowerSource):
 
         :returns: Weather file data (DataFrame)
         """
-        df = pd.read_csv(self.site.solar_resource.filename, sep=',', skiprows=2, header=0)
+        weather = load_solar_table(self.site.solar_resource.filename)
+        df = weather.to_dataframe()
         date_cols = ['Year', 'Month', 'Day', 'Hour', 'Minute']
         df.index = pd.to_datetime(df[date_cols])
         df.index.name = 'datetime'
         df.drop(date_cols, axis=1, inplace=True)
 
         df.index = df.index.map(lambda t: t.replace(year=df.index[0].year))  # normalize all years to that of 1/1
-        df = df[df.columns.drop(list(df.filter(regex='Unnamed')))]  # drop unnamed columns (which are empty)
-
-        def get_weatherfile_location(tmy3_path):
-            df_meta = pd.read_csv(tmy3_path, sep=',', header=0, nrows=1)
-            return {
-                'latitude': float(df_meta['Latitude'][0]),
-                'longitude': float(df_meta['Longitude'][0]),
-                'timezone': int(df_meta['Time Zone'][0]),
-                'elevation': float(df_meta['Elevation'][0])
-            }
 
-        location = get_weatherfile_location(self.site.solar_resource.filename)
+        location = {
+            'latitude': weather.meta_float('Latitude'),
+            'longitude': weather.meta_float('Longitude'),
+            'timezone': int(weather.meta_float('Time Zone')),
+            'elevation': weather.meta_float('Elevation')
+        }
         df.attrs.update(location)
         return df
 
@@ -513,7 +519,7 @@ class CspPlant(PowerSource):
         self.set_dispatch_targets(n_periods)
         self.update_ssc_inputs_from_plant_state()
 
-        results = self.simulate_power()
+        results = self.simulate_power(self.get_dispatch_ssc_outputs())
 
         # Save plant state at end of simulation
         simulation_time = (end_datetime - start_datetime).total_seconds()
@@ -524,16 +530,30 @@ class CspPlant(PowerSource):
             self.outputs.update_from_ssc_output(results)
             self.outputs.store_dispatch_outputs(self.dispatch, n_periods, sim_start_time)
 
-    def simulate_power(self) -> dict:
+    def get_dispatch_ssc_outputs(self) -> Optional[list]:
+        """
+        Gets SSC output names required during simulation with dispatch, i.e., stored time series, plant state outputs
+        and the simulation time inputs used to place results in annual arrays.
+
+        :returns: List of SSC variable names, or None if all SSC outputs are required
+        """
+        if self.ssc_time_series_outputs is None:
+            return None
+        time_inputs = ['time_steps_per_hour', 'time_start', 'time_stop']
+        return time_inputs + self.ssc_time_series_outputs + list(self.get_plant_state_io_map().values())
+
+    def simulate_power(self, outputs: Optional[list] = None) -> dict:
         """
         Runs CSP system model simulate
 
+        :param outputs: (optional) SSC variable names to return, all variables are returned if None
+
         :returns: SSC results dictionary
         """
         if not self.ssc:
             raise ValueError('SSC was not correctly setup...')
 
-        results = self.ssc.execute()
+        results = self.ssc.execute(outputs)
         if not results["cmod_success"]:
             raise ValueError('PySSC simulation failed...')
 
@@ -674,12 +694,13 @@ class CspPlant(PowerSource):
         
         self._financial_model.value('ppa_soln_mode', 1)
 
-        if len(self.generation_profile) == self.site.n_timesteps:
-            single_year_gen = self.generation_profile
-            self._financial_model.value('gen', list(single_year_gen) * project_life)
+        single_year_gen = np.asarray(self.generation_profile, dtype=float)
+        if len(single_year_gen) == self.site.n_timesteps:
+            lifetime_gen = lifetime_series(single_year_gen, project_life)
+            self._financial_model.value('gen', lifetime_gen)
 
-            self._financial_model.value('system_pre_curtailment_kwac', list(single_year_gen) * project_life)
-            self._financial_model.value('annual_energy_pre_curtailment_ac', sum(single_year_gen))
+            self._financial_model.value('system_pre_curtailment_kwac', lifetime_gen)
+            self._financial_model.value('annual_energy_pre_curtailment_ac', float(single_year_gen.sum()))
 
         self._financial_model.execute(0)
         logger.info("{} simulation executed".format(str(type(self).__name__)))
@@ -707,110 +728,78 @@ class CspPlant(PowerSource):
             raise NotImplementedError("Capacity credit calculations have not been implemented \
                                       for power block startup times greater than one timestep.")
 
-        df = pd.DataFrame()
-        df['Q_pb_startup'] = [x * 1e3 for x in self.outputs.ssc_time_series["q_dot_pc_startup"]]    # [kWt]
-        df['E_pb_startup'] = [x * 1e3 for x in self.outputs.ssc_time_series["q_pc_startup"]]        # [kWht]
-        df['W_pb_gross'] = [x * 1e3 for x in self.outputs.ssc_time_series["P_cycle"]]               # [kWe] Always average over entire timestep
-        df['E_tes'] = [x * 1e3 for x in self.outputs.ssc_time_series["e_ch_tes"]]                   # [kWht]
-        df['eta_pb'] = self.outputs.ssc_time_series["eta"]                                          # [-]
-        df['W_pb_net'] = [x * 1e3 for x in self.outputs.ssc_time_series["P_out_net"]]  # kWe 
-        df['Q_pb'] = [x * 1e3 for x in self.outputs.ssc_time_series["q_pb"]]  # kWt 
-
-        def power_block_state(Q_pb_startup, W_pb_gross):
-            """Simplified power block operating states.
-
-            ===========   ==========================================
-            State         Condition
-            ===========   ==========================================
-            [off]         (startup == 0 and gross output power == 0)
-            [starting]    (startup  > 0 and gross output power == 0)
-            [started]     (startup  > 0 and gross output power  > 0)
-            [on]          (startup == 0 and gross output power  > 0) -> on to off transition still applicable
-            ===========   ==========================================
-
-            :returns: 'off'|'starting'|'started'|'on': string
-            """
-            if abs(Q_pb_startup) < SIGMA and abs(W_pb_gross) < SIGMA:
-                return 'off'
-            elif Q_pb_startup > SIGMA and abs(W_pb_gross) < SIGMA:
-                return 'starting'
-            elif Q_pb_startup > SIGMA and W_pb_gross > SIGMA:
-                return 'started'
-            elif abs(Q_pb_startup) < SIGMA and W_pb_gross > SIGMA:
-                return 'on'
-            else:
-                return None
+        ts = self.outputs.ssc_time_series
+        Q_pb_startup = np.asarray(ts["q_dot_pc_startup"], dtype=float) * 1e3    # [kWt]
+        E_pb_startup = np.asarray(ts["q_pc_startup"], dtype=float) * 1e3        # [kWht]
+        W_pb_gross = np.asarray(ts["P_cycle"], dtype=float) * 1e3               # [kWe] Always average over entire timestep
+        E_tes = np.asarray(ts["e_ch_tes"], dtype=float) * 1e3                   # [kWht]
+        eta_pb = np.asarray(ts["eta"], dtype=float)                             # [-]
+        W_pb_net = np.asarray(ts["P_out_net"], dtype=float) * 1e3               # [kWe]
+        Q_pb = np.asarray(ts["q_pb"], dtype=float) * 1e3                        # [kWt]
 
-        def max_feasible_kwh(row):
+        def max_feasible_kwh():
             """
-            [off]      = E_pb_possible|t_pb_on - E_startup
-            [starting] = 0
-            [started]  = E_pb_possible|t_pb_on
-            [on]       = E_pb_possible|t_step
+            Simplified power block operating states and their maximum feasible generation.
+
+            ===========   ==========================================   ==========================================
+            State         Condition                                    Maximum feasible energy
+            ===========   ==========================================   ==========================================
+            [off]         (startup == 0 and gross output power == 0)   E_pb_possible|t_pb_on - E_startup
+            [starting]    (startup  > 0 and gross output power == 0)   0
+            [started]     (startup  > 0 and gross output power  > 0)   E_pb_possible|t_pb_on
+            [on]          (startup == 0 and gross output power  > 0)   E_pb_possible|t_step
+            ===========   ==========================================   ==========================================
 
-            :param row: Pandas Series of a row from main dataframe
+            Time steps that don't match any state are NaN.
 
             :returns: maximum feasible energy from power block [kWhe]
             """
-            state = power_block_state(row.Q_pb_startup, row.W_pb_gross)
-
-            if state == 'starting':
-                return 0    # [kWhe]
+            is_off = (np.abs(Q_pb_startup) < SIGMA) & (np.abs(W_pb_gross) < SIGMA)
+            is_starting = (Q_pb_startup > SIGMA) & (np.abs(W_pb_gross) < SIGMA)
+            is_started = (Q_pb_startup > SIGMA) & (W_pb_gross > SIGMA)
+            is_on = (np.abs(Q_pb_startup) < SIGMA) & (W_pb_gross > SIGMA)
+            is_generating = is_started | is_on
 
             # 1. What's the maximum the power block could generate with unlimited resource, outside of startup time?
-            if state == 'off':
-                t_pb_startup = self.value("startup_time")                 # [hr]
-            elif state == 'started':
-                #t_pb_startup = row.E_pb_startup / row.Q_pb_startup \
-                #                if row.E_pb_startup > SIGMA and \
-                #                row.Q_pb_startup > SIGMA \
-                #                else 0  #TODO: reported q_dot_pc_startup is timestep average so t_pb_startup = t_step from this calculation
-
-                t_pb_startup  = t_step * (1.0 - row.eta_pb / (row.W_pb_gross / (row.Q_pb - row.Q_pb_startup)))  \
-                                if row.E_pb_startup > SIGMA and row.Q_pb_startup > SIGMA \
-                                else 0    # Fraction of timestep used for startup = 1.0 - (timestep-averaged efficiency / instantaneous efficiency while on)             
-
-            elif state == 'on':
-                t_pb_startup = 0
-            else:
-                return None
+            t_startup = self.value("startup_time")                                      # [hr]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Fraction of timestep used for startup = 1.0 - (timestep-averaged efficiency / instantaneous efficiency while on)
+                # TODO: reported q_dot_pc_startup is timestep average so t_pb_startup = t_step from E_pb_startup / Q_pb_startup
+                t_started = t_step * (1.0 - eta_pb / (W_pb_gross / (Q_pb - Q_pb_startup)))
+            t_started = np.where((E_pb_startup > SIGMA) & (Q_pb_startup > SIGMA), t_started, 0)
+            t_pb_startup = np.select([is_off, is_started], [t_startup, t_started], 0)    # [hr]
+
             W_pb_nom = self.cycle_capacity_kw                                           # [kWe]
-            f_pb_max = self.value("cycle_max_frac")                       # [-]
+            f_pb_max = self.value("cycle_max_frac")                                     # [-]
             W_pb_max = W_pb_nom * f_pb_max                                              # [kWe]
-            E_pb_max = max(W_pb_max * (t_step - t_pb_startup), row.W_pb_gross * t_step)  # [kWhe]  
+            E_pb_max = np.maximum(W_pb_max * (t_step - t_pb_startup), W_pb_gross * t_step)  # [kWhe]
 
             # 2. What did the power block actually generate?
-            if state == 'off':
-                E_pb_gross = 0                                                          # [kWhe]
-            elif state == 'started' or state == 'on':
-                E_pb_gross = row.W_pb_gross * t_step                                    # [kWhe] W_pb_gross avg over entire timestep
-            else:
-                return None
+            E_pb_gross = np.where(is_generating, W_pb_gross * t_step, 0)                # [kWhe] W_pb_gross avg over entire timestep
 
             # 3. What more could the power block generate if it used all the remaining TES (with no physical constraints)?
-            if state == 'off':
-                eta_pb_nom = self.cycle_nominal_efficiency                     # [-]
-                f_pb_startup_of_nominal = self.value("startup_frac")      # [-]
-                E_pb_startup = W_pb_nom / eta_pb_nom * f_pb_startup_of_nominal * t_pb_startup  # [kWht]
-                dE_pb_rest_of_tes = max(0, row.E_tes - E_pb_startup) * eta_pb_nom              # [kWht]
-            elif state == 'started' or state == 'on':
-                dE_pb_rest_of_tes = row.E_tes * row.eta_pb                              # [kWhe]
-            else:
-                return None
+            eta_pb_nom = self.cycle_nominal_efficiency                                  # [-]
+            f_pb_startup_of_nominal = self.value("startup_frac")                        # [-]
+            E_pb_startup_off = W_pb_nom / eta_pb_nom * f_pb_startup_of_nominal * t_startup  # [kWht]
+            dE_pb_rest_of_tes = np.where(is_off,
+                                         np.maximum(0, E_tes - E_pb_startup_off) * eta_pb_nom,  # [kWht]
+                                         E_tes * eta_pb)                                        # [kWhe]
 
             # 4. Thus, what could the power block have generated if it utilized more TES?
-            E_pb_gross_max_feasible = min(E_pb_max, E_pb_gross + dE_pb_rest_of_tes)     # [kWhe]
+            E_pb_gross_max_feasible = np.minimum(E_pb_max, E_pb_gross + dE_pb_rest_of_tes)  # [kWhe]
+            E_pb_gross_max_feasible[is_starting] = 0
+            E_pb_gross_max_feasible[~(is_off | is_starting | is_generating)] = np.nan
             return E_pb_gross_max_feasible
 
         if cap_cred_avail_storage:
-            E_pb_max_feasible = np.maximum(df['W_pb_net']*t_step, df.apply(max_feasible_kwh, axis=1)*self.value('gross_net_conversion_factor')) # [kWhe]
+            E_pb_max_feasible = np.maximum(W_pb_net*t_step, max_feasible_kwh()*self.value('gross_net_conversion_factor')) # [kWhe]
         else:
-            E_pb_max_feasible = df['W_pb_net']*t_step 
+            E_pb_max_feasible = W_pb_net*t_step
 
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
         E_pb_max_feasible = np.minimum(E_pb_max_feasible, W_ac_nom*t_step)  # Limit to nominal capacity here, to avoid discrepancies between single-technology and hybrid capacity credits
 
-        return list(E_pb_max_feasible)
+        return E_pb_max_feasible.tolist()
 
     def value(self, var_name, var_value=None):
         """
@@ -833,17 +822,10 @@ class CspPlant(PowerSource):
         """
         attr_obj = None
         ssc_value = None
-        if var_name in self.__dir__():
+        if self.has_own_attribute(var_name):
             attr_obj = self
         if not attr_obj:
-            for a in self._financial_model.__dir__():
-                group_obj = getattr(self._financial_model, a)
-                try:
-                    if var_name in group_obj.__dir__():
-                        attr_obj = group_obj
-                        break
-                except:
-                    pass
+            attr_obj = self.find_value_group(var_name, (self._financial_model,))
         if not attr_obj:
             try:
                 ssc_value = self.ssc.get(var_name)
@@ -877,6 +859,10 @@ class CspPlant(PowerSource):
     def _system_model(self, value):
         pass
 
+    def copy(self):
+        """CSP plants hold ssc data that is not copied"""
+        raise NotImplementedError("CSP plants cannot be copied")
+
     @property
     def system_capacity_kw(self) -> float:
         """Gross power cycle design rating [kWe]"""
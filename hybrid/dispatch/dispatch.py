@@ -1,3 +1,6 @@
+from typing import Sequence
+
+import numpy as np
 import pyomo.environ as pyomo
 from pyomo.environ import units as u
 
@@ -6,6 +9,11 @@ class Dispatch:
     """
 
     """
+    # Model parameters holding the plant state at the start of the dispatch horizon, see ``initial_state``
+    initial_state_names = ()
+    # Binary variables fixed by ``round_relaxed_binaries``, other binary variables stay relaxed in the repair solve
+    relaxation_state_names = ()
+
     def __init__(self,
                  pyomo_model: pyomo.ConcreteModel,
                  index_set: pyomo.Set,
@@ -28,6 +36,9 @@ class Dispatch:
         self._system_model = system_model
         self._financial_model = financial_model
 
+        self._param_data = {}       # parameter name: block parameters in horizon order
+        self._time_series = {}      # series name: full year series array
+
     @staticmethod
     def dispatch_block_rule(block, t):
         raise NotImplemented("This function must be overridden for specific dispatch model")
@@ -38,6 +49,78 @@ class Dispatch:
     def update_time_series_parameters(self, start_time: int):
         raise NotImplemented("This function must be overridden for specific dispatch model")
 
+    def get_time_series(self, name: str, source) -> np.ndarray:
+        """
+        Gets a full year series as an array, converted once until ``clear_time_series`` is called
+
+        :param name: series name
+        :param source: function returning the full year series
+        :returns: series array
+        """
+        series = self._time_series.get(name)
+        if series is None:
+            series = np.asarray(source(), dtype=float)
+            self._time_series[name] = series
+        return series
+
+    def clear_time_series(self):
+        """Clears stored full year series, e.g., after the system model is simulated again"""
+        self._time_series.clear()
+
+    def horizon_series(self, series: np.ndarray, start_time: int) -> np.ndarray:
+        """
+        Gets the dispatch horizon values of a full year series, wrapping to the start of the series past its end
+
+        :param series: full year series array
+        :param start_time: hour of the year starting dispatch horizon
+        :returns: horizon series array
+        """
+        n_horizon = len(self.blocks)
+        return series.take(np.arange(start_time, start_time + n_horizon), mode='wrap')
+
+    def set_param_values(self, param_name: str, values):
+        """
+        Sets the value of a time indexed block parameter in all horizon time periods, rounded to ``round_digits``
+
+        :param param_name: block parameter name
+        :param values: horizon series or a single value for all time periods
+        """
+        params = self._param_data.get(param_name)
+        if params is None:
+            params = [getattr(self.blocks[t], param_name) for t in self.blocks.index_set()]
+            self._param_data[param_name] = params
+        values = np.round(np.broadcast_to(np.asarray(values, dtype=float), (len(params),)), self.round_digits)
+        for param, value in zip(params, values.tolist()):
+            param.set_value(value)
+
+    @property
+    def initial_state(self) -> dict:
+        """Plant state at the start of the dispatch horizon, initial state name: value"""
+        return {name: getattr(self, name) for name in self.initial_state_names}
+
+    @initial_state.setter
+    def initial_state(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def predict_initial_state(self, n_periods: int) -> dict:
+        """
+        Predicts the plant state at the start of the next dispatch horizon from the current dispatch solution
+
+        :param n_periods: number of time periods the horizon rolls forward
+        :returns: initial state name: predicted value
+        """
+        raise NotImplementedError("This function must be overridden for specific dispatch model")
+
+    def round_relaxed_binaries(self):
+        """
+        Fixes on/off state binary variables of the relaxed dispatch solution to 0 or 1, rounding at 0.5
+        """
+        for t in self.blocks.index_set():
+            for name in self.relaxation_state_names:
+                var = getattr(self.blocks[t], name)
+                var.fix(1.0 if var.value is not None and var.value >= 0.5 else 0.0)
+
     @staticmethod
     def _check_efficiency_value(efficiency):
         """Checks efficiency is between 0 and 1 or 0 and 100. Returns fractional value"""
@@ -56,3 +139,17 @@ class Dispatch:
     @property
     def model(self) -> pyomo.ConcreteModel:
         return self._model
+
+
+class DispatchSnapshot:
+    """
+    Copy of dispatch property values, used in place of a dispatch object to simulate the plant while the dispatch
+    model is changed or solved for another horizon
+    """
+    def __init__(self, dispatch: Dispatch, names: Sequence[str]):
+        """
+        :param dispatch: dispatch object to copy
+        :param names: dispatch property and attribute names read by the plant simulation
+        """
+        for name in names:
+            setattr(self, name, getattr(dispatch, name))
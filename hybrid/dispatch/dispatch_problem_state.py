@@ -1,142 +1,252 @@
+import numpy as np
+import pandas as pd
 from pyomo.opt import TerminationCondition
 
 
 class DispatchProblemState:
-    """Class for tracking dispatch problem solve state and metrics"""
+    """
+    Class for tracking dispatch problem solve state and metrics
+
+    Metrics are stored one row per dispatch horizon in preallocated columns. Wall clock time of each horizon is split
+    by phase (see ``phase_names``) by the dispatch builder solver.
+    """
+    phase_names = ('update_parameters_time', 'solve_wall_time', 'plant_simulate_time', 'state_readback_time')
+    metric_names = ('start_time', 'n_days', 'termination_condition', 'solve_time', 'objective', 'upper_bound',
+                    'lower_bound', 'constraints', 'variables', 'non_zeros', 'gap', 'nodes') + phase_names
+    _integer_metrics = ('start_time', 'n_days')
+    _initial_capacity = 400
 
     def __init__(self):
-        self._start_time = ()
-        self._n_days = ()
-        self._termination_condition = ()
-        self._solve_time = ()
-        self._objective = ()
-        self._upper_bound = ()
-        self._lower_bound = ()
-        self._constraints = ()
-        self._variables = ()
-        self._non_zeros = ()
-        self._gap = ()
+        self._n_rows = 0
+        self._columns = {}
+        for name in self.metric_names:
+            if name == 'termination_condition':
+                self._columns[name] = np.empty(self._initial_capacity, dtype=object)
+            elif name in self._integer_metrics:
+                self._columns[name] = np.zeros(self._initial_capacity, dtype=np.int64)
+            else:
+                self._columns[name] = np.full(self._initial_capacity, np.nan)
         self._n_non_optimal_solves = 0
+        self.model_build_time = 0.0
 
     def store_problem_metrics(self, solver_results, start_time, n_days, objective_value):
-        self.start_time = start_time
-        self.n_days = n_days
-        self.termination_condition = str(solver_results.solver.termination_condition)
         try:
-            self.solve_time = solver_results.solver.time
+            solve_time = solver_results.solver.time
         except AttributeError:
-            self.solve_time = solver_results.solver.wallclock_time
-        self.objective = objective_value
-        self.upper_bound = solver_results.problem.upper_bound
-        self.lower_bound = solver_results.problem.lower_bound
-        self.constraints = solver_results.problem.number_of_constraints
-        self.variables = solver_results.problem.number_of_variables
-        self.non_zeros = solver_results.problem.number_of_nonzeros
+            solve_time = solver_results.solver.wallclock_time
+        upper_bound = self._to_float(solver_results.problem.upper_bound)
+        lower_bound = self._to_float(solver_results.problem.lower_bound)
+        try:
+            nodes = solver_results.solver.statistics.branch_and_bound.number_of_created_subproblems
+        except AttributeError:
+            nodes = None
 
         # solver_results.solution.Gap not define
-        if solver_results.problem.upper_bound != 0.0:
-            self.gap = (abs(solver_results.problem.upper_bound - solver_results.problem.lower_bound)
-                        / abs(solver_results.problem.upper_bound))
-        elif solver_results.problem.lower_bound == 0.0:
-            self.gap = 0.0
+        if upper_bound != 0.0:
+            gap = abs(upper_bound - lower_bound) / abs(upper_bound)
+        elif lower_bound == 0.0:
+            gap = 0.0
         else:
-            self.gap = float('inf')
+            gap = float('inf')
+
+        self._append_row({'start_time': start_time,
+                          'n_days': n_days,
+                          'termination_condition': str(solver_results.solver.termination_condition),
+                          'solve_time': solve_time,
+                          'objective': objective_value,
+                          'upper_bound': upper_bound,
+                          'lower_bound': lower_bound,
+                          'constraints': solver_results.problem.number_of_constraints,
+                          'variables': solver_results.problem.number_of_variables,
+                          'non_zeros': solver_results.problem.number_of_nonzeros,
+                          'gap': gap,
+                          'nodes': nodes})
 
         if not solver_results.solver.termination_condition == TerminationCondition.optimal:
             self._n_non_optimal_solves += 1
 
-    def _update_metric(self, metric_name, value):
-        data = list(getattr(self, metric_name))
-        data.append(value)
-        setattr(self, '_' + metric_name, tuple(data))
+    def store_phase_times(self, phase_times: dict):
+        """
+        Stores wall clock time by phase of the last stored dispatch horizon
+
+        :param phase_times: dict of ``phase_names`` name: time [s]
+        """
+        if self._n_rows == 0:
+            return
+        for name, value in phase_times.items():
+            self._columns[name][self._n_rows - 1] = value
+
+    def get_metrics(self, n_skip: int = 0) -> dict:
+        """
+        Gets stored problem metrics, e.g., to merge problem states of dispatch solved in other processes
+
+        :param n_skip: number of first stored problems to skip
+        :returns: dict of metric name: array of values
+        """
+        return {name: self._columns[name][n_skip:self._n_rows].copy() for name in self.metric_names}
+
+    def append_metrics(self, metrics: dict):
+        """
+        Appends problem metrics from ``get_metrics``
+
+        :param metrics: dict of metric name: array of values
+        """
+        n_new = len(metrics['start_time'])
+        self._reserve(self._n_rows + n_new)
+        for name in self.metric_names:
+            if name in metrics:
+                self._columns[name][self._n_rows:self._n_rows + n_new] = metrics[name]
+        self._n_rows += n_new
+        self._n_non_optimal_solves += sum(condition != str(TerminationCondition.optimal)
+                                          for condition in metrics['termination_condition'])
+
+    def truncate(self, n_rows: int):
+        """
+        Removes stored problems after the first ``n_rows``, e.g., discarded speculative solves
+
+        :param n_rows: number of stored problems kept
+        """
+        if n_rows >= self._n_rows:
+            return
+        self._n_non_optimal_solves -= sum(condition != str(TerminationCondition.optimal)
+                                          for condition in self._columns['termination_condition'][n_rows:self._n_rows])
+        for column in self._columns.values():
+            if column.dtype == object:
+                column[n_rows:self._n_rows] = None
+            elif column.dtype == np.int64:
+                column[n_rows:self._n_rows] = 0
+            else:
+                column[n_rows:self._n_rows] = np.nan
+        self._n_rows = n_rows
+
+    def _reserve(self, n_rows: int):
+        capacity = len(self._columns['start_time'])
+        if n_rows <= capacity:
+            return
+        capacity = max(n_rows, 2 * capacity)
+        for name, column in self._columns.items():
+            if column.dtype == object:
+                grown = np.empty(capacity, dtype=object)
+            elif column.dtype == np.int64:
+                grown = np.zeros(capacity, dtype=np.int64)
+            else:
+                grown = np.full(capacity, np.nan)
+            grown[:self._n_rows] = column[:self._n_rows]
+            self._columns[name] = grown
+
+    def _append_row(self, row: dict):
+        self._reserve(self._n_rows + 1)
+        for name, value in row.items():
+            if name != 'termination_condition' and name not in self._integer_metrics:
+                value = self._to_float(value)
+            self._columns[name][self._n_rows] = value
+        self._n_rows += 1
+
+    @staticmethod
+    def _to_float(value) -> float:
+        """Converts reported solver values to float, values not reported by the solver are NaN"""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def _metric(self, name: str) -> tuple:
+        return tuple(self._columns[name][:self._n_rows].tolist())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        :returns: stored metrics, one row per dispatch horizon
+        """
+        return pd.DataFrame({name: self._columns[name][:self._n_rows] for name in self.metric_names})
+
+    def to_csv(self, filename: str):
+        self.to_dataframe().to_csv(filename, index=False)
+
+    def to_parquet(self, filename: str):
+        """Requires a pandas parquet engine, i.e., pyarrow or fastparquet"""
+        self.to_dataframe().to_parquet(filename, index=False)
+
+    def summary(self, n_slowest: int = 5) -> dict:
+        """
+        Summarizes where dispatch simulation time was spent
+
+        :param n_slowest: number of slowest dispatch horizons to report
+        :returns: dict with keys:
+            'n_solves': number of stored dispatch horizons
+            'n_non_optimal_solves': number of non-optimal solves
+            'model_build_time': dispatch model build time [s]
+            'phase_time': dict of phase name: total time [s]
+            'phase_share': dict of phase name: fraction of total horizon time [-]
+            'slowest_horizons': DataFrame of the slowest horizons by total phase time
+        """
+        df = self.to_dataframe()
+        phases = df[list(self.phase_names)].fillna(0.0)
+        phase_time = {name: float(phases[name].sum()) for name in self.phase_names}
+        total_time = sum(phase_time.values())
+        phase_share = {name: (value / total_time if total_time > 0.0 else 0.0) for name, value in phase_time.items()}
+
+        df['total_time'] = phases.sum(axis=1)
+        slowest = df.nlargest(n_slowest, 'total_time')[['start_time', 'total_time', 'termination_condition',
+                                                         'solve_time', 'gap', 'nodes'] + list(self.phase_names)]
+        return {'n_solves': self._n_rows,
+                'n_non_optimal_solves': self._n_non_optimal_solves,
+                'model_build_time': self.model_build_time,
+                'phase_time': phase_time,
+                'phase_share': phase_share,
+                'slowest_horizons': slowest.reset_index(drop=True)}
 
     @property
     def start_time(self) -> tuple:
-        return self._start_time
-
-    @start_time.setter
-    def start_time(self, start_hour: int):
-        self._update_metric('start_time', start_hour)
+        return self._metric('start_time')
 
     @property
     def n_days(self) -> tuple:
-        return self._n_days
-
-    @n_days.setter
-    def n_days(self, solve_days: int):
-        self._update_metric('n_days', solve_days)
+        return self._metric('n_days')
 
     @property
     def termination_condition(self) -> tuple:
-        return self._termination_condition
-
-    @termination_condition.setter
-    def termination_condition(self, condition: str):
-        self._update_metric('termination_condition', condition)
+        return self._metric('termination_condition')
 
     @property
     def solve_time(self) -> tuple:
-        return self._solve_time
-
-    @solve_time.setter
-    def solve_time(self, time: float):
-        self._update_metric('solve_time', time)
+        return self._metric('solve_time')
 
     @property
     def objective(self) -> tuple:
-        return self._objective
-
-    @objective.setter
-    def objective(self, objective_value: float):
-        self._update_metric('objective', objective_value)
+        return self._metric('objective')
 
     @property
     def upper_bound(self) -> tuple:
-        return self._upper_bound
-
-    @upper_bound.setter
-    def upper_bound(self, bound: float):
-        self._update_metric('upper_bound', bound)
+        return self._metric('upper_bound')
 
     @property
     def lower_bound(self) -> tuple:
-        return self._lower_bound
-
-    @lower_bound.setter
-    def lower_bound(self, bound: float):
-        self._update_metric('lower_bound', bound)
+        return self._metric('lower_bound')
 
     @property
     def constraints(self) -> tuple:
-        return self._constraints
-
-    @constraints.setter
-    def constraints(self, constraint_count: int):
-        self._update_metric('constraints', constraint_count)
+        return self._metric('constraints')
 
     @property
     def variables(self) -> tuple:
-        return self._variables
-
-    @variables.setter
-    def variables(self, variable_count: int):
-        self._update_metric('variables', variable_count)
+        return self._metric('variables')
 
     @property
     def non_zeros(self) -> tuple:
-        return self._non_zeros
-
-    @non_zeros.setter
-    def non_zeros(self, non_zeros_count: int):
-        self._update_metric('non_zeros', non_zeros_count)
+        return self._metric('non_zeros')
 
     @property
     def gap(self) -> tuple:
-        return self._gap
+        return self._metric('gap')
+
+    @property
+    def nodes(self) -> tuple:
+        """Branch and bound nodes, NaN if not reported by the solver"""
+        return self._metric('nodes')
 
-    @gap.setter
-    def gap(self, mip_gap: int):
-        self._update_metric('gap', mip_gap)
+    @property
+    def n_solves(self) -> int:
+        return self._n_rows
 
     @property
     def n_non_optimal_solves(self) -> int:
@@ -0,0 +1,69 @@
+import pyomo.environ as pyomo
+from pyomo.opt import SolverResults, TerminationCondition
+
+
+class DispatchRelaxation:
+    """
+    Solves the dispatch model as its linear programming (LP) relaxation followed by a deterministic repair solve.
+
+    Binary variables are relaxed to [0, 1] and the LP is solved. Each technology dispatch then fixes its on/off state
+    binaries from the relaxed solution (see ``Dispatch.round_relaxed_binaries``), e.g., a battery is charging only if
+    the relaxed charge power is larger than the discharge power. The LP is solved again with these states fixed, so
+    that the dispatch solution is physically consistent. If the repair solve fails, the exact MILP is solved instead.
+
+    The relaxed objective bounds the exact MILP objective. Solver results therefore report the relaxed objective as
+    the bound and the repaired objective as the solution, so the stored problem gap bounds the loss of optimality.
+    """
+    def __init__(self,
+                 pyomo_model: pyomo.ConcreteModel,
+                 dispatch_models: list):
+        """
+        :param pyomo_model: dispatch model
+        :param dispatch_models: technology dispatch objects fixing their state binaries from the relaxed solution
+        """
+        self.pyomo_model = pyomo_model
+        self.dispatch_models = dispatch_models
+        self.binary_vars = [var for var in pyomo_model.component_data_objects(pyomo.Var, descend_into=True)
+                            if var.is_binary()]
+        self.n_solves = 0
+        self.n_fallbacks = 0    # horizons solved as the exact MILP after the repair solve failed
+
+    def solve(self, solve_model) -> SolverResults:
+        """
+        Solves the dispatch model for the current horizon
+
+        :param solve_model: function solving the dispatch model and returning pyomo solver results
+        :returns: pyomo solver results of the repaired solution
+        """
+        objective = next(self.pyomo_model.component_data_objects(pyomo.Objective, active=True))
+        free_vars = [var for var in self.binary_vars if not var.fixed]
+        results = None
+        try:
+            for var in free_vars:
+                var.domain = pyomo.UnitInterval
+            relaxed_results = solve_model()
+            if relaxed_results.solver.termination_condition == TerminationCondition.optimal:
+                relaxed_objective = pyomo.value(objective)
+                for dispatch in self.dispatch_models:
+                    dispatch.round_relaxed_binaries()
+                try:
+                    results = solve_model()
+                except ValueError:
+                    # solver calls raise on infeasible problems
+                    results = None
+        finally:
+            for var in free_vars:
+                var.unfix()
+                var.domain = pyomo.Binary
+        self.n_solves += 1
+
+        if results is None or results.solver.termination_condition != TerminationCondition.optimal:
+            self.n_fallbacks += 1
+            return solve_model()
+
+        repaired_objective = pyomo.value(objective)
+        if objective.sense == pyomo.maximize:
+            results.problem.upper_bound, results.problem.lower_bound = relaxed_objective, repaired_objective
+        else:
+            results.problem.upper_bound, results.problem.lower_bound = repaired_objective, relaxed_objective
+        return results
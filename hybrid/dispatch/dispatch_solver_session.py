@@ -0,0 +1,142 @@
+import inspect
+import math
+
+import pyomo.environ as pyomo
+
+
+class SolverSessionBackend:
+    """Describes an in-process persistent solver that can hold a dispatch model between solves"""
+    def __init__(self, factory_name: str, default_options: dict, log_key: str):
+        """
+        :param factory_name: name registered with ``pyomo.SolverFactory``, must be an automated persistent
+            (``pyomo.contrib.appsi``) interface so that mutable Param changes are tracked by the solver
+        :param default_options: solver specific options used unless overridden by user options
+        :param log_key: solver option name for the solve log file
+        """
+        self.factory_name = factory_name
+        self.default_options = default_options
+        self.log_key = log_key
+
+    def create(self):
+        solver = pyomo.SolverFactory(self.factory_name)
+        if not solver.available(exception_flag=False):
+            raise RuntimeError("Solver session backend '{}' is not available".format(self.factory_name))
+        return solver
+
+
+class DispatchSolverSession:
+    """
+    Keeps the dispatch model resident in a persistent solver across rolling-horizon solves.
+
+    The model is loaded into the solver on the first solve. Afterwards only the values of mutable Params, changed by
+    ``update_time_series_parameters``, and variable bounds are pushed to the solver. The previous horizon solution,
+    shifted forward by the roll period, is used as the starting point of the next solve.
+
+    Additional backends can be added to ``DispatchSolverSession.backends``.
+    """
+    backends = {
+        'appsi_highs': SolverSessionBackend('appsi_highs', {'time_limit': 60.0, 'mip_rel_gap': 0.001}, 'log_file'),
+        'appsi_gurobi': SolverSessionBackend('appsi_gurobi', {'TimeLimit': 60, 'Threads': 1}, 'LogFile'),
+    }
+
+    def __init__(self,
+                 pyomo_model: pyomo.ConcreteModel,
+                 backend: str = 'appsi_highs',
+                 n_roll_periods: int = 24,
+                 warm_start: bool = True,
+                 log_name: str = "",
+                 user_solver_options: dict = None):
+        """
+        :param pyomo_model: dispatch model with time indexed blocks over ``forecast_horizon``
+        :param backend: key of ``DispatchSolverSession.backends``
+        :param n_roll_periods: number of time periods the horizon rolls forward between solves
+        :param warm_start: if True, solves start from the shifted previous horizon solution
+        :param log_name: dispatch log file name, empty str will result in no log
+        :param user_solver_options: used to update backend solver options
+        """
+        from hybrid.dispatch.hybrid_dispatch_builder_solver import SolverOptions
+
+        if backend not in self.backends:
+            raise ValueError("'{}' is not a solver session backend. Options: {}".format(backend,
+                                                                                      list(self.backends.keys())))
+        self.pyomo_model = pyomo_model
+        self.backend = self.backends[backend]
+        self.n_roll_periods = n_roll_periods
+        self.warm_start = warm_start
+        self.solver_options = SolverOptions(dict(self.backend.default_options), log_name, user_solver_options,
+                                            self.backend.log_key)
+
+        self.solver = self.backend.create()
+        # Dispatch model structure does not change between horizons, only Param values and variable bounds
+        update_config = self.solver.update_config
+        update_config.check_for_new_or_removed_constraints = False
+        update_config.check_for_new_or_removed_vars = False
+        update_config.check_for_new_or_removed_params = False
+        update_config.check_for_new_objective = False
+        update_config.update_constraints = False
+        update_config.update_named_expressions = False
+        update_config.update_objective = False
+        update_config.update_vars = True
+        update_config.update_params = True
+
+        # The warmstart keyword of the persistent solver interface is not available in all Pyomo versions
+        self.supports_warm_start = 'warmstart' in inspect.signature(self.solver.solve).parameters
+        if self.warm_start and not self.supports_warm_start:
+            print("Warning: Solver session backend '{}' does not support warm starts in this Pyomo version. "
+                  "Solving each horizon without a warm start".format(backend))
+            self.warm_start = False
+
+        self.n_solves = 0
+        self._has_solution = False
+
+    def solve(self):
+        """
+        Solves the dispatch model for the current horizon
+
+        :returns: pyomo solver results
+        """
+        warm_start = self.warm_start and self._has_solution
+        if warm_start:
+            self.shift_solution(self.pyomo_model, self.n_roll_periods)
+
+        # Solution is loaded below so that infeasible horizons are reported through the termination condition
+        solve_kwargs = {'warmstart': warm_start} if self.supports_warm_start else {}
+        results = self.solver.solve(self.pyomo_model,
+                                    load_solutions=False,
+                                    options=self.solver_options.constructed,
+                                    **solve_kwargs)
+        self.n_solves += 1
+        if results.problem.sense == pyomo.minimize:
+            best_objective = results.problem.upper_bound
+        else:
+            best_objective = results.problem.lower_bound
+        self._has_solution = best_objective is not None and math.isfinite(best_objective)
+        if self._has_solution:
+            self.solver.load_vars()
+        return results
+
+    @staticmethod
+    def shift_solution(pyomo_model: pyomo.ConcreteModel, n_periods: int):
+        """
+        Shifts variable values of time indexed blocks back by n_periods. Periods beyond the previous horizon repeat
+        the last period values. Fixed variables are not changed.
+
+        :param pyomo_model: dispatch model with time indexed blocks over ``forecast_horizon``
+        :param n_periods: number of time periods to shift
+        """
+        horizon = list(pyomo_model.forecast_horizon)
+        if n_periods <= 0 or len(horizon) == 0:
+            return
+        for block in pyomo_model.component_objects(pyomo.Block, descend_into=False):
+            if not block.is_indexed() or block.index_set() is not pyomo_model.forecast_horizon:
+                continue
+            values = [[v.value for v in block[t].component_data_objects(pyomo.Var)] for t in horizon]
+            for i, t in enumerate(horizon):
+                source = values[min(i + n_periods, len(horizon) - 1)]
+                for var, value in zip(block[t].component_data_objects(pyomo.Var), source):
+                    if not var.fixed and value is not None:
+                        var.set_value(value, skip_validation=True)
+
+    @property
+    def instance_log(self) -> str:
+        return self.solver_options.instance_log
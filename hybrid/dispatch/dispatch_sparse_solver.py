@@ -0,0 +1,241 @@
+import time
+
+import numpy as np
+import pyomo.environ as pyomo
+from pyomo.core.expr.numvalue import is_constant
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+from pyomo.repn import generate_standard_repn
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import csr_matrix
+
+
+class _Coefficients:
+    """
+    Array of matrix coefficients, right hand sides or costs, some of which depend on mutable Params. Only the values
+    of those are recalculated each horizon.
+    """
+    def __init__(self, expressions: list):
+        """
+        :param expressions: numeric values or pyomo expressions
+        """
+        self.values = np.empty(len(expressions), dtype=float)
+        dynamic = []
+        for i, expr in enumerate(expressions):
+            if is_constant(expr):
+                self.values[i] = pyomo.value(expr)
+            else:
+                dynamic.append(i)
+        self.dynamic_index = np.array(dynamic, dtype=int)
+        self.dynamic_expressions = [expressions[i] for i in dynamic]
+
+    def update(self) -> np.ndarray:
+        """
+        :returns: values with the coefficients depending on mutable Params updated
+        """
+        if len(self.dynamic_index):
+            self.values[self.dynamic_index] = [pyomo.value(expr) for expr in self.dynamic_expressions]
+        return self.values
+
+
+class SparseDispatchSolver:
+    """
+    Solves the dispatch model in-process as scipy sparse matrices using HiGHS through ``scipy.optimize.milp``.
+
+    The linear dispatch model is compiled to its matrix form once, i.e., the same variables, constraints and objective
+    as the Pyomo model, keeping the coefficients that depend on mutable Params as expressions. Each horizon only those
+    coefficients and the variable bounds are updated, without writing a solver input file or starting a solver process.
+    The solution is loaded into the Pyomo variables so that the dispatch property accessors are unchanged.
+
+    Fixed variables are kept as columns with equal bounds, so variables fixed or relaxed between solves (see
+    ``DispatchRelaxation``) do not change the matrix layout. Adding or deactivating constraints after the first solve
+    is not supported.
+
+    The matrices are compiled from the Pyomo model, so the Pyomo model is still built once per simulation; only the
+    per-horizon solve avoids Pyomo's solver interfaces.
+    """
+    default_options = {'time_limit': 60.0, 'mip_rel_gap': 0.001, 'presolve': True, 'disp': False}
+
+    # scipy.optimize.milp status: (solver status, termination condition)
+    status_conditions = {0: (SolverStatus.ok, TerminationCondition.optimal),
+                         1: (SolverStatus.aborted, TerminationCondition.maxTimeLimit),
+                         2: (SolverStatus.warning, TerminationCondition.infeasible),
+                         3: (SolverStatus.warning, TerminationCondition.unbounded),
+                         4: (SolverStatus.error, TerminationCondition.error)}
+
+    def __init__(self,
+                 pyomo_model: pyomo.ConcreteModel,
+                 log_name: str = "",
+                 user_solver_options: dict = None):
+        """
+        :param pyomo_model: linear dispatch model
+        :param log_name: dispatch log file name, empty str will result in no log
+        :param user_solver_options: used to update ``scipy.optimize.milp`` options
+            (time_limit, mip_rel_gap, presolve, disp, node_limit)
+        """
+        from hybrid.dispatch.hybrid_dispatch_builder_solver import SolverOptions
+
+        self.pyomo_model = pyomo_model
+        self.log_name = log_name
+        self.solver_options = SolverOptions(dict(self.default_options), log_name, user_solver_options, 'log_file')
+        self.columns = None
+        self.rows = None
+        self.sense = None
+        self.n_solves = 0
+        self.n_compiles = 0
+
+    def compile(self):
+        """
+        Compiles the dispatch model to matrix form, keeping coefficients that depend on mutable Params updatable
+        """
+        model = self.pyomo_model
+        objectives = list(model.component_data_objects(pyomo.Objective, active=True, descend_into=True))
+        if len(objectives) != 1:
+            raise ValueError("Sparse dispatch solver requires exactly one active objective")
+
+        # Unfix variables so that they are kept as columns, fixed values are set through the column bounds
+        fixed_vars = [var for var in model.component_data_objects(pyomo.Var, descend_into=True) if var.fixed]
+        for var in fixed_vars:
+            var.unfix()
+        try:
+            self.rows = list(model.component_data_objects(pyomo.Constraint, active=True, descend_into=True))
+            row_repns = [self._linear_repn(row.body, row.name) for row in self.rows]
+            objective_repn = self._linear_repn(objectives[0].expr, objectives[0].name)
+        finally:
+            for var in fixed_vars:
+                var.fix()
+
+        self.columns = []
+        column_index = {}
+        for repn in row_repns + [objective_repn]:
+            for var in repn.linear_vars:
+                if id(var) not in column_index:
+                    column_index[id(var)] = len(self.columns)
+                    self.columns.append(var)
+
+        row_index, col_index, coefficients, row_lower, row_upper = [], [], [], [], []
+        for i, (row, repn) in enumerate(zip(self.rows, row_repns)):
+            for var, coef in zip(repn.linear_vars, repn.linear_coefs):
+                row_index.append(i)
+                col_index.append(column_index[id(var)])
+                coefficients.append(coef)
+            row_lower.append(-np.inf if row.lower is None else row.lower - repn.constant)
+            row_upper.append(np.inf if row.upper is None else row.upper - repn.constant)
+
+        # csr layout of the coefficients, the position of each coefficient in the csr data is found once
+        n_coefficients = len(coefficients)
+        layout = csr_matrix((np.arange(1, n_coefficients + 1, dtype=float), (row_index, col_index)),
+                            shape=(len(self.rows), len(self.columns)))
+        self.csr_order = layout.data.astype(int) - 1
+        self.A = csr_matrix((np.zeros(n_coefficients), layout.indices, layout.indptr), shape=layout.shape)
+        self.coefficients = _Coefficients(coefficients)
+        self.row_lower = _Coefficients(row_lower)
+        self.row_upper = _Coefficients(row_upper)
+
+        self.sense = objectives[0].sense
+        cost = np.zeros(len(self.columns), dtype=object)
+        for var, coef in zip(objective_repn.linear_vars, objective_repn.linear_coefs):
+            cost[column_index[id(var)]] = coef
+        self.cost = _Coefficients(list(cost))
+        self.cost_offset = _Coefficients([objective_repn.constant])
+        self.n_compiles += 1
+
+    @staticmethod
+    def _linear_repn(expr, name: str):
+        repn = generate_standard_repn(expr, compute_values=False, quadratic=False)
+        if not repn.is_linear():
+            raise ValueError("Sparse dispatch solver requires a linear model, {} is nonlinear".format(name))
+        return repn
+
+    def column_bounds(self) -> tuple:
+        """
+        :returns: current column lower bounds, upper bounds and integrality, fixed variables have equal bounds
+        """
+        n_columns = len(self.columns)
+        col_lb = np.empty(n_columns)
+        col_ub = np.empty(n_columns)
+        integrality = np.zeros(n_columns, dtype=int)
+        for i, var in enumerate(self.columns):
+            if var.fixed:
+                col_lb[i] = col_ub[i] = var.value
+                continue
+            lb, ub = var.bounds
+            col_lb[i] = -np.inf if lb is None else lb
+            col_ub[i] = np.inf if ub is None else ub
+            integrality[i] = var.is_integer()
+        return col_lb, col_ub, integrality
+
+    def solve(self):
+        """
+        Solves the dispatch model for the current horizon
+
+        :returns: pyomo solver results
+        """
+        start = time.perf_counter()
+        if self.columns is None:
+            self.compile()
+        sign = 1.0 if self.sense == pyomo.minimize else -1.0
+        self.A.data[:] = self.coefficients.update()[self.csr_order]
+        c = sign * self.cost.update()
+        offset = float(self.cost_offset.update()[0])
+        col_lb, col_ub, integrality = self.column_bounds()
+
+        constraints = [LinearConstraint(self.A, self.row_lower.update(), self.row_upper.update())] \
+            if len(self.rows) > 0 else []
+        options = {k: v for k, v in self.solver_options.constructed.items() if k != 'log_file'}
+        result = milp(c, integrality=integrality, bounds=Bounds(col_lb, col_ub), constraints=constraints,
+                      options=options)
+        self.n_solves += 1
+
+        if result.x is not None:
+            for var, value, is_integer in zip(self.columns, result.x, integrality):
+                if var.fixed:
+                    continue
+                if is_integer:
+                    value = round(value)
+                var.set_value(float(value), skip_validation=True)
+
+        results = self.create_results(result, sign, offset)
+        results.solver.wallclock_time = time.perf_counter() - start
+        if self.log_name != "":
+            # scipy does not write a HiGHS log file, the instance log holds the solve summary
+            with open(self.instance_log, 'w') as f:
+                f.write(str(results))
+        return results
+
+    def create_results(self, result, sign: float, offset: float) -> SolverResults:
+        """
+        Translates a ``scipy.optimize.milp`` result into pyomo solver results
+        """
+        results = SolverResults()
+        status, condition = self.status_conditions.get(result.status,
+                                                       (SolverStatus.error, TerminationCondition.error))
+        if condition == TerminationCondition.maxTimeLimit and result.x is not None:
+            condition = TerminationCondition.feasible
+        results.solver.status = status
+        results.solver.termination_condition = condition
+        results.solver.message = result.message
+
+        sense = self.sense
+        results.problem.sense = sense
+        results.problem.number_of_constraints = len(self.rows)
+        results.problem.number_of_variables = len(self.columns)
+        results.problem.number_of_nonzeros = self.A.nnz
+        node_count = getattr(result, 'mip_node_count', None)
+        if node_count is not None:
+            results.solver.statistics.branch_and_bound.number_of_created_subproblems = node_count
+        if result.x is not None:
+            objective = sign * result.fun + offset
+            bound = getattr(result, 'mip_dual_bound', None)
+            bound = objective if bound is None or not np.isfinite(bound) else sign * bound + offset
+            if sense == pyomo.minimize:
+                results.problem.upper_bound, results.problem.lower_bound = objective, bound
+            else:
+                results.problem.upper_bound, results.problem.lower_bound = bound, objective
+        else:
+            results.problem.upper_bound = float('inf')
+            results.problem.lower_bound = float('-inf')
+        return results
+
+    @property
+    def instance_log(self) -> str:
+        return self.solver_options.instance_log
@@ -1,3 +1,5 @@
+import time
+
 import pyomo.environ as pyomo
 from pyomo.network import Port, Arc
 from pyomo.environ import units as u
@@ -31,6 +33,7 @@ class HybridDispatch(Dispatch):
         self.load_vars = {key: [] for key in index_set}
         self.ports = {key: [] for key in index_set}
         self.arcs = []
+        self.parameter_update_times = []    # wall clock time of each horizon's time series parameter update [s]
 
         super().__init__(pyomo_model,
                          index_set,
@@ -218,12 +221,16 @@ class HybridDispatch(Dispatch):
 
     def initialize_parameters(self):
         self.time_weighting_factor = 0.995  # Discount factor
+        self.parameter_update_times = []
         for tech in self.power_sources.values():
+            tech.dispatch.clear_time_series()
             tech.dispatch.initialize_parameters()
 
     def update_time_series_parameters(self, start_time: int):
+        update_start = time.perf_counter()
         for tech in self.power_sources.values():
             tech.dispatch.update_time_series_parameters(start_time)
+        self.parameter_update_times.append(time.perf_counter() - update_start)
 
     def _delete_objective(self):
         if hasattr(self.model, "objective"):
@@ -349,6 +356,11 @@ class HybridDispatch(Dispatch):
     def time_weighting_factor_list(self) -> list:
         return [self.blocks[t].time_weighting_factor.value for t in self.blocks.index_set()]
 
+    @property
+    def parameter_update_time(self) -> float:
+        """Total wall clock time of time series parameter updates since parameters were initialized [s]"""
+        return sum(self.parameter_update_times)
+
     # Outputs
     @property
     def objective_value(self):
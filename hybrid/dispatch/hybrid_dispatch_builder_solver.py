@@ -2,6 +2,12 @@ from typing import Union
 import sys, os
 from pathlib import Path
 import time
+import math
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import numpy as np
+import pandas as pd
 
 import pyomo.environ as pyomo
 from pyomo.network import Port, Arc
@@ -10,8 +16,34 @@ from pyomo.util.check_units import assert_units_consistent
 
 from hybrid.sites import SiteInfo
 from hybrid.dispatch import HybridDispatch, HybridDispatchOptions, DispatchProblemState
+from hybrid.dispatch.dispatch import DispatchSnapshot
+from hybrid.dispatch.power_sources.power_source_dispatch import PowerSourceDispatch
+from hybrid.dispatch.dispatch_solver_session import DispatchSolverSession
+from hybrid.dispatch.dispatch_relaxation import DispatchRelaxation
 from hybrid.clustering import Clustering
 
+# Builder solver used by processes forked in ``HybridDispatchBuilderSolver.simulate_clusters_parallel`` and
+# ``HybridDispatchBuilderSolver.simulate_segments_parallel``
+_process_builder = None
+
+
+def _simulate_cluster_in_process(clusterid: int, initial_states: dict):
+    builder = _process_builder
+    n_solves = len(builder.problem_state.start_time)
+    builder.simulate_cluster(clusterid, initial_states)
+    metrics = builder.problem_state.get_metrics(n_solves)
+    time_start, time_stop = builder.clustering.get_soln_start_end_times(clusterid)
+    return builder.get_stored_outputs(time_start, time_stop), metrics
+
+
+def _simulate_segment_in_process(start_day: int, end_day: int):
+    builder = _process_builder
+    n_solves = len(builder.problem_state.start_time)
+    n_warm_up_sims = builder.simulate_segment(start_day, end_day)
+    metrics = builder.problem_state.get_metrics(n_solves + n_warm_up_sims)
+    return builder.get_stored_outputs(start_day * 24, end_day * 24), metrics
+
+
 class HybridDispatchBuilderSolver:
     """Helper class for building hybrid system dispatch problem, solving dispatch problem, and simulating system
     with dispatch solution."""
@@ -29,6 +61,9 @@ class HybridDispatchBuilderSolver:
 
         """
         self.opt = None
+        self.relaxation = None      # set if dispatch is solved as LP relaxation, see DispatchRelaxation
+        self.segment_start_days = []    # first day of each segment when simulating the year in segments
+        self.pipeline_stats = {'hits': 0, 'misses': 0, 'time_saved': 0.0}   # see pipeline_report
         self.site: SiteInfo = site
         self.power_sources = power_sources
         self.options = HybridDispatchOptions(dispatch_options)
@@ -38,8 +73,19 @@ class HybridDispatchBuilderSolver:
             os.remove(self.options.log_name)
 
         self.needs_dispatch = any(item in ['battery', 'tower', 'trough'] for item in self.power_sources.keys())
+        self.is_fast_heuristic = self.needs_dispatch and self._check_fast_heuristic()
 
-        if self.needs_dispatch:
+        if self.is_fast_heuristic:
+            # Battery heuristic dispatch is computed without a Pyomo dispatch model
+            self._pyomo_model = None
+            self._dispatch = None
+            battery = self.power_sources['battery']
+            battery._dispatch = self.options.fast_battery_dispatch_class(battery._system_model,
+                                                                         battery._financial_model,
+                                                                         self.options.n_look_ahead_periods)
+            self.problem_state = DispatchProblemState()
+        elif self.needs_dispatch:
+            build_start = time.perf_counter()
             self._pyomo_model = self._create_dispatch_optimization_model()
             if self.site.follow_desired_schedule:
                 self.dispatch.create_min_operating_cost_objective()
@@ -47,7 +93,11 @@ class HybridDispatchBuilderSolver:
                 self.dispatch.create_max_gross_profit_objective()
             self.dispatch.create_arcs()
             assert_units_consistent(self.pyomo_model)
+            if self.options.lp_relaxation:
+                self.relaxation = DispatchRelaxation(self.pyomo_model,
+                                                     [tech.dispatch for tech in self.power_sources.values()])
             self.problem_state = DispatchProblemState()
+            self.problem_state.model_build_time = time.perf_counter() - build_start
         
         # Clustering (optional)
         self.clustering = None
@@ -55,6 +105,7 @@ class HybridDispatchBuilderSolver:
             #TODO: Add resource data for wind
             self.clustering = Clustering(power_sources.keys(), self.site.solar_resource.filename, wind_resource_data = None, price_data = self.site.elec_prices.data)
             self.clustering.n_cluster = self.options.n_clusters
+            self.clustering.cache_dir = self.options.clustering_cache_dir
             if len(self.options.clustering_weights.keys()) == 0:
                 self.clustering.use_default_weights = True
             elif self.options.clustering_divisions.keys() != self.options.clustering_weights.keys():
@@ -66,6 +117,37 @@ class HybridDispatchBuilderSolver:
                 self.clustering.use_default_weights = False
             self.clustering.run_clustering()  # Create clusters and find exemplar days for simulation
 
+    def reset_run_state(self):
+        """
+        Resets problem metrics, pipeline statistics and relaxation counters of earlier simulations, e.g., when the
+        hybrid simulation is restored for another design candidate. The dispatch model is kept.
+        """
+        if hasattr(self, 'problem_state'):
+            model_build_time = self.problem_state.model_build_time
+            self.problem_state = DispatchProblemState()
+            self.problem_state.model_build_time = model_build_time
+        self.pipeline_stats = {'hits': 0, 'misses': 0, 'time_saved': 0.0}
+        self.segment_start_days = []
+        if self.relaxation is not None:
+            self.relaxation.n_solves = 0
+            self.relaxation.n_fallbacks = 0
+
+    def _check_fast_heuristic(self) -> bool:
+        """
+        :returns: True if battery heuristic dispatch is computed without a Pyomo dispatch model
+        """
+        if not self.options.fast_heuristic:
+            return False
+        if 'heuristic' not in self.options.battery_dispatch:
+            print("Warning: 'fast_heuristic' requires 'heuristic' or 'one_cycle_heuristic' battery dispatch. "
+                  "Building the dispatch model")
+            return False
+        if not set(self.power_sources.keys()) <= {'pv', 'wind', 'battery', 'grid'} or self.options.use_clustering:
+            print("Warning: 'fast_heuristic' supports pv, wind, battery and grid systems without clustering. "
+                  "Building the dispatch model")
+            return False
+        return True
+
     def _create_dispatch_optimization_model(self):
         """
         Creates monolith dispatch model
@@ -99,6 +181,9 @@ class HybridDispatchBuilderSolver:
                     model.forecast_horizon,
                     tech._system_model,
                     tech._financial_model)
+                if isinstance(tech._dispatch, PowerSourceDispatch):
+                    # generation may be assigned to the technology instead of simulated by its system model
+                    tech._dispatch.generation_source = partial(getattr, tech, 'generation_profile')
 
         self._dispatch = HybridDispatch(
             model,
@@ -109,6 +194,20 @@ class HybridDispatchBuilderSolver:
 
     def solve_dispatch_model(self, start_time: int, n_days: int):
         # Solve dispatch model
+        if self.relaxation is not None:
+            solver_results = self.relaxation.solve(self.solve_model)
+        else:
+            solver_results = self.solve_model()
+
+        self.problem_state.store_problem_metrics(solver_results, start_time, n_days,
+                                                 self.dispatch.objective_value)
+
+    def solve_model(self):
+        """
+        Solves the dispatch model for the current horizon using the selected solver
+
+        :returns: pyomo solver results
+        """
         if self.options.solver == 'glpk':
             solver_results = self.glpk_solve()
         elif self.options.solver == 'cbc':
@@ -121,11 +220,13 @@ class HybridDispatchBuilderSolver:
             solver_results = self.gurobi_ampl_solve()
         elif self.options.solver == 'gurobi':
             solver_results = self.gurobi_solve()
+        elif self.options.solver in DispatchSolverSession.backends:
+            solver_results = self.session_solve()
+        elif self.options.solver == 'sparse_highs':
+            solver_results = self.sparse_solve()
         else:
             raise ValueError("{} is not a supported solver".format(self.options.solver))
-
-        self.problem_state.store_problem_metrics(solver_results, start_time, n_days,
-                                                 self.dispatch.objective_value)
+        return solver_results
 
     @staticmethod
     def glpk_solve_call(pyomo_model: pyomo.ConcreteModel,
@@ -280,6 +381,35 @@ class HybridDispatchBuilderSolver:
                                                                         self.pyomo_model,
                                                                         self.options.log_name,
                                                                         self.options.solver_options)
+    def session_solve(self):
+        if self.opt is None:
+            self.opt = DispatchSolverSession(self.pyomo_model,
+                                             self.options.solver,
+                                             self.options.n_roll_periods,
+                                             self.options.solver_warm_start,
+                                             self.options.log_name,
+                                             self.options.solver_options)
+
+        results = self.opt.solve()
+        HybridDispatchBuilderSolver.log_and_solution_check(self.options.log_name, self.opt.instance_log, results.solver.termination_condition, self.pyomo_model)
+        return results
+
+    def sparse_solve(self):
+        if self.opt is None:
+            # imported here, so scipy.optimize.milp is only required by the sparse_highs solver
+            try:
+                from hybrid.dispatch.dispatch_sparse_solver import SparseDispatchSolver
+            except ImportError as e:
+                raise ImportError("The 'sparse_highs' dispatch solver requires scipy>=1.9 (scipy.optimize.milp), "
+                                  "install it with 'pip install HOPP[sparse]'") from e
+            self.opt = SparseDispatchSolver(self.pyomo_model,
+                                            self.options.log_name,
+                                            self.options.solver_options)
+
+        results = self.opt.solve()
+        HybridDispatchBuilderSolver.log_and_solution_check(self.options.log_name, self.opt.instance_log, results.solver.termination_condition, self.pyomo_model)
+        return results
+
     @staticmethod
     def mindtpy_solve_call(pyomo_model: pyomo.ConcreteModel,
                            log_name: str = ""):
@@ -363,9 +493,31 @@ class HybridDispatchBuilderSolver:
             print("Dispatch optimization not required...")
             return
         ti = list(range(0, self.site.n_timesteps, self.options.n_roll_periods))
-        self.dispatch.initialize_parameters()
+        if self.is_fast_heuristic:
+            self.initialize_fast_heuristic()
+        else:
+            self.dispatch.initialize_parameters()
 
-        if self.clustering is None:
+        is_test_year = self.options.is_test_start_year or self.options.is_test_end_year
+        is_segmented = self.clustering is None and self.options.n_segments > 1 and not is_test_year
+        if is_segmented and 'fork' not in mp.get_all_start_methods():
+            print("Warning: Parallel segment simulation requires the 'fork' process start method. "
+                  "Simulating the year in series")
+            is_segmented = False
+
+        if is_segmented:
+            # Solving segments of the year in parallel
+            self.simulate_segments_parallel()
+        elif self.clustering is None and self.options.pipeline_dispatch and 'heuristic' not in self.options.battery_dispatch:
+            # Solving the year in series, overlapping plant simulations with solves of the next horizon
+            n_days = self.site.n_timesteps // self.site.n_periods_per_day
+            if not is_test_year:
+                self.simulate_with_dispatch(0, n_days)
+            if self.options.is_test_start_year:
+                self.simulate_with_dispatch(0, min(5, n_days))
+            if self.options.is_test_end_year and n_days > 360:
+                self.simulate_with_dispatch(360 * self.site.n_periods_per_day, n_days - 360)
+        elif self.clustering is None:
             # Solving the year in series
             for i, t in enumerate(ti):
                 if self.options.is_test_start_year or self.options.is_test_end_year:
@@ -388,44 +540,228 @@ class HybridDispatchBuilderSolver:
             initial_states = {tech:{'day':[], 'soc':[], 'load':[]} for tech in ['trough', 'tower', 'battery'] if tech in self.power_sources.keys()}  # List of known charge states at 12 am from completed simulations
             npercluster = self.clustering.clusters['count']
             inds = sorted(range(len(npercluster)), key=npercluster.__getitem__)  # Indicies to sort clusters by low-to-high number of days represented
-            for i in range(self.clustering.clusters['n_cluster']):
-                j = inds[i]  # cluster index
-                time_start, time_stop = self.clustering.get_sim_start_end_times(j)
-                battery_soc = self.clustering.battery_soc_heuristic(j, initial_states['battery']) if 'battery' in self.power_sources.keys() else None
-
-                # Set CSP initial states (need to do this prior to update_time_series_parameters() or update_initial_conditions(), both pull from the stored plant state)
-                for tech in ['trough', 'tower']:
-                    if tech in self.power_sources.keys():
-                        self.power_sources[tech].plant_state = self.power_sources[tech].set_initial_plant_state()  # Reset to default initial state
-                        csp_soc, is_cycle_on, initial_cycle_load = self.clustering.csp_initial_state_heuristic(j, self.power_sources[tech].solar_multiple, initial_states[tech])
-                        self.power_sources[tech].set_tes_soc(csp_soc)  
-                        self.power_sources[tech].set_cycle_state(is_cycle_on)  
-                        self.power_sources[tech].set_cycle_load(initial_cycle_load)
-
-                self.simulate_with_dispatch(time_start, self.clustering.ndays+1, battery_soc, n_initial_sims = 1)  
-
-                # Update lists of known states at 12am
-                for tech in ['trough', 'tower', 'battery']: 
-                    if tech in self.power_sources.keys():
-                        for d in range(self.clustering.ndays):
-                            day  = self.clustering.sim_start_days[j]+d
-                            initial_states[tech]['day'].append(day)
-                            if tech in ['trough', 'tower']:
-                                initial_states[tech]['soc'].append(self.power_sources[tech].get_tes_soc(day*24))
-                                initial_states[tech]['load'].append(self.power_sources[tech].get_cycle_load(day*24))
-                            elif tech in ['battery']:
-                                step = day*24 * int(self.site.n_timesteps/8760)
-                                initial_states[tech]['soc'].append(self.power_sources[tech].Outputs.SOC[step])
+
+            if self.options.clustering_n_processes > 1 and 'fork' in mp.get_all_start_methods():
+                self.simulate_clusters_parallel(inds, initial_states)
+            else:
+                if self.options.clustering_n_processes > 1:
+                    print("Warning: Parallel exemplar simulation requires the 'fork' process start method. "
+                          "Simulating exemplar groups in series")
+                for j in inds:
+                    self.simulate_cluster(j, initial_states)
+                    self.store_cluster_initial_states(j, initial_states)
 
             # After exemplar simulations, update to full annual generation array for dispatchable technologies
             for tech in self.power_sources.keys():
                 if tech in ['battery']:
                     for key in ['gen', 'P', 'SOC']:
                         val = getattr(self.power_sources[tech].Outputs, key)
-                        setattr(self.power_sources[tech].Outputs, key, list(self.clustering.compute_annual_array_from_cluster_exemplar_data(val)))
+                        setattr(self.power_sources[tech].Outputs, key, np.array(self.clustering.compute_annual_array_from_cluster_exemplar_data(val)))
                 elif tech in ['trough', 'tower']:
                     for key in ['gen', 'P_out_net', 'P_cycle', 'q_dot_pc_startup', 'q_pc_startup', 'e_ch_tes', 'eta', 'q_pb']:  # Data quantities used in capacity value calculations
-                        self.power_sources[tech].outputs.ssc_time_series[key] = list(self.clustering.compute_annual_array_from_cluster_exemplar_data(self.power_sources[tech].outputs.ssc_time_series[key])) 
+                        self.power_sources[tech].outputs.ssc_time_series[key] = np.array(self.clustering.compute_annual_array_from_cluster_exemplar_data(self.power_sources[tech].outputs.ssc_time_series[key]))
+
+    def simulate_cluster(self, clusterid: int, initial_states: dict):
+        """
+        Simulates the exemplar days of a cluster, using initial states interpolated from previously simulated days
+
+        :param clusterid: cluster index
+        :param initial_states: known states at 12 am from completed simulations, by technology
+        """
+        time_start, time_stop = self.clustering.get_sim_start_end_times(clusterid)
+        battery_soc = self.clustering.battery_soc_heuristic(clusterid, initial_states['battery']) if 'battery' in self.power_sources.keys() else None
+
+        # Set CSP initial states (need to do this prior to update_time_series_parameters() or update_initial_conditions(), both pull from the stored plant state)
+        for tech in ['trough', 'tower']:
+            if tech in self.power_sources.keys():
+                self.power_sources[tech].plant_state = self.power_sources[tech].set_initial_plant_state()  # Reset to default initial state
+                csp_soc, is_cycle_on, initial_cycle_load = self.clustering.csp_initial_state_heuristic(clusterid, self.power_sources[tech].solar_multiple, initial_states[tech])
+                self.power_sources[tech].set_tes_soc(csp_soc)
+                self.power_sources[tech].set_cycle_state(is_cycle_on)
+                self.power_sources[tech].set_cycle_load(initial_cycle_load)
+
+        self.simulate_with_dispatch(time_start, self.clustering.ndays+1, battery_soc, n_initial_sims = 1)
+
+    def store_cluster_initial_states(self, clusterid: int, initial_states: dict):
+        """
+        Updates lists of known states at 12 am with the simulated exemplar days of a cluster
+
+        :param clusterid: cluster index
+        :param initial_states: known states at 12 am from completed simulations, by technology
+        """
+        for tech in ['trough', 'tower', 'battery']:
+            if tech in self.power_sources.keys():
+                for d in range(self.clustering.ndays):
+                    day  = self.clustering.sim_start_days[clusterid]+d
+                    initial_states[tech]['day'].append(day)
+                    if tech in ['trough', 'tower']:
+                        initial_states[tech]['soc'].append(self.power_sources[tech].get_tes_soc(day*24))
+                        initial_states[tech]['load'].append(self.power_sources[tech].get_cycle_load(day*24))
+                    elif tech in ['battery']:
+                        step = day*24 * int(self.site.n_timesteps/8760)
+                        initial_states[tech]['soc'].append(self.power_sources[tech].Outputs.SOC[step])
+
+    def simulate_clusters_parallel(self, cluster_order: list, initial_states: dict):
+        """
+        Simulates exemplar groups on a process pool. Each forked process holds its own copy of the dispatch model and
+        technology models. Groups are submitted in waves of ``clustering_n_processes`` (if ``clustering_waves``) so
+        that initial state heuristics see the days solved in previous waves.
+
+        :param cluster_order: cluster indices in simulation order
+        :param initial_states: known states at 12 am from completed simulations, by technology
+        """
+        global _process_builder
+        n_processes = min(self.options.clustering_n_processes, len(cluster_order))
+        wave_size = n_processes if self.options.clustering_waves else len(cluster_order)
+
+        _process_builder = self
+        try:
+            with mp.get_context('fork').Pool(processes=n_processes) as pool:
+                for w in range(0, len(cluster_order), wave_size):
+                    wave = cluster_order[w:w + wave_size]
+                    results = pool.starmap(_simulate_cluster_in_process, [(j, initial_states) for j in wave])
+                    for outputs, metrics in results:
+                        self.set_stored_outputs(outputs)
+                        self.problem_state.append_metrics(metrics)
+                    for j in wave:
+                        self.store_cluster_initial_states(j, initial_states)
+        finally:
+            _process_builder = None
+
+    def get_segment_days(self, n_days: int = None) -> list:
+        """
+        Splits the simulation year into ``n_segments`` contiguous segments of whole days
+
+        :param n_days: (optional) number of simulated days from the start of the year, defaults to the whole year
+        :returns: list of (start day, end day) tuples
+        """
+        if n_days is None:
+            n_days = int(self.site.n_timesteps / self.site.n_periods_per_day)
+        n_segments = max(min(self.options.n_segments, n_days), 1)
+        bounds = np.linspace(0, n_days, n_segments + 1).round().astype(int)
+        return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+
+    def simulate_segment(self, start_day: int, end_day: int) -> int:
+        """
+        Simulates a segment of days with dispatch. The segment is preceded by up to ``segment_warm_up_days`` of
+        simulation, which are not stored, to estimate the storage state at the segment boundary.
+
+        :param start_day: first day of segment
+        :param end_day: day after the last day of segment
+        :returns: number of warm-up dispatch horizons
+        """
+        warm_up_days = min(self.options.segment_warm_up_days, start_day)
+        n_warm_up_sims = len(range(0, warm_up_days * self.site.n_periods_per_day, self.options.n_roll_periods))
+        self.simulate_with_dispatch((start_day - warm_up_days) * self.site.n_periods_per_day,
+                                    end_day - start_day + warm_up_days,
+                                    n_initial_sims=n_warm_up_sims)
+        return n_warm_up_sims
+
+    def simulate_segments_parallel(self, n_days: int = None):
+        """
+        Simulates the year as ``n_segments`` segments on a process pool, each forked process holds its own copy of the
+        dispatch model and technology models. Stored outputs and problem metrics are stitched back in time order.
+
+        :param n_days: (optional) number of simulated days from the start of the year, defaults to the whole year
+        """
+        global _process_builder
+        segments = self.get_segment_days(n_days)
+        self.segment_start_days = [start for start, _ in segments]
+
+        _process_builder = self
+        try:
+            with mp.get_context('fork').Pool(processes=len(segments)) as pool:
+                results = pool.starmap(_simulate_segment_in_process, segments)
+        finally:
+            _process_builder = None
+
+        for outputs, metrics in results:
+            self.set_stored_outputs(outputs)
+            self.problem_state.append_metrics(metrics)
+
+    def dispatch_deviation_report(self, reference: 'HybridDispatchBuilderSolver') -> dict:
+        """
+        Compares dispatch objective and dispatchable technology energy against a reference simulation, e.g., a serial
+        simulation of the same plant compared to a segmented simulation
+
+        :param reference: dispatch builder solver of the reference simulation
+        :returns: dict of totals and relative deviations
+        """
+        def relative_deviation(value, reference_value):
+            if reference_value == 0:
+                return 0.0 if value == 0 else float('inf')
+            return (value - reference_value) / abs(reference_value)
+
+        report = {'objective': sum(self.problem_state.objective),
+                  'reference_objective': sum(reference.problem_state.objective)}
+        report['objective_deviation'] = relative_deviation(report['objective'], report['reference_objective'])
+
+        for tech in self.power_sources.keys():
+            if tech in ['battery']:
+                energy = self.power_sources[tech].Outputs.gen
+                reference_energy = reference.power_sources[tech].Outputs.gen
+                soc = np.array(self.power_sources[tech].Outputs.SOC)
+                reference_soc = np.array(reference.power_sources[tech].Outputs.SOC)
+                boundaries = [int(d * self.site.n_periods_per_day) for d in self.segment_start_days]
+                report[tech + '_boundary_soc_deviation'] = (float(np.max(np.abs(soc[boundaries]
+                                                                                - reference_soc[boundaries])))
+                                                            if len(boundaries) else 0.0)
+            elif tech in ['trough', 'tower']:
+                energy = self.power_sources[tech].outputs.ssc_time_series['gen']
+                reference_energy = reference.power_sources[tech].outputs.ssc_time_series['gen']
+            else:
+                continue
+            report[tech + '_energy_kwh'] = float(np.sum(energy))
+            report[tech + '_reference_energy_kwh'] = float(np.sum(reference_energy))
+            report[tech + '_energy_deviation'] = relative_deviation(report[tech + '_energy_kwh'],
+                                                                    report[tech + '_reference_energy_kwh'])
+        return report
+
+    def get_stored_outputs(self, time_start: int, time_stop: int) -> dict:
+        """
+        Gets stored outputs of dispatchable technologies over a window of the simulation year
+
+        :param time_start: first hour of window
+        :param time_stop: hour after the last hour of window
+        :returns: dict of technology, output group, output name: (annual array length, first index, windowed values)
+        """
+        def window(values, steps_per_hour):
+            i, j = int(time_start * steps_per_hour), int(time_stop * steps_per_hour)
+            return len(values), i, np.array(values[i:j])
+
+        outputs = {}
+        for tech, model in self.power_sources.items():
+            if tech in ['battery']:
+                steps_per_hour = self.site.n_timesteps / 8760
+                outputs[tech] = {'Outputs': {key: window(val, steps_per_hour) for key, val in vars(model.Outputs).items()
+                                             if isinstance(val, np.ndarray)}}
+            elif tech in ['trough', 'tower']:
+                steps_per_hour = model.ssc.get('time_steps_per_hour')
+                outputs[tech] = {'ssc_time_series': {key: window(val, steps_per_hour)
+                                                     for key, val in model.outputs.ssc_time_series.items()},
+                                 'dispatch': {key: window(val, 1) for key, val in model.outputs.dispatch.items()}}
+        return outputs
+
+    def set_stored_outputs(self, stored_outputs: dict):
+        """
+        Sets outputs of dispatchable technologies over a window of the simulation year
+
+        :param stored_outputs: outputs from ``get_stored_outputs``
+        """
+        for tech, groups in stored_outputs.items():
+            model = self.power_sources[tech]
+            for group, values in groups.items():
+                if group == 'Outputs':
+                    for key, (n, i, val) in values.items():
+                        getattr(model.Outputs, key)[i:i + len(val)] = val
+                elif group == 'ssc_time_series':
+                    for key, (n, i, val) in values.items():
+                        series = model.outputs.ssc_time_series.setdefault(key, np.zeros(n))
+                        series[i:i + len(val)] = val
+                elif group == 'dispatch':
+                    for key, (n, i, val) in values.items():
+                        series = model.outputs.dispatch.setdefault(key, [0.0] * n)
+                        series[i:i + len(val)] = val.tolist()
 
     def simulate_with_dispatch(self,
                                start_time: int,
@@ -437,60 +773,306 @@ class HybridDispatchBuilderSolver:
                                            start_time + n_days * self.site.n_periods_per_day,
                                            self.options.n_roll_periods))
 
+        if self.is_fast_heuristic:
+            self.simulate_with_fast_heuristic(update_dispatch_times, initial_soc, n_initial_sims)
+            return
+        if self.options.pipeline_dispatch and 'heuristic' not in self.options.battery_dispatch:
+            self.simulate_with_dispatch_pipelined(update_dispatch_times, n_days, initial_soc, n_initial_sims)
+            return
+
         for i, sim_start_time in enumerate(update_dispatch_times):
+            n_solves = self.problem_state.n_solves
+            phase_start = time.perf_counter()
             # Update battery initial state of charge
             if 'battery' in self.power_sources.keys():
                 self.power_sources['battery'].dispatch.update_dispatch_initial_soc(initial_soc=initial_soc)
                 initial_soc = None
+            phase_times = {'state_readback_time': time.perf_counter() - phase_start}
 
-            for model in self.power_sources.values():
-                if model.system_capacity_kw == 0:
-                    continue
-                model.dispatch.update_time_series_parameters(sim_start_time)
-
-            if self.site.follow_desired_schedule:
-                n_horizon = len(self.power_sources['grid'].dispatch.blocks.index_set())
-                if start_time + n_horizon > len(self.site.desired_schedule):
-                    system_limit = list(self.site.desired_schedule[start_time:])
-                    system_limit.extend(list(self.site.desired_schedule[0:n_horizon - len(system_limit)]))
-                else:
-                    system_limit = self.site.desired_schedule[start_time:start_time + n_horizon]
-
-                transmission_limit = self.power_sources['grid'].value('grid_interconnection_limit_kwac') / 1e3
-                for count, value in enumerate(system_limit):
-                    if value > transmission_limit:
-                        print('Warning: Desired schedule is greater than transmission limit. '
-                              'Overwriting schedule to transmission limit')
-                        system_limit[count] = transmission_limit
-
-                self.power_sources['grid'].dispatch.generation_transmission_limit = system_limit
+            phase_start = time.perf_counter()
+            self.update_horizon_parameters(start_time, sim_start_time)
+            phase_times['update_parameters_time'] = time.perf_counter() - phase_start
 
+            phase_start = time.perf_counter()
             if 'heuristic' in self.options.battery_dispatch:
                 # TODO: this is not a good way to do this... This won't work with CSP addition...
                 self.battery_heuristic()
                 # TODO: we could just run the csp model without dispatch here
             else:
                 self.solve_dispatch_model(start_time, n_days)
-            
-            store_outputs = True
-            battery_sim_start_time = sim_start_time
-            if i < n_initial_sims:
-                store_outputs = False
-                battery_sim_start_time = None
+            phase_times['solve_wall_time'] = time.perf_counter() - phase_start
 
             # simulate using dispatch solution
-            if 'battery' in self.power_sources.keys():
-                self.power_sources['battery'].simulate_with_dispatch(self.options.n_roll_periods,
-                                                                     sim_start_time=battery_sim_start_time)
-
-            if 'trough' in self.power_sources.keys():
-                self.power_sources['trough'].simulate_with_dispatch(self.options.n_roll_periods,
-                                                                    sim_start_time=sim_start_time,
-                                                                    store_outputs=store_outputs)
-            if 'tower' in self.power_sources.keys():
-                self.power_sources['tower'].simulate_with_dispatch(self.options.n_roll_periods,
-                                                                   sim_start_time=sim_start_time,
-                                                                   store_outputs=store_outputs)
+            phase_start = time.perf_counter()
+            self.simulate_plants(sim_start_time, store_outputs=(i >= n_initial_sims))
+            phase_times['plant_simulate_time'] = time.perf_counter() - phase_start
+
+            if self.problem_state.n_solves > n_solves:
+                self.problem_state.store_phase_times(phase_times)
+
+    def update_horizon_parameters(self, start_time: int, sim_start_time: int):
+        """
+        Updates dispatch model time series parameters for the horizon starting at sim_start_time
+
+        :param start_time: first hour of the simulated period, used for the desired schedule
+        :param sim_start_time: first hour of the dispatch horizon
+        """
+        for model in self.power_sources.values():
+            if model.system_capacity_kw == 0:
+                continue
+            model.dispatch.update_time_series_parameters(sim_start_time)
+
+        if self.site.follow_desired_schedule:
+            n_horizon = len(self.power_sources['grid'].dispatch.blocks.index_set())
+            if start_time + n_horizon > len(self.site.desired_schedule):
+                system_limit = list(self.site.desired_schedule[start_time:])
+                system_limit.extend(list(self.site.desired_schedule[0:n_horizon - len(system_limit)]))
+            else:
+                system_limit = self.site.desired_schedule[start_time:start_time + n_horizon]
+
+            transmission_limit = self.power_sources['grid'].value('grid_interconnection_limit_kwac') / 1e3
+            for count, value in enumerate(system_limit):
+                if value > transmission_limit:
+                    print('Warning: Desired schedule is greater than transmission limit. '
+                          'Overwriting schedule to transmission limit')
+                    system_limit[count] = transmission_limit
+
+            self.power_sources['grid'].dispatch.generation_transmission_limit = system_limit
+
+    def simulate_plants(self, sim_start_time: int, store_outputs: bool = True):
+        """
+        Simulates storage and CSP plants over the roll period using the dispatch solution
+
+        :param sim_start_time: first hour of the dispatch horizon
+        :param store_outputs: if False, the plant state is advanced without storing outputs (e.g., warm-up days)
+        """
+        if 'battery' in self.power_sources.keys():
+            self.power_sources['battery'].simulate_with_dispatch(self.options.n_roll_periods,
+                                                                 sim_start_time=sim_start_time if store_outputs
+                                                                 else None)
+
+        if 'trough' in self.power_sources.keys():
+            self.power_sources['trough'].simulate_with_dispatch(self.options.n_roll_periods,
+                                                                sim_start_time=sim_start_time,
+                                                                store_outputs=store_outputs)
+        if 'tower' in self.power_sources.keys():
+            self.power_sources['tower'].simulate_with_dispatch(self.options.n_roll_periods,
+                                                               sim_start_time=sim_start_time,
+                                                               store_outputs=store_outputs)
+
+    def simulate_with_dispatch_pipelined(self,
+                                         update_dispatch_times: list,
+                                         n_days: int,
+                                         initial_soc: float = None,
+                                         n_initial_sims: int = 0):
+        """
+        Simulates with dispatch, overlapping each plant simulation with the next horizon's dispatch solve.
+
+        The next horizon is solved speculatively from the plant state predicted by the current dispatch solution, while
+        the plant is simulated from a snapshot of that solution. When the realised plant state differs from the
+        prediction by more than ``pipeline_state_tolerance``, the next horizon is solved again from the realised state.
+
+        :param update_dispatch_times: start time of each dispatch horizon
+        :param n_days: number of simulated days
+        :param initial_soc: (optional) battery initial state of charge [%]
+        :param n_initial_sims: number of first horizons simulated without storing outputs
+        """
+        plants = [tech for tech in ('battery', 'trough', 'tower') if tech in self.power_sources.keys()]
+        n_roll = self.options.n_roll_periods
+
+        # First horizon in series. Problem metrics and the desired schedule use the start time of each horizon.
+        if 'battery' in self.power_sources.keys():
+            self.power_sources['battery'].dispatch.update_dispatch_initial_soc(initial_soc=initial_soc)
+        self.update_horizon_parameters(update_dispatch_times[0], update_dispatch_times[0])
+        self.solve_dispatch_model(update_dispatch_times[0], n_days)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for i, sim_start_time in enumerate(update_dispatch_times):
+                n_solves = self.problem_state.n_solves
+                is_last = (i == len(update_dispatch_times) - 1)
+                snapshots = {tech: DispatchSnapshot(self.power_sources[tech].dispatch,
+                                                    self.power_sources[tech].dispatch_solution_names)
+                             for tech in plants}
+                phase_times = {}
+                solve = None
+                if not is_last:
+                    phase_start = time.perf_counter()
+                    predicted = {tech: self.power_sources[tech].dispatch.predict_initial_state(n_roll)
+                                 for tech in plants}
+                    next_start_time = update_dispatch_times[i + 1]
+                    self.update_horizon_parameters(next_start_time, next_start_time)
+                    for tech in plants:
+                        self.power_sources[tech].dispatch.initial_state = predicted[tech]
+                    phase_times['update_parameters_time'] = time.perf_counter() - phase_start
+                    solve = executor.submit(self._timed_solve_dispatch_model, next_start_time, n_days)
+
+                overlap_start = time.perf_counter()
+                dispatch_models = {tech: self.power_sources[tech]._dispatch for tech in plants}
+                try:
+                    for tech in plants:
+                        self.power_sources[tech]._dispatch = snapshots[tech]
+                    self.simulate_plants(sim_start_time, store_outputs=(i >= n_initial_sims))
+                finally:
+                    for tech in plants:
+                        self.power_sources[tech]._dispatch = dispatch_models[tech]
+                phase_times['plant_simulate_time'] = time.perf_counter() - overlap_start
+
+                if solve is None:
+                    continue
+                solve_time = solve.result()
+                overlap_time = time.perf_counter() - overlap_start
+                phase_times['solve_wall_time'] = solve_time
+                self.pipeline_stats['time_saved'] += phase_times['plant_simulate_time'] + solve_time - overlap_time
+
+                phase_start = time.perf_counter()
+                self.update_plant_initial_states()
+                realised = {tech: self.power_sources[tech].dispatch.initial_state for tech in plants}
+                phase_times['state_readback_time'] = time.perf_counter() - phase_start
+
+                if self.is_initial_state_close(predicted, realised):
+                    self.pipeline_stats['hits'] += 1
+                else:
+                    self.pipeline_stats['misses'] += 1
+                    # the speculative solve's metrics are replaced by the re-solve from the realised state
+                    self.problem_state.truncate(n_solves)
+                    resolve_time = self._timed_solve_dispatch_model(next_start_time, n_days)
+                    phase_times['solve_wall_time'] += resolve_time
+                    self.pipeline_stats['time_saved'] -= resolve_time
+
+                if self.problem_state.n_solves > n_solves:
+                    self.problem_state.store_phase_times(phase_times)
+
+    def _timed_solve_dispatch_model(self, start_time: int, n_days: int) -> float:
+        solve_start = time.perf_counter()
+        self.solve_dispatch_model(start_time, n_days)
+        return time.perf_counter() - solve_start
+
+    def update_plant_initial_states(self):
+        """Sets dispatch model initial states from the simulated plant states"""
+        if 'battery' in self.power_sources.keys():
+            self.power_sources['battery'].dispatch.update_dispatch_initial_soc()
+        for tech in ('trough', 'tower'):
+            if tech in self.power_sources.keys():
+                self.power_sources[tech].dispatch.update_initial_conditions()
+
+    def is_initial_state_close(self, predicted: dict, realised: dict) -> bool:
+        """
+        :param predicted: dict of technology: initial state predicted from the dispatch solution
+        :param realised: dict of technology: initial state of the simulated plant
+        :returns: True if all initial state values agree within ``pipeline_state_tolerance``
+        """
+        tolerance = self.options.pipeline_state_tolerance
+        for tech, state in predicted.items():
+            for name, value in state.items():
+                if not math.isclose(float(realised[tech][name]), float(value), rel_tol=tolerance, abs_tol=tolerance):
+                    return False
+        return True
+
+    def pipeline_report(self) -> dict:
+        """
+        :returns: dict with keys:
+            'hits': speculative solves accepted
+            'misses': speculative solves solved again from the realised plant state
+            'hit_rate': fraction of speculative solves accepted [-]
+            'time_saved': wall clock time saved by overlapping plant simulation and solves [s]
+        """
+        n_speculative = self.pipeline_stats['hits'] + self.pipeline_stats['misses']
+        report = dict(self.pipeline_stats)
+        report['hit_rate'] = self.pipeline_stats['hits'] / n_speculative if n_speculative > 0 else 0.0
+        return report
+
+    def benchmark_relaxation(self, start_times: list) -> dict:
+        """
+        Compares dispatch solved as LP relaxation with repair to the exact MILP dispatch, e.g., on representative days.
+        Each horizon is solved from the initial plant state, plants are not simulated.
+
+        :param start_times: start time of each benchmark dispatch horizon
+        :returns: dict with keys:
+            'horizons': DataFrame of MILP and relaxed objective, grid revenue [$] and solve time [s] by start_time
+            'objective_gap': mean relative objective loss of relaxed dispatch [-]
+            'revenue_gap': mean relative grid revenue loss of relaxed dispatch [-]
+            'n_fallbacks': number of horizons solved as MILP after the repair solve failed
+            'speedup': total MILP solve time divided by total relaxed solve time [-]
+        """
+        relaxation = DispatchRelaxation(self.pyomo_model, [tech.dispatch for tech in self.power_sources.values()])
+        sign = 1.0 if self.pyomo_model.objective.sense == pyomo.maximize else -1.0
+        self.dispatch.initialize_parameters()
+
+        horizons = {name: [] for name in ('start_time', 'milp_objective', 'relaxed_objective', 'milp_revenue',
+                                          'relaxed_revenue', 'milp_time', 'relaxed_time')}
+        for start_time in start_times:
+            self.update_horizon_parameters(start_time, start_time)
+            for name, solve in (('milp', self.solve_model),
+                                ('relaxed', lambda: relaxation.solve(self.solve_model))):
+                solve_start = time.perf_counter()
+                solve()
+                horizons[name + '_time'].append(time.perf_counter() - solve_start)
+                horizons[name + '_objective'].append(self.dispatch.objective_value)
+                horizons[name + '_revenue'].append(sum(self.dispatch.electricity_sales)
+                                                   - sum(self.dispatch.electricity_purchases))
+            horizons['start_time'].append(start_time)
+        horizons = pd.DataFrame(horizons)
+
+        def relative_loss(exact, approximate):
+            return ((exact - approximate) / exact.abs()).where(exact != 0.0, 0.0)
+
+        horizons['objective_gap'] = sign * relative_loss(horizons['milp_objective'], horizons['relaxed_objective'])
+        horizons['revenue_gap'] = relative_loss(horizons['milp_revenue'], horizons['relaxed_revenue'])
+        relaxed_time = horizons['relaxed_time'].sum()
+        return {'horizons': horizons,
+                'objective_gap': float(horizons['objective_gap'].mean()),
+                'revenue_gap': float(horizons['revenue_gap'].mean()),
+                'n_fallbacks': relaxation.n_fallbacks,
+                'speedup': float(horizons['milp_time'].sum() / relaxed_time) if relaxed_time > 0.0 else float('nan')}
+
+    def initialize_fast_heuristic(self):
+        """
+        Sets battery dispatch parameters and the annual generation, grid limit and prices used by the heuristic
+        """
+        battery_dispatch = self.power_sources['battery'].dispatch
+        battery_dispatch.initialize_parameters()
+
+        gen = np.zeros(self.site.n_timesteps)
+        for tech in ('pv', 'wind'):
+            if tech not in self.power_sources.keys() or self.power_sources[tech].system_capacity_kw == 0:
+                continue
+            tech_gen = np.asarray(self.power_sources[tech].generation_profile, dtype=float) / 1e3
+            if tech == 'pv':
+                tech_gen = np.maximum(tech_gen, 0.0)  # zero out any negative load
+            gen += np.round(np.resize(tech_gen, len(gen)), battery_dispatch.round_digits)
+
+        grid = self.power_sources['grid']
+        grid_limit = np.full(len(gen), grid.value('grid_interconnection_limit_kwac') / 1e3)
+        if self.site.follow_desired_schedule:
+            desired_schedule = np.resize(np.asarray(self.site.desired_schedule, dtype=float), len(gen))
+            if np.any(desired_schedule > grid_limit):
+                print('Warning: Desired schedule is greater than transmission limit. '
+                      'Overwriting schedule to transmission limit')
+            grid_limit = np.minimum(desired_schedule, grid_limit)
+
+        dispatch_factors = np.resize(np.asarray(grid._financial_model.value("dispatch_factors_ts"), dtype=float),
+                                     len(gen))
+        prices = dispatch_factors * grid._financial_model.value("ppa_price_input")[0] * 1e3
+        battery_dispatch.set_annual_inputs(gen, grid_limit, prices)
+
+    def simulate_with_fast_heuristic(self,
+                                     update_dispatch_times: list,
+                                     initial_soc: float = None,
+                                     n_initial_sims: int = 0):
+        """
+        Simulates the battery with heuristic dispatch computed without a Pyomo dispatch model
+
+        :param update_dispatch_times: start time of each dispatch horizon
+        :param initial_soc: (optional) battery initial state of charge [%]
+        :param n_initial_sims: number of first horizons simulated without storing outputs
+        """
+        battery = self.power_sources['battery']
+        for i, sim_start_time in enumerate(update_dispatch_times):
+            battery.dispatch.update_dispatch_initial_soc(initial_soc=initial_soc)
+            initial_soc = None
+            battery.dispatch.set_fixed_dispatch(sim_start_time)
+            battery.simulate_with_dispatch(self.options.n_roll_periods,
+                                           sim_start_time=sim_start_time if i >= n_initial_sims else None)
 
     def battery_heuristic(self):
         tot_gen = [0.0]*self.options.n_look_ahead_periods
@@ -1,5 +1,7 @@
 from hybrid.dispatch import (OneCycleBatteryDispatchHeuristic,
                              SimpleBatteryDispatchHeuristic,
+                             FastBatteryDispatchHeuristic,
+                             FastOneCycleBatteryDispatchHeuristic,
                              SimpleBatteryDispatch,
                              NonConvexLinearVoltageBatteryDispatch,
                              ConvexLinearVoltageBatteryDispatch)
@@ -20,10 +22,16 @@ class HybridDispatchOptions:
 
             dict: {
                 'solver': str (default='glpk'), MILP solver used for dispatch optimization problem
-                    options: ('glpk', 'cbc')
+                    options: ('glpk', 'cbc', 'xpress', 'xpress_persistent', 'gurobi_ampl', 'gurobi',
+                              'appsi_highs', 'appsi_gurobi', 'sparse_highs')
+                    'appsi_*' solvers keep the dispatch model resident in the solver between horizons
+                    'sparse_highs' solves the model as scipy sparse matrices in-process (scipy.optimize.milp, requires scipy>=1.9)
                 'solver_options': dict, Dispatch solver options
+                'solver_warm_start': bool (default=True), 'appsi_*' solvers start from the previous horizon solution
+                'lp_relaxation': bool (default=False), if True, dispatch is solved as the LP relaxation of the MILP followed by a repair solve with on/off states fixed from the relaxed solution (approximately optimal, see DispatchRelaxation)
                 'battery_dispatch': str (default='simple'), sets the battery dispatch model to use for dispatch
                     options: ('simple', 'one_cycle_heuristic', 'heuristic', 'non_convex_LV', 'convex_LV'),
+                'fast_heuristic': bool (default=False), if True, 'heuristic' and 'one_cycle_heuristic' battery dispatch is computed in NumPy without building the Pyomo dispatch model (pv, wind, battery and grid systems without clustering only)
                 'grid_charging': bool (default=True), can the battery charge from the grid,
                 'pv_charging_only': bool (default=False), whether restricted to only charge from PV (ITC qualification)
                 'include_lifecycle_count': bool (default=True), should battery lifecycle counting be included,
@@ -32,15 +40,25 @@ class HybridDispatchOptions:
                 'log_name': str (default=''), dispatch log file name, empty str will result in no log (for development)
                 'is_test_start_year' : bool (default=False), if True, simulation solves for first 5 days of the year
                 'is_test_end_year' : bool (default=False), if True, simulation solves for last 5 days of the year
+                'pipeline_dispatch' : bool (default=False), if True, plant simulation of each horizon runs while the next horizon is solved from the plant state predicted by dispatch
+                'pipeline_state_tolerance' : float (default=0.01), relative and absolute tolerance of realised to predicted plant state, beyond which the next horizon is solved again
+                'n_segments' : int (default = 1). If > 1, the year is split into segments of days that are simulated in parallel processes
+                'segment_warm_up_days' : int (default = 3). Days simulated, but not stored, before each segment to estimate the storage state at its start
                 'use_clustering' : bool (default = False), if True, the simulation will be run for a selected set of "exemplar" days
                 'n_clusters': int (default = 30)
                 'clustering_weights' : dict (default = {}). Custom weights used for classification metrics for data clustering.  If empty, default weights will be used.  
                 'clustering_divisions' : dict (default = {}).  Custom number of averaging periods for classification metrics for data clustering.  If empty, default values will be used.  
+                'clustering_n_processes' : int (default = 1). Number of processes used to simulate exemplar groups in parallel
+                'clustering_waves' : bool (default = True). If True, parallel exemplar groups are simulated in waves of 'clustering_n_processes' so initial state heuristics use days solved in previous waves
+                'clustering_cache_dir' : str (default = ''). Directory of clustering results shared between processes and runs with the same resource, prices and clustering parameters. If empty, results are only reused within a process
                 }
         """
         self.solver: str = 'cbc'
         self.solver_options: dict = {}   # used to update solver options, look at specific solver for option names
+        self.solver_warm_start: bool = True
+        self.lp_relaxation: bool = False
         self.battery_dispatch: str = 'simple'
+        self.fast_heuristic: bool = False
         self.include_lifecycle_count: bool = True
         self.grid_charging: bool = True
         self.pv_charging_only: bool = False
@@ -50,10 +68,19 @@ class HybridDispatchOptions:
         self.is_test_start_year: bool = False
         self.is_test_end_year: bool = False
 
+        self.pipeline_dispatch: bool = False
+        self.pipeline_state_tolerance: float = 0.01
+
+        self.n_segments: int = 1
+        self.segment_warm_up_days: int = 3
+
         self.use_clustering: bool = False
         self.n_clusters: int = 30
         self.clustering_weights: dict = {}
         self.clustering_divisions: dict = {}
+        self.clustering_n_processes: int = 1
+        self.clustering_waves: bool = True
+        self.clustering_cache_dir: str = ''
 
         if dispatch_options is not None:
             for key, value in dispatch_options.items():
@@ -81,9 +108,13 @@ class HybridDispatchOptions:
             'simple': SimpleBatteryDispatch,
             'non_convex_LV': NonConvexLinearVoltageBatteryDispatch,
             'convex_LV': ConvexLinearVoltageBatteryDispatch}
+        self._fast_battery_dispatch_model_options = {
+            'one_cycle_heuristic': FastOneCycleBatteryDispatchHeuristic,
+            'heuristic': FastBatteryDispatchHeuristic}
         if self.battery_dispatch in self._battery_dispatch_model_options:
             self.battery_dispatch_class = self._battery_dispatch_model_options[self.battery_dispatch]
             if 'heuristic' in self.battery_dispatch:
+                self.fast_battery_dispatch_class = self._fast_battery_dispatch_model_options[self.battery_dispatch]
                 # FIXME: This should be set to the number of time steps within a day.
                 #  Dispatch time duration is not set as of now...
                 self.n_roll_periods = 24
@@ -12,6 +12,12 @@ class CspDispatch(Dispatch):
     """
     Dispatch model for Concentrating Solar Power (CSP) with thermal energy storage.
     """
+    # Set from the plant state by update_initial_conditions
+    initial_state_names = ('initial_thermal_energy_storage', 'is_field_generating_initial',
+                           'is_field_starting_initial', 'initial_cycle_startup_inventory',
+                           'initial_cycle_thermal_power', 'is_cycle_generating_initial', 'is_cycle_starting_initial')
+    # Start-up penalty and previous period binaries follow from these states in the repair solve
+    relaxation_state_names = ('is_field_generating', 'is_field_starting', 'is_cycle_generating', 'is_cycle_starting')
 
     def __init__(self,
                  pyomo_model: pyomo.ConcreteModel,
@@ -665,17 +671,12 @@ class CspDispatch(Dispatch):
         self.time_duration = [1.0] * n_horizon  # assume hourly for now
 
         # Set available thermal energy based on forecast
-        thermal_resource = self._system_model.solar_thermal_resource
-        temperature = list(self._system_model.year_weather_df.Temperature.values)
-        if start_time + n_horizon > len(thermal_resource):
-            field_gen = list(thermal_resource[start_time:])
-            field_gen.extend(list(thermal_resource[0:n_horizon - len(field_gen)]))
-
-            dry_bulb_temperature = list(temperature[start_time:])
-            dry_bulb_temperature.extend(list(temperature[0:n_horizon - len(dry_bulb_temperature)]))
-        else:
-            field_gen = thermal_resource[start_time:start_time + n_horizon]
-            dry_bulb_temperature = temperature[start_time:start_time + n_horizon]
+        thermal_resource = self.get_time_series('solar_thermal_resource',
+                                                lambda: self._system_model.solar_thermal_resource)
+        temperature = self.get_time_series('temperature',
+                                           lambda: self._system_model.year_weather_df.Temperature.values)
+        field_gen = self.horizon_series(thermal_resource, start_time)
+        dry_bulb_temperature = self.horizon_series(temperature, start_time)
 
         self.available_thermal_generation = field_gen
         # Set cycle performance parameters that depend on ambient temperature
@@ -755,16 +756,16 @@ class CspDispatch(Dispatch):
         return
 
     def set_cycle_ambient_corrections(self, Tdb, Tpts, etapts, wcondfpts):
-        n = len(Tdb)            # Tdb = set of ambient temperature points for each dispatch time step
-        npts = len(Tpts)        # Tpts = ambient temperature points with tabulated values
-        cycle_ambient_efficiency_correction = [1.0]*n
-        condenser_losses = [0.0]*n
+        Tdb = np.asarray(Tdb, dtype=float)     # Tdb = set of ambient temperature points for each dispatch time step
+        Tpts = np.asarray(Tpts, dtype=float)   # Tpts = ambient temperature points with tabulated values
+        etapts = np.asarray(etapts, dtype=float)
+        wcondfpts = np.asarray(wcondfpts, dtype=float)
+        npts = len(Tpts)
         Tstep = Tpts[1] - Tpts[0]
-        for j in range(n):
-            i = max(0, min( int((Tdb[j] - Tpts[0]) / Tstep), npts-2) )
-            r = (Tdb[j] - Tpts[i]) / Tstep
-            cycle_ambient_efficiency_correction[j] = etapts[i] + (etapts[i + 1] - etapts[i]) * r
-            condenser_losses[j] = wcondfpts[i] + (wcondfpts[i + 1] - wcondfpts[i]) * r
+        i = np.clip(((Tdb - Tpts[0]) / Tstep).astype(int), 0, npts - 2)
+        r = (Tdb - Tpts[i]) / Tstep
+        cycle_ambient_efficiency_correction = etapts[i] + (etapts[i + 1] - etapts[i]) * r
+        condenser_losses = wcondfpts[i] + (wcondfpts[i + 1] - wcondfpts[i]) * r
         self.cycle_ambient_efficiency_correction = cycle_ambient_efficiency_correction
         self.condenser_losses = condenser_losses
         return
@@ -795,17 +796,12 @@ class CspDispatch(Dispatch):
         """Estimates the fraction of time period required for receiver start-up."""
         self.min_receiver_start_time = self._system_model.value('rec_su_delay')
 
-        su_fraction = [1.0] * len(field_gen)
-        epsilon = 1e-6
-        time_duration = self.time_duration
-
-        for i in range(len(field_gen)):
-            su_fraction[i] = min(1.0,
-                                 max(self.min_receiver_start_time / time_duration[i],
-                                     self.receiver_required_startup_energy / max(1e-6,
-                                                                                 field_gen[i] * time_duration[i])
-                                     )
-                                 )
+        field_gen = np.asarray(field_gen, dtype=float)
+        time_duration = np.asarray(self.time_duration, dtype=float)
+        su_fraction = np.minimum(1.0,
+                                 np.maximum(self.min_receiver_start_time / time_duration,
+                                            self.receiver_required_startup_energy / np.maximum(1e-6,
+                                                                                               field_gen * time_duration)))
 
         self.receiver_startup_fraction = su_fraction
 
@@ -842,6 +838,17 @@ class CspDispatch(Dispatch):
         else:
             self.initial_cycle_thermal_power = 0.0
 
+    def predict_initial_state(self, n_periods: int) -> dict:
+        t = n_periods - 1
+        is_cycle_generating = self.is_cycle_generating[t] > 0.5
+        return {'initial_thermal_energy_storage': self.thermal_energy_storage[t],
+                'is_field_generating_initial': self.is_field_generating[t] > 0.5,
+                'is_field_starting_initial': self.is_field_starting[t] > 0.5,
+                'initial_cycle_startup_inventory': self.cycle_startup_inventory[t],
+                'initial_cycle_thermal_power': self.cycle_thermal_power[t] if is_cycle_generating else 0.0,
+                'is_cycle_generating_initial': is_cycle_generating,
+                'is_cycle_starting_initial': self.is_cycle_starting[t] > 0.5}
+
     @staticmethod
     def get_start_end_datetime(start_time: int, n_horizon: int):
         # Setting simulation times
@@ -885,8 +892,7 @@ class CspDispatch(Dispatch):
     def time_duration(self, time_duration: list):
         """Dispatch horizon time steps [hour]"""
         if len(time_duration) == len(self.blocks):
-            for t, delta in zip(self.blocks, time_duration):
-                self.blocks[t].time_duration = round(delta, self.round_digits)
+            self.set_param_values('time_duration', time_duration)
         else:
             raise ValueError(self.time_duration.__name__ + " list must be the same length as time horizon")
 
@@ -899,8 +905,7 @@ class CspDispatch(Dispatch):
     def available_thermal_generation(self, available_thermal_generation: list):
         """Available solar thermal generation from the csp field [MWt]"""
         if len(available_thermal_generation) == len(self.blocks):
-            for t, value in zip(self.blocks, available_thermal_generation):
-                self.blocks[t].available_thermal_generation = round(value, self.round_digits)
+            self.set_param_values('available_thermal_generation', available_thermal_generation)
         else:
             raise ValueError(self.available_thermal_generation.__name__ + " list must be the same length as time horizon")
 
@@ -913,8 +918,7 @@ class CspDispatch(Dispatch):
     def cycle_ambient_efficiency_correction(self, cycle_ambient_efficiency_correction: list):
         """Cycle efficiency ambient temperature adjustment factor [-]"""
         if len(cycle_ambient_efficiency_correction) == len(self.blocks):
-            for t, value in zip(self.blocks, cycle_ambient_efficiency_correction):
-                self.blocks[t].cycle_ambient_efficiency_correction = round(value, self.round_digits)
+            self.set_param_values('cycle_ambient_efficiency_correction', cycle_ambient_efficiency_correction)
         else:
             raise ValueError(self.cycle_ambient_efficiency_correction.__name__ + " list must be the same length as time horizon")
 
@@ -927,8 +931,7 @@ class CspDispatch(Dispatch):
     def condenser_losses(self, condenser_losses: list):
         """Normalized condenser parasitic losses [-]"""
         if len(condenser_losses) == len(self.blocks):
-            for t, value in zip(self.blocks, condenser_losses):
-                self.blocks[t].condenser_losses = round(value, self.round_digits)
+            self.set_param_values('condenser_losses', condenser_losses)
         else:
             raise ValueError(self.condenser_losses.__name__ + " list must be the same length as time horizon")
 
@@ -941,8 +944,7 @@ class CspDispatch(Dispatch):
     def receiver_startup_fraction(self, receiver_startup_fraction: list):
         """Estimated fraction of time period required for receiver start-up [-]"""
         if len(receiver_startup_fraction) == len(self.blocks):
-            for t, value in zip(self.blocks, receiver_startup_fraction):
-                self.blocks[t].receiver_startup_fraction = round(value, self.round_digits)
+            self.set_param_values('receiver_startup_fraction', receiver_startup_fraction)
         else:
             raise ValueError(self.receiver_startup_fraction.__name__ + " list must be the same length as time horizon")
 
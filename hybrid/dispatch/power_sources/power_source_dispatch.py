@@ -20,6 +20,7 @@ class PowerSourceDispatch(Dispatch):
                          system_model,
                          financial_model,
                          block_set_name=block_set_name)
+        self.generation_source = None   # (optional) function returning the full year generation [kW]
 
     @staticmethod
     def dispatch_block_rule(gen):
@@ -65,19 +66,21 @@ class PowerSourceDispatch(Dispatch):
         self.cost_per_generation = self._financial_model.value("om_capacity")[0]*1e3/8760
 
     def update_time_series_parameters(self, start_time: int):
-        n_horizon = len(self.blocks.index_set())
-        generation = self._system_model.value("gen")
-        if start_time + n_horizon > len(generation):
-            horizon_gen = list(generation[start_time:])
-            horizon_gen.extend(list(generation[0:n_horizon - len(horizon_gen)]))
-        else:
-            horizon_gen = generation[start_time:start_time + n_horizon]
-
-        if len(horizon_gen) < len(self.blocks):
+        self.available_generation = self.get_horizon_generation(start_time)
+
+    def get_horizon_generation(self, start_time: int):
+        """
+        :param start_time: hour of the year starting dispatch horizon
+        :returns: system model generation over the dispatch horizon [MW]
+        """
+        generation = self.get_time_series('gen', self.generation_source
+                                          if self.generation_source is not None
+                                          else lambda: self._system_model.value("gen"))
+        if len(generation) < len(self.blocks):
             raise RuntimeError(f"Dispatch parameter update error at start_time {start_time}: System model "
                                f"{type(self._system_model)} generation profile should have at least {len(self.blocks)} "
                                f"length but has only {len(generation)}")
-        self.available_generation = [gen_kw / 1e3 for gen_kw in horizon_gen]
+        return self.horizon_series(generation, start_time) / 1e3
 
     @property
     def cost_per_generation(self) -> float:
@@ -96,8 +99,7 @@ class PowerSourceDispatch(Dispatch):
     @available_generation.setter
     def available_generation(self, resource: list):
         if len(resource) == len(self.blocks):
-            for t, gen in zip(self.blocks, resource):
-                self.blocks[t].available_generation.set_value(round(gen, self.round_digits))
+            self.set_param_values('available_generation', resource)
         else:
             raise ValueError(f"'resource' list ({len(resource)}) must be the same length as time horizon ({len(self.blocks)})")
 
@@ -1,4 +1,5 @@
 from typing import Union
+import numpy as np
 from pyomo.environ import ConcreteModel, Set
 
 import PySAM.Pvsamv1 as Pvsam
@@ -23,5 +24,4 @@ class PvDispatch(PowerSourceDispatch):
         super().__init__(pyomo_model, indexed_set, system_model, financial_model, block_set_name=block_set_name)
 
     def update_time_series_parameters(self, start_time: int):
-        super().update_time_series_parameters(start_time)
-        self.available_generation = [max(0, i) for i in self.available_generation]  # zero out any negative load
+        self.available_generation = np.maximum(self.get_horizon_generation(start_time), 0.0)  # zero out any negative load
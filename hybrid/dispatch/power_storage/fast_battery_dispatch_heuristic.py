@@ -0,0 +1,371 @@
+from typing import Tuple, Union
+import numpy as np
+
+import PySAM.BatteryStateful as BatteryModel
+import PySAM.Singleowner as Singleowner
+
+
+class FastBatteryDispatchHeuristic:
+    """Fixes battery dispatch operations based on user input without a Pyomo dispatch model.
+
+    Same heuristic as ``SimpleBatteryDispatchHeuristic``. Power fraction limits and the fixed dispatch of all horizons in
+    the year are computed at once in NumPy by ``set_annual_inputs``. Each horizon, ``set_fixed_dispatch`` only computes
+    the state-of-charge trajectory from the simulated battery state, so no model is built, updated or solved.
+
+    Currently, enforces available generation and grid limit assuming no battery charging from grid
+    """
+    _system_model: BatteryModel.BatteryStateful
+    _financial_model: Singleowner.Singleowner
+
+    def __init__(self,
+                 system_model: BatteryModel.BatteryStateful,
+                 financial_model: Singleowner.Singleowner,
+                 n_periods: int,
+                 fixed_dispatch: list = None):
+        """
+
+        :param n_periods: number of time periods in dispatch horizon
+        :param fixed_dispatch: list of normalized values [-1, 1] (Charging (-), Discharging (+))
+        """
+        self._system_model = system_model
+        self._financial_model = financial_model
+        self.n_periods = n_periods
+        self.round_digits = int(4)
+
+        # Annual series, see set_annual_inputs
+        self.annual_generation = np.zeros(0)
+        self.annual_grid_limit = np.zeros(0)
+        self.annual_prices = np.zeros(0)
+        self.annual_max_charge_fraction = np.zeros(0)
+        self.annual_max_discharge_fraction = np.zeros(0)
+
+        self.user_fixed_dispatch = list([0.0] * n_periods)
+        if fixed_dispatch is not None:
+            self.user_fixed_dispatch = fixed_dispatch
+
+        self.time_duration = [1.0] * n_periods
+        self.control_variable = "input_power"
+
+        # Current horizon
+        self._horizon_index = np.arange(n_periods)
+        self._fixed_dispatch = np.zeros(n_periods)
+        self._soc = np.zeros(n_periods)
+        self._initial_soc = 0.0
+
+    def initialize_parameters(self):
+        """Sets battery parameters from the system and financial models, rounded as in the Pyomo dispatch model"""
+        self.maximum_power = round(self._financial_model.value("system_capacity") / 1e3, self.round_digits)
+        self.capacity = round(self._system_model.value('nominal_energy') / 1e3, self.round_digits)   # [MWh]
+        self.minimum_soc = round(self._system_model.value('minimum_SOC') / 100., self.round_digits) * 100.
+        self.maximum_soc = round(self._system_model.value('maximum_SOC') / 100., self.round_digits) * 100.
+        efficiency = round((88.0 / 100.) ** (1 / 2), self.round_digits)  # Including converter efficiency
+        self.charge_efficiency = efficiency * 100.
+        self.discharge_efficiency = efficiency * 100.
+        self.initial_soc = self._system_model.value('initial_SOC')
+
+        self._system_model.value("control_mode", 1.0)  # Power control
+        self._system_model.value("input_power", 0.)
+
+    def set_annual_inputs(self, gen: np.ndarray, grid_limit: np.ndarray, prices: np.ndarray = None):
+        """
+        Sets annual inputs and computes the power fraction limits of the year.
+
+        NOTE: This method assumes that battery cannot be charged by the grid.
+
+        :param gen: available generation [MW]
+        :param grid_limit: grid transmission limit for generation [MW]
+        :param prices: electricity sell price [$/MWh]
+        """
+        gen = np.round(np.asarray(gen, dtype=float), self.round_digits)
+        grid_limit = np.round(np.asarray(grid_limit, dtype=float), self.round_digits)
+        if len(gen) != len(grid_limit):
+            raise ValueError("gen must be the same length as grid_limit.")
+        self.annual_generation = gen
+        self.annual_grid_limit = grid_limit
+        self.annual_prices = np.zeros(len(gen)) if prices is None else np.round(np.asarray(prices, dtype=float),
+                                                                               self.round_digits)
+        self.annual_max_charge_fraction = np.clip(gen / self.maximum_power, 0.0, 1.0)
+        self.annual_max_discharge_fraction = np.clip((grid_limit - gen) / self.maximum_power, 0.0, 1.0)
+        self._set_annual_dispatch()
+
+    def _set_annual_dispatch(self):
+        """Enforces power fraction limits on the user fixed dispatch of every horizon in the year"""
+        n_year = len(self.annual_generation)
+        user_fixed_dispatch = np.resize(np.asarray(self.user_fixed_dispatch, dtype=float), n_year)
+        self._annual_fixed_dispatch = np.where(user_fixed_dispatch > 0.0,
+                                               np.minimum(user_fixed_dispatch, self.annual_max_discharge_fraction),
+                                               np.maximum(user_fixed_dispatch, -self.annual_max_charge_fraction))
+
+    def set_fixed_dispatch(self, start_time: int):
+        """Sets fixed dispatch and state-of-charge of the horizon starting at start_time.
+
+        :param start_time: hour of the year starting dispatch horizon
+        """
+        if len(self.annual_generation) == 0:
+            raise ValueError("annual inputs must be set before setting fixed dispatch.")
+        self._horizon_index = np.arange(start_time, start_time + self.n_periods) % len(self.annual_generation)
+        self._fixed_dispatch = self._heuristic_method(start_time)
+        self._soc = self.soc_trajectory(self._fixed_dispatch, self._initial_soc)
+
+    def _heuristic_method(self, start_time: int) -> np.ndarray:
+        """ Does specific heuristic method to fix battery dispatch."""
+        if start_time % self.n_periods == 0:
+            return self._annual_fixed_dispatch[self._horizon_index]
+        # horizons not aligned to the user fixed dispatch
+        user_fixed_dispatch = np.asarray(self.user_fixed_dispatch, dtype=float)
+        return np.where(user_fixed_dispatch > 0.0,
+                        np.minimum(user_fixed_dispatch, self.max_discharge_fraction),
+                        np.maximum(user_fixed_dispatch, -self.max_charge_fraction))
+
+    def soc_changes(self, fixed_dispatch: np.ndarray) -> np.ndarray:
+        """
+        :param fixed_dispatch: normalized dispatch values [-1, 1]
+        :returns: state-of-charge change of each time period [-]
+        """
+        power = fixed_dispatch * self.maximum_power
+        discharge = self.time_duration[0] * (1 / (self.discharge_efficiency / 100.) * power) / self.capacity
+        charge = self.time_duration[0] * (self.charge_efficiency / 100. * power) / self.capacity
+        return -np.where(fixed_dispatch > 0.0, discharge, np.where(fixed_dispatch < 0.0, charge, 0.0))
+
+    def soc_trajectory(self, fixed_dispatch: np.ndarray, soc0: float) -> np.ndarray:
+        """
+        :param fixed_dispatch: normalized dispatch values [-1, 1]
+        :param soc0: initial state-of-charge [-]
+        :returns: state-of-charge at the end of each time period, limited to (0, 1) [-]
+        """
+        changes = self.soc_changes(fixed_dispatch)
+        soc = np.cumsum(np.concatenate(([soc0], changes)))[1:]
+        if len(soc) and (soc.min() < 0.0 or soc.max() > 1.0):
+            # limits are applied each time period
+            for t, change in enumerate(changes):
+                soc0 = max(0.0, min(1.0, soc0 + change))
+                soc[t] = soc0
+        return soc
+
+    def update_dispatch_initial_soc(self, initial_soc: float = None):
+        if initial_soc is not None:
+            self._system_model.value("initial_SOC", initial_soc)
+            self._system_model.setup()
+        self.initial_soc = self._system_model.value('SOC')
+
+    def _check_initial_soc(self, initial_soc):
+        if initial_soc > 1:
+            initial_soc /= 100.
+        initial_soc = round(initial_soc, self.round_digits)
+        if initial_soc > self.maximum_soc/100:
+            print("Warning: Storage dispatch was initialized with a state-of-charge greater than maximum value!")
+            print("Initial SOC = {}".format(initial_soc))
+            print("Initial SOC was set to maximum value.")
+            initial_soc = self.maximum_soc / 100
+        elif initial_soc < self.minimum_soc/100:
+            print("Warning: Storage dispatch was initialized with a state-of-charge less than minimum value!")
+            print("Initial SOC = {}".format(initial_soc))
+            print("Initial SOC was set to minimum value.")
+            initial_soc = self.minimum_soc / 100
+        return initial_soc
+
+    @property
+    def initial_soc(self) -> float:
+        return self._initial_soc * 100.
+
+    @initial_soc.setter
+    def initial_soc(self, initial_soc: float):
+        self._initial_soc = round(self._check_initial_soc(initial_soc), self.round_digits)
+
+    @property
+    def round_trip_efficiency(self) -> float:
+        return self.charge_efficiency * self.discharge_efficiency / 100.
+
+    @property
+    def user_fixed_dispatch(self) -> list:
+        return self._user_fixed_dispatch
+
+    @user_fixed_dispatch.setter
+    def user_fixed_dispatch(self, fixed_dispatch: list):
+        if len(fixed_dispatch) != self.n_periods:
+            raise ValueError("fixed_dispatch must be the same length as dispatch horizon.")
+        elif max(fixed_dispatch) > 1.0 or min(fixed_dispatch) < -1.0:
+            raise ValueError("fixed_dispatch must be normalized values between -1 and 1.")
+        else:
+            self._user_fixed_dispatch = fixed_dispatch
+            if len(self.annual_generation):
+                self._set_annual_dispatch()
+
+    # Horizon values
+    @property
+    def generation(self) -> np.ndarray:
+        return self.annual_generation[self._horizon_index]
+
+    @property
+    def grid_limit(self) -> np.ndarray:
+        return self.annual_grid_limit[self._horizon_index]
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self.annual_prices[self._horizon_index]
+
+    @property
+    def max_charge_fraction(self) -> np.ndarray:
+        return self.annual_max_charge_fraction[self._horizon_index]
+
+    @property
+    def max_discharge_fraction(self) -> np.ndarray:
+        return self.annual_max_discharge_fraction[self._horizon_index]
+
+    # Outputs
+    @property
+    def fixed_dispatch(self) -> list:
+        return self._fixed_dispatch.tolist()
+
+    @property
+    def soc(self) -> list:
+        return (self._soc * 100.0).tolist()
+
+    @property
+    def charge_power(self) -> list:
+        return (np.maximum(-self._fixed_dispatch, 0.0) * self.maximum_power).tolist()
+
+    @property
+    def discharge_power(self) -> list:
+        return (np.maximum(self._fixed_dispatch, 0.0) * self.maximum_power).tolist()
+
+    @property
+    def power(self) -> list:
+        return (self._fixed_dispatch * self.maximum_power).tolist()
+
+    @property
+    def current(self) -> list:
+        return [0.0] * self.n_periods
+
+    @property
+    def generation_and_storage(self) -> list:
+        """Generation and storage power flow to the grid [MW]"""
+        return (self.generation + self._fixed_dispatch * self.maximum_power).tolist()
+
+    @property
+    def electricity_sold(self) -> list:
+        """Electricity sold to the grid, generation in excess of the grid limit is curtailed [MW]"""
+        return np.clip(self.generation + self._fixed_dispatch * self.maximum_power, 0.0, self.grid_limit).tolist()
+
+
+class FastOneCycleBatteryDispatchHeuristic(FastBatteryDispatchHeuristic):
+    """Sets battery dispatch using a 1 cycle per day assumption without a Pyomo dispatch model.
+
+    Same heuristic as ``OneCycleBatteryDispatchHeuristic``. Time periods of all horizons in the year are sorted by price
+    at once in ``set_annual_inputs``; state-of-charge feasibility is checked with cumulative sums.
+    """
+    def __init__(self,
+                 system_model: BatteryModel.BatteryStateful,
+                 financial_model: Singleowner.Singleowner,
+                 n_periods: int):
+        super().__init__(system_model,
+                         financial_model,
+                         n_periods)
+        self._annual_sorted_periods = np.zeros((0, n_periods), dtype=int)
+
+    def _set_annual_dispatch(self):
+        n_year = len(self.annual_generation)
+        horizon_index = (np.arange(0, n_year, self.n_periods)[:, np.newaxis] + np.arange(self.n_periods)) % n_year
+        self._annual_sorted_periods = self._sort_periods(horizon_index)
+
+    def _sort_periods(self, horizon_index: np.ndarray) -> np.ndarray:
+        """
+        :param horizon_index: hour of the year of each horizon time period, shape (n_horizons, n_periods)
+        :returns: time periods of each horizon sorted by increasing price, then decreasing generation
+        """
+        return np.lexsort((-self.annual_generation[horizon_index], self.annual_prices[horizon_index]), axis=-1)
+
+    def _heuristic_method(self, start_time: int) -> np.ndarray:
+        """This sets battery dispatch using a 1 cycle per day assumption.
+
+        Method:
+         1. Sort input prices
+         2. Determine the duration required to fully discharge and charge the battery
+         3. Set discharge and charge operations based on sorted prices
+         3. Check SOC feasibility
+         4. If infeasible, find infeasibility, shift operation to the next sorted price periods
+         5. Repeat step 4 until SOC feasible
+                NOTE: If operation is tried on half of time periods, then operation defaults to 'do nothing'
+        """
+        prices = self.prices
+        if prices.sum() == 0.0 and prices.max() == 0.0:
+            raise ValueError("prices must be set before calling heuristic method.")
+
+        if start_time % self.n_periods == 0:
+            sorted_periods = self._annual_sorted_periods[start_time // self.n_periods]
+        else:
+            sorted_periods = self._sort_periods(self._horizon_index)
+        sorted_periods = sorted_periods.tolist()
+        max_charge_fraction = self.max_charge_fraction.tolist()
+        max_discharge_fraction = self.max_discharge_fraction.tolist()
+
+        discharge_time, charge_time = self._get_duration_battery_full_cycle()
+        fixed_dispatch = [0.0] * self.n_periods
+
+        # Set initial fixed dispatch
+        next_charge_idx = self._charge_battery(charge_time, 0, sorted_periods, max_charge_fraction, fixed_dispatch)
+        next_discharge_idx = self._discharge_battery(discharge_time, 0, sorted_periods, max_discharge_fraction,
+                                                     fixed_dispatch)
+
+        # test feasibility and find infeasibility
+        idx_infeasible = self.find_soc_infeasibility(fixed_dispatch)
+        while idx_infeasible is not None:
+            infeasible_value = fixed_dispatch[idx_infeasible]
+            if infeasible_value > 0:  # Discharging
+                discharge_remaining = fixed_dispatch[idx_infeasible] * self.time_duration[idx_infeasible]
+                fixed_dispatch[idx_infeasible] = 0
+                if next_discharge_idx < len(sorted_periods)/2:
+                    next_discharge_idx = self._discharge_battery(discharge_remaining, next_discharge_idx,
+                                                                 sorted_periods, max_discharge_fraction,
+                                                                 fixed_dispatch)
+            elif infeasible_value < 0:    # Charging
+                charge_remaining = -fixed_dispatch[idx_infeasible] * self.time_duration[idx_infeasible]
+                fixed_dispatch[idx_infeasible] = 0
+                if next_charge_idx < len(sorted_periods)/2:
+                    next_charge_idx = self._charge_battery(charge_remaining, next_charge_idx, sorted_periods,
+                                                           max_charge_fraction, fixed_dispatch)
+            idx_infeasible = self.find_soc_infeasibility(fixed_dispatch)
+
+        return np.array(fixed_dispatch, dtype=float)
+
+    def _discharge_battery(self, discharge_remaining, next_discharge_idx, sorted_periods, max_discharge_fraction,
+                           fixed_dispatch) -> int:
+        """Discharge battery using the remaining discharge and the next best discharge period.
+
+        Adjusts fixed_dispatch in place and returns next discharge index to be tried."""
+        period_count = next_discharge_idx
+        while discharge_remaining > 0 and period_count < len(sorted_periods):
+            idx = sorted_periods[-(period_count + 1)]
+            fixed_dispatch[idx] = min(max_discharge_fraction[idx], discharge_remaining)
+            discharge_remaining -= fixed_dispatch[idx] * self.time_duration[idx]
+            period_count += 1
+        return period_count
+
+    def _charge_battery(self, charge_remaining, next_charge_idx, sorted_periods, max_charge_fraction,
+                        fixed_dispatch) -> int:
+        """Charge battery using the remaining charge and the next best charge period.
+
+        Adjusts fixed_dispatch in place and returns next charge index to be tried."""
+        period_count = next_charge_idx
+        while charge_remaining > 0 and period_count < len(sorted_periods):
+            idx = sorted_periods[period_count]
+            fixed_dispatch[idx] = - min(max_charge_fraction[idx], charge_remaining)
+            charge_remaining += fixed_dispatch[idx] * self.time_duration[idx]
+            period_count += 1
+        return period_count
+
+    def _get_duration_battery_full_cycle(self) -> Tuple[float, float]:
+        """ Calculates discharge and charge hours required to fully cycle the battery."""
+        true_capacity = (self.maximum_soc - self.minimum_soc) * self.capacity / 100.0
+
+        n_discharge = true_capacity / (1/(self.discharge_efficiency/100.) * self.maximum_power)
+        n_charge = true_capacity / (self.charge_efficiency / 100. * self.maximum_power)
+        return n_discharge, n_charge
+
+    def find_soc_infeasibility(self, fixed_dispatch) -> Union[int, None]:
+        """
+        :returns: index of the first operation of fixed_dispatch outside of state-of-charge limits, None if feasible
+        """
+        soc = np.round(self.soc_trajectory(np.asarray(fixed_dispatch, dtype=float), self._initial_soc), 6) * 100.
+        infeasible = np.flatnonzero((soc < self.minimum_soc) | (soc > self.maximum_soc))
+        return int(infeasible[0]) if len(infeasible) else None
@@ -9,6 +9,7 @@ class PowerStorageDispatch(Dispatch):
     """
 
     """
+    initial_state_names = ('initial_soc',)
 
     def __init__(self,
                  pyomo_model: pyomo.ConcreteModel,
@@ -269,6 +270,17 @@ class PowerStorageDispatch(Dispatch):
     def update_dispatch_initial_soc(self, initial_soc: float = None):
         raise NotImplemented("This function must be overridden for specific storage dispatch model")
 
+    def predict_initial_state(self, n_periods: int) -> dict:
+        return {'initial_soc': self.soc[n_periods - 1]}
+
+    def round_relaxed_binaries(self):
+        """Fixes charging and discharging binaries to the larger power flow of the relaxed dispatch solution"""
+        for t in self.blocks.index_set():
+            charge_power = self.blocks[t].charge_power.value or 0.0
+            discharge_power = self.blocks[t].discharge_power.value or 0.0
+            self.blocks[t].is_charging.fix(1.0 if charge_power > discharge_power else 0.0)
+            self.blocks[t].is_discharging.fix(1.0 if discharge_power > charge_power else 0.0)
+
     # INPUTS
     @property
     def time_duration(self) -> list:
@@ -277,8 +289,7 @@ class PowerStorageDispatch(Dispatch):
     @time_duration.setter
     def time_duration(self, time_duration: list):
         if len(time_duration) == len(self.blocks):
-            for t, delta in zip(self.blocks, time_duration):
-                self.blocks[t].time_duration = round(delta, self.round_digits)
+            self.set_param_values('time_duration', time_duration)
         else:
             raise ValueError(self.time_duration.__name__ + " list must be the same length as time horizon")
 
@@ -7,6 +7,24 @@ from hybrid.power_source import *
 from hybrid.dispatch.grid_dispatch import GridDispatch
 
 
+def calc_schedule_deviation(generation_kw: Sequence, schedule_kw: Sequence) -> tuple:
+    """
+    Vectorized kernel for following a desired schedule: generation above the schedule is curtailed, and the schedule
+    not met by generation is missed load.
+
+    :param generation_kw: Hybrid system generation profile [kW]
+    :param schedule_kw: Desired schedule of the same length [kW]
+
+    :return: generation delivered, missed load and schedule curtailment arrays [kW]
+    """
+    generation_kw = np.asarray(generation_kw, dtype=float)
+    schedule_kw = np.asarray(schedule_kw, dtype=float)
+    delivered_kw = np.minimum(generation_kw, schedule_kw)
+    missed_load_kw = np.where(delivered_kw > 0, schedule_kw - delivered_kw, schedule_kw)
+    schedule_curtailed_kw = np.where(generation_kw > schedule_kw, generation_kw - schedule_kw, 0.)
+    return delivered_kw, missed_load_kw, schedule_curtailed_kw
+
+
 class Grid(PowerSource):
     _system_model: GridModel.Grid
     _financial_model: Union[Any, Singleowner.Singleowner]
@@ -39,9 +57,9 @@ class Grid(PowerSource):
         self._dispatch: GridDispatch = None
 
         # TODO: figure out if this is the best place for these
-        self.missed_load = [0.]
+        self.missed_load = np.zeros(1)
         self.missed_load_percentage = 0.0
-        self.schedule_curtailed = [0.]
+        self.schedule_curtailed = np.zeros(1)
         self.schedule_curtailed_percentage = 0.0
 
     def simulate_grid_connection(self, hybrid_size_kw: float, total_gen: list, project_life: int, lifetime_sim: bool, total_gen_max_feasible_year1: list):
@@ -50,7 +68,7 @@ class Grid(PowerSource):
 
         :param hybrid_size_kw: ``float``,
             Hybrid system capacity [kW]
-        :param total_gen: ``list``,
+        :param total_gen: ``np.ndarray``,
             Hybrid system generation profile [kWh]
         :param project_life: ``int``,
             Number of year in the analysis period (execepted project lifetime) [years]
@@ -61,21 +79,19 @@ class Grid(PowerSource):
         """
         if self.site.follow_desired_schedule:
             # Desired schedule sets the upper bound of the system output, any over generation is curtailed
-            lifetime_schedule = np.tile([x * 1e3 for x in self.site.desired_schedule],
+            lifetime_schedule = np.tile(np.asarray(self.site.desired_schedule, dtype=float) * 1e3,
                                         int(project_life / (len(self.site.desired_schedule) // self.site.n_timesteps)))
-            self.generation_profile = np.minimum(total_gen, lifetime_schedule)
-
-            self.missed_load = [schedule - gen if gen > 0 else schedule for (schedule, gen) in
-                                     zip(lifetime_schedule, self.generation_profile)]
-            self.missed_load_percentage = sum(self.missed_load)/sum(lifetime_schedule)
+            generation, self.missed_load, self.schedule_curtailed = calc_schedule_deviation(total_gen,
+                                                                                            lifetime_schedule)
+            self.generation_profile = generation
 
-            self.schedule_curtailed = [gen - schedule if gen > schedule else 0. for (gen, schedule) in
-                                            zip(total_gen, lifetime_schedule)]
-            self.schedule_curtailed_percentage = sum(self.schedule_curtailed)/sum(lifetime_schedule)
+            schedule_total = lifetime_schedule.sum()
+            self.missed_load_percentage = self.missed_load.sum() / schedule_total
+            self.schedule_curtailed_percentage = self.schedule_curtailed.sum() / schedule_total
         else:
             self.generation_profile = total_gen
         self.system_capacity_kw = hybrid_size_kw  # TODO: Should this be interconnection limit?
-        self.gen_max_feasible = np.minimum(total_gen_max_feasible_year1, self.interconnect_kw * self.site.interval / 60)
+        self.gen_max_feasible = np.minimum(np.asarray(total_gen_max_feasible_year1, dtype=float), self.interconnect_kw * self.site.interval / 60)
         self.simulate_power(project_life, lifetime_sim)
 
         # FIXME: updating capacity credit for reporting only.
@@ -91,8 +107,9 @@ class Grid(PowerSource):
         """
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
         t_step = self.site.interval / 60                                                # hr
-        E_net_max_feasible = [min(x,W_ac_nom) * t_step for x in self.total_gen_max_feasible_year1[0:self.site.n_timesteps]]      # [kWh]
-        return E_net_max_feasible
+        E_net = np.asarray(self.total_gen_max_feasible_year1[0:self.site.n_timesteps], dtype=float) * t_step  # [kWh]
+        E_net_max_feasible = np.minimum(E_net, W_ac_nom * t_step)                        # [kWh]
+        return E_net_max_feasible.tolist()
 
     @property
     def system_capacity_kw(self) -> float:
@@ -1,12 +1,15 @@
 from typing import Sequence
 
 import csv
+import copy
 from pathlib import Path
 from typing import Union
 import json
 from collections import OrderedDict
 
+import multiprocessing as mp
 import numpy as np
+import pandas as pd
 from scipy.stats import pearsonr
 import PySAM.GenericSystem as GenericSystem
 import PySAM.Singleowner as Singleowner
@@ -20,11 +23,21 @@ from hybrid.trough_source import TroughPlant
 from hybrid.battery import Battery
 from hybrid.grid import Grid
 from hybrid.reopt import REopt
+from hybrid.stage_tracker import SimulationStageTracker
 from hybrid.layout.hybrid_layout import HybridLayout
 from hybrid.dispatch.hybrid_dispatch_builder_solver import HybridDispatchBuilderSolver
 from hybrid.log import hybrid_logger as logger
 
 
+# Simulation and batch inputs used by processes forked in ``HybridSimulation.simulate_batch``
+_batch_simulation = None
+_batch_inputs = None
+
+
+def _simulate_batch_candidate_in_process(candidate: tuple) -> dict:
+    return _batch_simulation.simulate_batch_candidate(candidate, *_batch_inputs)
+
+
 class HybridSimulationOutput:
     """Class for creating :class:`HybridSimulation` output structure"""
     _keys = ("pv", "wind", "battery", "tower", "trough", "hybrid")
@@ -76,6 +89,7 @@ class HybridSimulationOutput:
 
 class HybridSimulation:
     hybrid_system: GenericSystem.GenericSystem
+    batch_fields = ('pv_kw', 'wind_kw', 'battery_kw', 'battery_kwh', 'interconnect_kw')
 
     def __init__(self,
                  power_sources: dict,
@@ -194,6 +208,7 @@ class HybridSimulation:
 
         self.layout = HybridLayout(self.site, self.power_sources)
 
+        self.dispatch_options = dispatch_options
         self.dispatch_builder = HybridDispatchBuilderSolver(self.site,
                                                             self.power_sources,
                                                             dispatch_options=dispatch_options)
@@ -202,6 +217,7 @@ class HybridSimulation:
         self.cost_model = create_cost_calculator(self.interconnect_kw, **cost_info if cost_info else {})
 
         self.outputs_factory = HybridSimulationOutput(power_sources)
+        self.stage_tracker = SimulationStageTracker()
 
         if len(self.site.elec_prices.data):
             # if prices are provided, assume that they are in units of $/MWh so convert to $/KWh
@@ -502,7 +518,7 @@ class HybridSimulation:
         for source in self.power_sources.keys():
             self.power_sources[source].setup_performance_model()
 
-    def simulate_power(self, project_life: int = 25, lifetime_sim=False):
+    def simulate_power(self, project_life: int = 25, lifetime_sim=False, simulate_generation=True):
         """
         Runs the individual system models for power generation and storage, while calculating the hybrid power variables.
 
@@ -512,14 +528,17 @@ class HybridSimulation:
             Number of year in the analysis period (execepted project lifetime) [years]
         :param lifetime_sim: ``bool``,
             For simulation modules which support simulating each year of the project_life, whether or not to do so; otherwise the first year data is repeated
+        :param simulate_generation: ``bool``,
+            Whether to simulate the non-dispatchable systems; otherwise their generation from the last simulation is used
         :return:
         """
+        self.stage_tracker.invalidate('generation' if simulate_generation else 'dispatch')
         self.setup_performance_models()
         # simulate non-dispatchable systems
         non_dispatchable_systems = ['pv', 'wind']
         for system in non_dispatchable_systems:
             model = getattr(self, system)
-            if model:
+            if model and simulate_generation:
                 model.simulate_power(project_life, lifetime_sim)
 
         # simulate dispatchable systems using dispatch optimization
@@ -538,14 +557,15 @@ class HybridSimulation:
                 if model:
                     hybrid_size_kw += model.system_capacity_kw
                     hybrid_nominal_capacity += model.calc_nominal_capacity(self.interconnect_kw)
-                    project_life_gen = np.tile(model.generation_profile, int(project_life / (len(model.generation_profile) // self.site.n_timesteps)))
-                    if len(project_life_gen) != len(total_gen):
-                        raise ValueError("Generation profile, `gen`, from system {} should have length that divides"
-                                        " n_timesteps {} * project_life {}".format(system, self.site.n_timesteps,
-                                                                                    project_life))
+                    generation = np.asarray(model.generation_profile, dtype=float)
+                    if len(generation) not in (self.site.n_timesteps, len(total_gen)):
+                        raise ValueError("Generation profile, `gen`, from system {} should have length n_timesteps {}"
+                                        " or n_timesteps * project_life {}".format(system, self.site.n_timesteps,
+                                                                                   len(total_gen)))
+                    # add the single year or project life generation in place, without tiling
                     if system in non_dispatchable_systems:
-                        total_gen_before_battery += project_life_gen
-                    total_gen += project_life_gen
+                        total_gen_before_battery.reshape(-1, len(generation))[:] += generation
+                    total_gen.reshape(-1, len(generation))[:] += generation
                     model.gen_max_feasible = model.calc_gen_max_feasible_kwh(self.interconnect_kw)
                     total_gen_max_feasible_year1 += model.gen_max_feasible
 
@@ -565,6 +585,7 @@ class HybridSimulation:
             Number of year in the analysis period (execepted project lifetime) [years]
         :return:
         """        
+        self.stage_tracker.invalidate('financials')
         for system in self.power_sources.keys():
             if system != 'grid':
                 model = getattr(self, system)
@@ -605,18 +626,31 @@ class HybridSimulation:
 
     def simulate(self,
                  project_life: int = 25,
-                 lifetime_sim = False):
+                 lifetime_sim = False,
+                 incremental = False):
         """
         Runs the individual system models then combines the financials
 
         :param lifetime_sim: ``bool``,
             For simulation modules which support simulating each year of the project_life, whether or not to do so; otherwise the first year data is repeated
+        :param incremental: ``bool``,
+            Whether to only re-run the stages whose inputs changed since the last incremental simulation, e.g., only
+            the financials for a PPA escalation sweep or the dispatch and financials for new electricity prices.
+            See ``SimulationStageTracker``
         :return:
         """
-        self.simulate_power(project_life, lifetime_sim)
-        self.calculate_installed_cost()
-        self.calculate_financials()
-        self.simulate_financials(project_life)
+        if incremental:
+            stale = self.stage_tracker.stale_stages(self, project_life, lifetime_sim)
+        else:
+            stale = self.stage_tracker.stages
+        if 'dispatch' in stale:
+            self.simulate_power(project_life, lifetime_sim, simulate_generation='generation' in stale)
+        if 'financials' in stale:
+            self.calculate_installed_cost()
+            self.calculate_financials()
+            self.simulate_financials(project_life)
+        if incremental:
+            self.stage_tracker.update(self, project_life, lifetime_sim)
 
     @property
     def interconnect_kw(self) -> float:
@@ -1084,15 +1118,236 @@ class HybridSimulation:
                 if k not in self.power_sources.keys():
                     logger.warning(f"Cannot assign {v} to {k}: technology was not included in hybrid plant")
                     continue
-                for kk, vv in v.items():
-                    self.power_sources[k.lower()].value(kk, vv)
+                self.power_sources[k.lower()].values(v)
+
+    def _check_copy_supported(self):
+        for tech in ('tower', 'trough'):
+            if tech in self.power_sources.keys():
+                raise NotImplementedError(f"Copying a hybrid simulation with a {tech} plant is not supported")
 
     def copy(self):
         """
+        Copies the hybrid simulation, e.g., to evaluate design candidates from an initialized plant. The site and
+        flicker data are shared, PySAM models are replaced by new models with the same inputs and the dispatch model is
+        rebuilt.
+
         :return: a clone
         """
-        # TODO implement deep copy
-        raise NotImplementedError
+        self._check_copy_supported()
+        memo = {id(self.site): self.site,
+                id(self.dispatch_builder): None}
+        if self.layout._flicker_data is not None:
+            memo[id(self.layout._flicker_data)] = self.layout._flicker_data
+        for tech in self.power_sources.values():
+            memo.update(tech.copy_memo())
+        clone = copy.deepcopy(self, memo)
+        clone.dispatch_builder = HybridDispatchBuilderSolver(clone.site,
+                                                             clone.power_sources,
+                                                             dispatch_options=clone.dispatch_options)
+        clone.stage_tracker.invalidate()
+        return clone
+
+    def _snapshot_memo(self) -> dict:
+        """``copy.deepcopy`` memo of objects that snapshots share with the simulation"""
+        memo = {id(self.site): self.site,
+                id(self.dispatch_builder): self.dispatch_builder}
+        if self.layout._flicker_data is not None:
+            memo[id(self.layout._flicker_data)] = self.layout._flicker_data
+        for tech in self.power_sources.values():
+            memo[id(tech)] = tech
+            memo[id(tech._dispatch)] = tech._dispatch
+            memo[id(tech._value_groups)] = tech._value_groups
+            for model in tech.pysam_models().values():
+                memo[id(model)] = model
+        return memo
+
+    def snapshot(self) -> dict:
+        """
+        Saves the state of the simulation, e.g., after initialization, to be reset by ``restore`` between design
+        candidates instead of re-initializing the simulation. The state consists of the PySAM model inputs and the
+        attributes of the simulation and its technologies. The site, dispatch models and PySAM models themselves are
+        not copied, problem metrics of the dispatch builder are cleared on ``restore``.
+
+        :return: simulation state
+        """
+        self._check_copy_supported()
+        attributes = {'simulation': dict(vars(self)),
+                      'power_sources': {name: dict(vars(tech)) for name, tech in self.power_sources.items()}}
+        return {'attributes': copy.deepcopy(attributes, self._snapshot_memo()),
+                'model_inputs': {name: tech.export_model_inputs() for name, tech in self.power_sources.items()}}
+
+    def restore(self, state: dict):
+        """
+        Restores the state of the simulation saved by ``snapshot``. The state is copied, so it can be restored again.
+
+        :param state: simulation state of this simulation
+        """
+        attributes = copy.deepcopy(state['attributes'], self._snapshot_memo())
+        for name, tech in self.power_sources.items():
+            tech.__dict__.clear()
+            tech.__dict__.update(attributes['power_sources'][name])
+            tech.restore_model_inputs(state['model_inputs'][name])
+        self.__dict__.clear()
+        self.__dict__.update(attributes['simulation'])
+        # the dispatch builder is shared with the state, its metrics of earlier simulations are cleared
+        if self.dispatch_builder is not None:
+            self.dispatch_builder.reset_run_state()
+        # outputs are not restored
+        self.stage_tracker.invalidate()
+
+    def _parse_batch_candidate(self, candidate: Union[dict, Sequence]) -> tuple:
+        """
+        :param candidate: dict with ``batch_fields`` keys or sequence of values in ``batch_fields`` order
+        :returns: tuple of values in ``batch_fields`` order, None for values that are not changed
+        """
+        if isinstance(candidate, dict):
+            unknown = set(candidate.keys()) - set(self.batch_fields)
+            if unknown:
+                raise ValueError(f"Unknown batch candidate fields {sorted(unknown)}, options are {self.batch_fields}")
+            candidate = tuple(candidate.get(field) for field in self.batch_fields)
+        elif len(candidate) != len(self.batch_fields):
+            raise ValueError(f"Batch candidate {candidate} should have values for {self.batch_fields}")
+        candidate = tuple(None if value is None else float(value) for value in candidate)
+        for tech, value in zip(('pv', 'wind', 'battery', 'battery'), candidate):
+            if value and tech not in self.power_sources.keys():
+                raise ValueError(f"Batch candidate {candidate} sizes {tech}, which is not included in hybrid plant")
+        return candidate
+
+    def set_batch_candidate(self, candidate: tuple):
+        """
+        Sets technology sizes and interconnection limit
+
+        :param candidate: tuple of values in ``batch_fields`` order, None for values that are not changed
+        """
+        pv_kw, wind_kw, battery_kw, battery_kwh, interconnect_kw = candidate
+        if interconnect_kw is not None:
+            self.interconnect_kw = interconnect_kw
+            if hasattr(self.cost_model, 'interconnection_size'):
+                self.cost_model.interconnection_size = interconnect_kw
+        if pv_kw is not None and self.pv:
+            self.pv.system_capacity_kw = pv_kw
+        if wind_kw is not None and self.wind:
+            self.wind.system_capacity_kw = wind_kw
+        if battery_kw is not None and self.battery:
+            self.battery.system_capacity_kw = battery_kw
+        if battery_kwh is not None and self.battery:
+            self.battery.system_capacity_kwh = battery_kwh
+
+    def simulate_generation_profiles(self,
+                                     candidates: Sequence[tuple],
+                                     project_life: int = 25,
+                                     lifetime_sim=False) -> dict:
+        """
+        Simulates generation of each distinct PV and wind capacity of the candidates once. PVWatts generation is
+        linear in capacity for a fixed layout, so it is simulated once and rescaled.
+
+        :param candidates: tuples of values in ``batch_fields`` order
+        :param project_life: ``int``,
+            Number of year in the analysis period (execepted project lifetime) [years]
+        :param lifetime_sim: ``bool``,
+            For simulation modules which support simulating each year of the project_life, whether or not to do so
+        :returns: dict of (technology, capacity [kW]): (generation profile [kW], annual energy [kWh], capacity factor [%])
+        """
+        profiles = {}
+        for index, tech in enumerate(('pv', 'wind')):
+            model = getattr(self, tech)
+            if not model:
+                continue
+            reference = None
+            # candidates without a size keep the current capacity, as they are simulated from the restored state
+            current_kw = model.system_capacity_kw
+            for size_kw in dict.fromkeys(candidate[index] for candidate in candidates):
+                model.system_capacity_kw = size_kw if size_kw is not None else current_kw
+                capacity_kw = model.system_capacity_kw
+                if capacity_kw <= 0 or (tech, capacity_kw) in profiles:
+                    continue
+                if reference is not None:
+                    reference_kw, gen, annual_energy, capacity_factor = reference
+                    scale = capacity_kw / reference_kw
+                    profiles[(tech, capacity_kw)] = (gen * scale, annual_energy * scale, capacity_factor)
+                    continue
+                model.setup_performance_model()
+                model.simulate_power(project_life, lifetime_sim)
+                profiles[(tech, capacity_kw)] = (np.array(model.generation_profile, dtype=float),
+                                                 model.annual_energy_kwh,
+                                                 model.capacity_factor)
+                if type(model) is PVPlant:
+                    reference = (capacity_kw,) + profiles[(tech, capacity_kw)]
+        return profiles
+
+    def simulate_batch_candidate(self,
+                                 candidate: tuple,
+                                 state: dict,
+                                 profiles: dict,
+                                 project_life: int = 25,
+                                 lifetime_sim=False) -> dict:
+        """
+        Restores the simulation state, sets the candidate sizes and simulates with the precomputed generation
+
+        :param candidate: tuple of values in ``batch_fields`` order, None for values that are not changed
+        :param state: simulation state from ``snapshot``
+        :param profiles: generation profiles from ``simulate_generation_profiles``
+        :returns: hybrid simulation outputs, see ``hybrid_simulation_outputs``
+        """
+        self.restore(state)
+        self.set_batch_candidate(candidate)
+        for tech in ('pv', 'wind'):
+            model = getattr(self, tech)
+            if model and (tech, model.system_capacity_kw) in profiles:
+                model.assign_generation_profile(*profiles[(tech, model.system_capacity_kw)])
+        self.simulate(project_life, lifetime_sim)
+        return self.hybrid_simulation_outputs()
+
+    def simulate_batch(self,
+                       candidates: Sequence[Union[dict, Sequence]],
+                       n_processes: int = 1,
+                       project_life: int = 25,
+                       lifetime_sim=False) -> pd.DataFrame:
+        """
+        Simulates sizing candidates of the hybrid plant, e.g., for a grid search. Generation of each distinct PV and
+        wind capacity is simulated once (see ``simulate_generation_profiles``), identical candidates are simulated
+        once, and the dispatch and financial simulations of the remaining candidates run on a pool of ``n_processes``
+        forked processes. Each candidate starts from the current state of the simulation, which is restored afterwards.
+
+        :param candidates: dicts with ``batch_fields`` keys or sequences of values in ``batch_fields`` order. Values
+            that are None or missing keep the current size.
+        :param n_processes: number of processes simulating candidates, requires the 'fork' process start method
+        :param project_life: ``int``,
+            Number of year in the analysis period (execepted project lifetime) [years]
+        :param lifetime_sim: ``bool``,
+            For simulation modules which support simulating each year of the project_life, whether or not to do so
+        :returns: one row per candidate: candidate fields and hybrid simulation outputs
+        """
+        global _batch_simulation, _batch_inputs
+        candidates = [self._parse_batch_candidate(candidate) for candidate in candidates]
+        unique_candidates = list(dict.fromkeys(candidates))
+
+        state = self.snapshot()
+        try:
+            profiles = self.simulate_generation_profiles(unique_candidates, project_life, lifetime_sim)
+            self.restore(state)
+            batch_inputs = (state, profiles, project_life, lifetime_sim)
+
+            n_processes = min(n_processes, len(unique_candidates))
+            if n_processes > 1 and 'fork' not in mp.get_all_start_methods():
+                print("Warning: Parallel batch simulation requires the 'fork' process start method. "
+                      "Simulating candidates in series")
+                n_processes = 1
+            if n_processes > 1:
+                _batch_simulation, _batch_inputs = self, batch_inputs
+                try:
+                    with mp.get_context('fork').Pool(processes=n_processes) as pool:
+                        outputs = pool.map(_simulate_batch_candidate_in_process, unique_candidates)
+                finally:
+                    _batch_simulation, _batch_inputs = None, None
+            else:
+                outputs = [self.simulate_batch_candidate(candidate, *batch_inputs) for candidate in unique_candidates]
+        finally:
+            self.restore(state)
+
+        unique_outputs = dict(zip(unique_candidates, outputs))
+        rows = [dict(zip(self.batch_fields, candidate), **unique_outputs[candidate]) for candidate in candidates]
+        return pd.DataFrame(rows)
 
     def plot_layout(self,
                     figure=None,
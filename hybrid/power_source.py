@@ -1,4 +1,6 @@
-from typing import Iterable, Sequence
+from typing import Iterable, Sequence, Union
+import copy
+import importlib
 import numpy as np
 from hybrid.sites import SiteInfo
 import PySAM.Singleowner as Singleowner
@@ -9,6 +11,46 @@ from hybrid.log import hybrid_logger as logger
 from hybrid.dispatch.power_sources.power_source_dispatch import PowerSourceDispatch
 
 
+def lifetime_series(series: Sequence, project_life: int) -> np.ndarray:
+    """
+    Repeats a single year series over the project life as an array, which PySAM models copy on assignment without
+    an intermediate list
+
+    :param series: single year series
+    :param project_life: Number of years in the analysis period [years]
+
+    :return: project life series
+    """
+    return np.tile(np.asarray(series, dtype=float), project_life)
+
+
+def export_pysam_inputs(model) -> dict:
+    """
+    :param model: PySAM model
+    :return: nested dict of assigned inputs by group, outputs are excluded
+    """
+    inputs = model.export()
+    inputs.pop('Outputs', None)
+    return inputs
+
+
+def copy_pysam_model(model, shared_model=None):
+    """
+    Creates a new PySAM model of the same module with the assigned inputs of ``model``
+
+    :param model: PySAM model
+    :param shared_model: (optional) PySAM model whose data is shared by the new model, as with ``from_existing``
+    :return: new PySAM model
+    """
+    module = importlib.import_module("PySAM." + type(model).__name__)
+    if shared_model is None:
+        new_model = module.new()
+    else:
+        new_model = module.from_existing(shared_model, "")
+    new_model.assign(export_pysam_inputs(model))
+    return new_model
+
+
 class PowerSource:
     """
     Abstract class for a renewable energy power plant simulation.
@@ -32,10 +74,13 @@ class PowerSource:
         """
         self.name = name
         self.site = site
+        self._value_groups = {}     # cache of var_name -> PySAM group object, see `find_value_group`
+        self._value_groups_models = (None, None)
         self._system_model = system_model
         self._financial_model = financial_model
         self._layout = None
         self._dispatch = PowerSourceDispatch
+        self._assigned_generation = None    # generation used instead of the system model, see `assign_generation_profile`
         if isinstance(self._financial_model, Singleowner.Singleowner):
             self.initialize_financial_values()
         self.gen_max_feasible = [0.] * self.site.n_timesteps
@@ -85,26 +130,10 @@ class PowerSource:
         """
         var_name = var_name.replace('adjust:', '')
         attr_obj = None
-        if var_name in self.__dir__():
+        if self.has_own_attribute(var_name):
             attr_obj = self
         if not attr_obj:
-            for a in self._system_model.__dir__():
-                group_obj = getattr(self._system_model, a)
-                try:
-                    if var_name in group_obj.__dir__():
-                        attr_obj = group_obj
-                        break
-                except:
-                    pass
-        if not attr_obj:
-            for a in self._financial_model.__dir__():
-                try:
-                    group_obj = getattr(self._financial_model, a)
-                    if var_name in group_obj.__dir__():
-                        attr_obj = group_obj
-                        break
-                except:
-                    pass
+            attr_obj = self.find_value_group(var_name, (self._system_model, self._financial_model))
         if not attr_obj:
             raise ValueError("Variable {} not found in technology or financial model {}".format(
                 var_name, self.__class__.__name__))
@@ -120,12 +149,67 @@ class PowerSource:
             except Exception as e:
                 raise IOError(f"{self.__class__}'s attribute {var_name} could not be set to {var_value}: {e}")
 
+    def values(self, var_values: Union[dict, Sequence[str]]):
+        """
+        Bulk version of ``value``.
+
+        ``values([var_name, ...])`` Gets variable values
+
+        ``values({var_name: var_value, ...})`` Sets variable values
+
+        :param var_values: variable names, or dictionary of variable names and values
+
+        :returns: Dictionary of variable names and values (when getter)
+        """
+        if isinstance(var_values, dict):
+            for k, v in var_values.items():
+                self.value(k, v)
+        else:
+            return {k: self.value(k) for k in var_values}
+
+    def has_own_attribute(self, var_name: str) -> bool:
+        """
+        Checks if the variable is an attribute of this instance or its class, equivalent to ``var_name in dir(self)``
+        without building the directory listing.
+        """
+        return var_name in self.__dict__ or any(var_name in vars(cls) for cls in type(self).__mro__)
+
+    def find_value_group(self, var_name: str, models: tuple):
+        """
+        Finds the first group, within the models provided, that contains the variable. Resolved groups are cached
+        per instance; the cache is cleared when the system or financial model is replaced.
+
+        :param var_name: PySAM variable name
+        :param models: PySAM models to search, in order
+
+        :returns: PySAM group object or None if not found
+        """
+        if self._value_groups_models[0] is not self._system_model \
+                or self._value_groups_models[1] is not self._financial_model:
+            self._value_groups = {}
+            self._value_groups_models = (self._system_model, self._financial_model)
+
+        if var_name in self._value_groups:
+            return self._value_groups[var_name]
+
+        for model in models:
+            if model is None:
+                continue
+            for a in model.__dir__():
+                try:
+                    group_obj = getattr(model, a)
+                    if var_name in group_obj.__dir__():
+                        self._value_groups[var_name] = group_obj
+                        return group_obj
+                except:
+                    pass
+        return None
+
     def assign(self, input_dict: dict):
         """
         Sets input variables in the PowerSource class or any of its subclasses (system or financial models)
         """
-        for k, v in input_dict.items():
-            self.value(k, v)
+        self.values(input_dict)
 
     def calc_nominal_capacity(self, interconnect_kw: float):
         """
@@ -160,8 +244,9 @@ class PowerSource:
         """
         W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
         t_step = self.site.interval / 60                                                # hr
-        E_net_max_feasible = [min(x,W_ac_nom) * t_step for x in self.generation_profile[0:self.site.n_timesteps]]      # [kWh]
-        return E_net_max_feasible
+        E_net = np.asarray(self.generation_profile[0:self.site.n_timesteps], dtype=float) * t_step  # [kWh]
+        E_net_max_feasible = np.minimum(E_net, W_ac_nom * t_step)                        # [kWh]
+        return E_net_max_feasible.tolist()
 
     def calc_capacity_credit_percent(self, interconnect_kw: float) -> float:
         """
@@ -179,19 +264,16 @@ class PowerSource:
                   + type(self).__name__)
             return 0
         else:
-            df = pd.DataFrame()
-            df['cap_hours'] = self.site.capacity_hours
-            df['E_net_max_feasible'] = self.gen_max_feasible  # [kWh]
-
-            sel_df = df[df['cap_hours'] == True]
+            cap_hours = np.asarray(self.site.capacity_hours) == True
+            E_net_max_feasible = np.asarray(self.gen_max_feasible, dtype=float)[cap_hours]  # [kWh]
 
             if type(self).__name__ != 'Grid':
                 W_ac_nom = self.calc_nominal_capacity(interconnect_kw)
             else:
                 W_ac_nom = min(self.hybrid_nominal_capacity, interconnect_kw)
 
-            if len(sel_df.index) > 0 and W_ac_nom > 0:
-                capacity_value = sum(np.minimum(sel_df['E_net_max_feasible'].values/(W_ac_nom*t_step), 1.0)) / len(sel_df.index) * 100
+            if len(E_net_max_feasible) > 0 and W_ac_nom > 0:
+                capacity_value = sum(np.minimum(E_net_max_feasible/(W_ac_nom*t_step), 1.0)) / len(E_net_max_feasible) * 100
                 capacity_value = min(100, capacity_value)       # [%]
             else:
                 capacity_value = 0
@@ -219,6 +301,9 @@ class PowerSource:
         if self.system_capacity_kw <= 0:
             return
 
+        if self._assigned_generation is not None:
+            return
+
         if hasattr(self._system_model, "Lifetime"):
             self._system_model.Lifetime.system_use_lifetime_output = 1 if lifetime_sim else 0
             self._system_model.Lifetime.analysis_period = project_life if lifetime_sim else 1
@@ -246,17 +331,19 @@ class PowerSource:
         self._financial_model.value('ppa_soln_mode', 1)
 
         # try to copy over system_model's generation_profile to the financial_model
-        if len(self._financial_model.value('gen')) == 1:
-            if len(self.generation_profile) == self.site.n_timesteps or \
-              len(self.generation_profile) == self.site.n_timesteps * project_life:
-                self._financial_model.value('gen', self.generation_profile)
-            else:
+        if self._assigned_generation is not None or len(self._financial_model.value('gen')) == 1:
+            generation = self.generation_profile
+            if len(generation) != self.site.n_timesteps and \
+                    len(generation) != self.site.n_timesteps * project_life:
                 raise RuntimeError(f"simulate_financials error: generation profile of len {self.site.n_timesteps} required")
+        else:
+            generation = self._financial_model.value('gen')
 
-        if len(self._financial_model.value('gen')) == self.site.n_timesteps:
-            self._financial_model.value('gen', self._financial_model.value('gen') * project_life)
-        self._financial_model.value('system_pre_curtailment_kwac', self._financial_model.value('gen'))
-        self._financial_model.value('annual_energy_pre_curtailment_ac', self._system_model.value("annual_energy"))
+        if len(generation) == self.site.n_timesteps:
+            generation = lifetime_series(generation, project_life)
+        self._financial_model.value('gen', generation)
+        self._financial_model.value('system_pre_curtailment_kwac', generation)
+        self._financial_model.value('annual_energy_pre_curtailment_ac', self.annual_energy_kwh)
         # TODO: Should we use the nominal capacity function here?
         self.gen_max_feasible = self.calc_gen_max_feasible_kwh(interconnect_kw)
         self.capacity_credit_percent = self.calc_capacity_credit_percent(interconnect_kw)
@@ -458,6 +545,8 @@ class PowerSource:
     def annual_energy_kwh(self) -> float:
         """Annual energy [kWh]"""
         if self.system_capacity_kw > 0:
+            if self._assigned_generation is not None:
+                return self._assigned_generation['annual_energy']
             return self._system_model.value("annual_energy")
         else:
             return 0
@@ -466,6 +555,8 @@ class PowerSource:
     def generation_profile(self) -> list:
         """System power generated [kW]"""
         if self.system_capacity_kw:
+            if self._assigned_generation is not None:
+                return self._assigned_generation['gen'].tolist()
             return list(self._system_model.value("gen"))
         else:
             return [0] * self.site.n_timesteps
@@ -474,6 +565,8 @@ class PowerSource:
     def capacity_factor(self) -> float:
         """System capacity factor [%]"""
         if self.system_capacity_kw > 0:
+            if self._assigned_generation is not None:
+                return self._assigned_generation['capacity_factor']
             return self._system_model.value("capacity_factor")
         else:
             return 0
@@ -681,11 +774,84 @@ class PowerSource:
     def gen_max_feasible(self, gen_max_feas: list):
         self._gen_max_feasible = gen_max_feas
 
+    def assign_generation_profile(self,
+                                  generation_profile: Sequence,
+                                  annual_energy_kwh: float,
+                                  capacity_factor: float):
+        """
+        Assigns generation, e.g., rescaled from a simulation at another capacity, which is used instead of simulating
+        the system model until ``clear_generation_profile`` is called
+
+        :param generation_profile: System power generated [kW]
+        :param annual_energy_kwh: Annual energy [kWh]
+        :param capacity_factor: System capacity factor [%]
+        """
+        self._assigned_generation = {'gen': np.asarray(generation_profile, dtype=float),
+                                     'annual_energy': float(annual_energy_kwh),
+                                     'capacity_factor': float(capacity_factor)}
+
+    def clear_generation_profile(self):
+        """Simulates the system model again, see ``assign_generation_profile``"""
+        self._assigned_generation = None
+
+    def pysam_models(self) -> dict:
+        """
+        PySAM system and financial models by attribute name. Python models, e.g., a custom financial model, are
+        copied as any other attribute.
+        """
+        models = {}
+        for attr in ('_system_model', '_financial_model'):
+            model = getattr(self, attr)
+            if hasattr(model, 'get_data_ptr'):
+                models[attr] = model
+        return models
+
+    def export_model_inputs(self) -> dict:
+        """
+        :return: assigned inputs of the PySAM models, see ``pysam_models``
+        """
+        return {attr: export_pysam_inputs(model) for attr, model in self.pysam_models().items()}
+
+    def restore_model_inputs(self, model_inputs: dict):
+        """
+        Restores inputs of the PySAM models exported by ``export_model_inputs``. Inputs assigned since the export are
+        unassigned.
+
+        :param model_inputs: dict of model attribute name: inputs
+        """
+        for attr, model in self.pysam_models().items():
+            inputs = model_inputs[attr]
+            for group, group_values in export_pysam_inputs(model).items():
+                for var_name in group_values.keys():
+                    if var_name not in inputs.get(group, {}):
+                        model.unassign(var_name)
+            model.assign(inputs)
+
+    def copy_memo(self) -> dict:
+        """
+        ``copy.deepcopy`` memo used to copy this power source: the site is shared, PySAM models are replaced by new
+        models with the same inputs and the dispatch is dropped, to be created by the dispatch builder of the copy.
+        """
+        memo = {id(self.site): self.site,
+                id(self._value_groups): {}}
+        if not isinstance(self._dispatch, type):
+            memo[id(self._dispatch)] = None
+        models = self.pysam_models()
+        system_model = models.get('_system_model')
+        for attr, model in models.items():
+            if attr == '_financial_model' and system_model is not None \
+                    and model.get_data_ptr() == system_model.get_data_ptr():
+                # financial model created with `from_existing` shares the data of the system model
+                memo[id(model)] = copy_pysam_model(model, memo[id(system_model)])
+            else:
+                memo[id(model)] = copy_pysam_model(model)
+        return memo
+
     def copy(self):
         """
-        :return: new instance
+        :return: new instance with copies of the PySAM models, sharing the site
         """
-        raise NotImplementedError
+        return copy.deepcopy(self, self.copy_memo())
 
     def plot(self,
              figure=None,
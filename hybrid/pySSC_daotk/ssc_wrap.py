@@ -5,6 +5,7 @@ c_number = c_double  # must be c_double or c_float depending on how defined in s
 import abc
 import importlib
 import copy
+import numpy as np
 
 PYSAM_MODULE_NAME = 'PySAM_DAOTk'
 # PYSAM_MODULE_NAME = 'PySAM'
@@ -14,16 +15,19 @@ SSCDLL_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "libs", "
 # SSCDLL_PATH = os.path.join(os.environ.get('SAMNTDIR'), 'deploy/x64/ssc.dll')             # release
 # SSCDLL_PATH = os.path.join(os.environ.get('SAMNTDIR'),'deploy/x64/sscd.dll')            # debug
 
-def ssc_wrap(wrapper, tech_name, financial_name, defaults_name=None, defaults=None):
+def ssc_wrap(wrapper, tech_name, financial_name, defaults_name=None, defaults=None, persistent=False):
     """Factory method for ssc wrappers
     Returns an SscWrap object for an ssc interface via either PySSC or PySAM
+
+    persistent: (pyssc only) keep the ssc data table and compute modules alive between executes and only
+                push parameters that changed since the last execute
     """
     #TODO:  Flatten the dictionaries returned by PysamWrap::execute and PysamWrap::export_params
     #TODO:  Add a function to replace the defaults parameter. If there's a defaults_name specified and
     #       wrapper is pyssc, create a PysamWrap first and run export_params.
 
     if wrapper == 'pyssc':
-        return PysscWrap(tech_name, financial_name, defaults)
+        return PysscWrap(tech_name, financial_name, defaults, persistent)
     elif wrapper == 'pysam':
         return PysamWrap(tech_name, financial_name, defaults_name)
 
@@ -41,7 +45,7 @@ class SscWrap(metaclass=abc.ABCMeta):
         return
 
     @abc.abstractmethod
-    def execute(self):
+    def execute(self, outputs=None):
         return
 
     @abc.abstractmethod
@@ -50,7 +54,7 @@ class SscWrap(metaclass=abc.ABCMeta):
 
 
 class PysscWrap(SscWrap):
-    def __init__(self, tech_name, financial_name, defaults=None):
+    def __init__(self, tech_name, financial_name, defaults=None, persistent=False):
         self.ssc = PySSC()
         self.wrapper = 'pyssc'
         self.tech_name = tech_name
@@ -63,20 +67,105 @@ class PysscWrap(SscWrap):
             self.params = {}
         self.params['tech_model'] = self.tech_name
         self.params['financial_model'] = self.financial_name
-	
+
+        # Persistent-handle mode: ssc data table and compute modules are created on the first execute and reused
+        self.persistent = persistent
+        self._data = None               # ssc data table
+        self._cmods = {}                # compute module name -> ssc module handle
+        self._dirty = set(self.params.keys())   # parameters changed since last push to the data table
+
+    def __del__(self):
+        self.release()
+
     def set(self, param_dict):
         if 'is_elec_heat_dur_off' in param_dict and type(param_dict['is_elec_heat_dur_off']) == list:
             param_dict['is_elec_heat_dur_off'] = param_dict['is_elec_heat_dur_off'][0]
 
         self.params.update(param_dict)
+        self._dirty.update(param_dict.keys())
 
     def get(self, name):
         return self.params[name]
 
-    def execute(self):
-        results = ssc_sim_from_dict(self.ssc, self.params)
+    def execute(self, outputs=None):
+        """Runs the compute module(s)
+
+        outputs: (optional) names of the variables to return, all are returned if None
+        """
+        if not self.persistent:
+            results = ssc_sim_from_dict(self.ssc, self.params, outputs)
+            return results
+
+        if self._data is None:
+            self._data = self.ssc.data_create()
+            self._dirty = set(self.params.keys())
+
+        model_names = [self.tech_name]
+        if self.financial_name not in [None, "none"]:
+            model_names.append(self.financial_name)
+
+        # Push only parameters changed since the last execute
+        for name in model_names:
+            self._push_dirty_params(name)
+        self._dirty = set()
+
+        results = {}
+        for name in model_names:
+            success, cmod_outputs = self._exec_cmod(name, outputs)
+            results.update(cmod_outputs)
+            if not success:
+                break
+        results["tech_model"] = self.tech_name
+        results["financial_model"] = self.financial_name
+        results["cmod_success"] = int(success)
         return results
 
+    def release(self):
+        """Frees the persistent ssc data table and compute modules, if any"""
+        if getattr(self, '_data', None) is not None:
+            self.ssc.data_free(self._data)
+            self._data = None
+        for cmod in getattr(self, '_cmods', {}).values():
+            self.ssc.module_free(cmod)
+        self._cmods = {}
+        self._dirty = set(getattr(self, 'params', {}).keys())
+
+    def _get_cmod(self, cmod_name):
+        if cmod_name not in self._cmods:
+            self._cmods[cmod_name] = self.ssc.module_create(cmod_name.encode("utf-8"))
+        return self._cmods[cmod_name]
+
+    def _push_dirty_params(self, cmod_name):
+        var_info = cmod_var_info(self.ssc, cmod_name)
+        for key in self._dirty & var_info.inputs:
+            # Empty values are never set, so drop any previous value to match a freshly created table
+            self.ssc.data_unassign(self._data, key.encode("ascii"))
+            set_ssc_var(var_info.data_types[key], self.ssc, self._data, key, self.params[key])
+
+    def _exec_cmod(self, cmod_name, outputs=None):
+        cmod = self._get_cmod(cmod_name)
+        var_info = cmod_var_info(self.ssc, cmod_name)
+        self.ssc.module_exec_set_print(0)
+
+        success = self.ssc.module_exec(cmod, self._data) != 0
+        if not success:
+            print(cmod_name + ' simulation error')
+            idx = 1
+            msg = self.ssc.module_log(cmod, 0)
+            while msg is not None:
+                print(' : ' + msg.decode("utf - 8"))
+                msg = self.ssc.module_log(cmod, idx)
+                idx = idx + 1
+
+        cmod_outputs = ssc_table_to_dict(self.ssc, cmod, self._data, cmod_name, outputs, free=False)
+
+        # Remove outputs so the table holds only inputs, as a freshly created table would, and re-push INOUT
+        # variables on the next execute in case the compute module changed them
+        for name in var_info.outputs:
+            self.ssc.data_unassign(self._data, name.encode("ascii"))
+        self._dirty.update(var_info.inouts & self.params.keys())
+        return success, cmod_outputs
+
     def export_params(self):
         return copy.deepcopy(self.params)
 
@@ -91,6 +180,8 @@ class PysscWrap(SscWrap):
 
         # Inputs
         for key, value in self.params.items():
+            if isinstance(value, np.ndarray):
+                value = value.tolist()
             if key == 'tech_model' or key == 'financial_model':
                 continue
             elif any([type(value) is scalar_type for scalar_type in [int, float, str]]):
@@ -185,12 +276,14 @@ class PysamWrap(SscWrap):
         except Exception as err:
             raise(err)
 
-    def execute(self):
+    def execute(self, outputs=None):
         self.tech_model.execute(1)
         results = self.tech_model.Outputs.export()
         if self.financial_name is not None:
             self.financial_model.execute(1)
             results.update(self.financial_model.Outputs.export())
+        if outputs is not None:
+            results = {k: v for k, v in results.items() if k in outputs}
         return results
 
     def export_params(self):
@@ -201,7 +294,7 @@ class PysamWrap(SscWrap):
 
 # TODO: make these few following functions into member functions
 # Functions to simulate compute modules through dictionaries
-def ssc_sim_from_dict(ssc, data_pydict):
+def ssc_sim_from_dict(ssc, data_pydict, outputs=None):
     """ Run a technology compute module using parameters in a dict.
 
     Parameters
@@ -215,6 +308,9 @@ def ssc_sim_from_dict(ssc, data_pydict):
                 model is used.
         Other keys are names of args for the selected tech_model or
         financial_model.
+    outputs: list or None
+        names of the variables to return. If None, all variables in the
+        compute module tables are returned.
 
     Returns
     -------
@@ -233,13 +329,13 @@ def ssc_sim_from_dict(ssc, data_pydict):
         data_ssc = dict_to_ssc_table_dat(ssc, data_pydict, financial_model_name,
                                          data_ssc_tech_model)
 
-    return ssc_sim(ssc, data_ssc, tech_model_name, financial_model_name)
+    return ssc_sim(ssc, data_ssc, tech_model_name, financial_model_name, outputs)
 
 
-def ssc_sim(ssc, data_ssc, tech_model_name, financial_model_name):
+def ssc_sim(ssc, data_ssc, tech_model_name, financial_model_name, outputs=None):
 
     # Run the technology model compute module
-    tech_model_return = ssc_cmod(ssc, data_ssc, tech_model_name)
+    tech_model_return = ssc_cmod(ssc, data_ssc, tech_model_name, outputs)
     tech_model_success = tech_model_return[0]
     tech_model_dict = tech_model_return[1]
 
@@ -256,7 +352,7 @@ def ssc_sim(ssc, data_ssc, tech_model_name, financial_model_name):
         return tech_model_dict
 
     # Run the financial model
-    financial_model_return = ssc_cmod(ssc, data_ssc, financial_model_name)
+    financial_model_return = ssc_cmod(ssc, data_ssc, financial_model_name, outputs)
     financial_model_success = financial_model_return[0]
     financial_model_dict = financial_model_return[1]
 
@@ -274,7 +370,7 @@ def ssc_sim(ssc, data_ssc, tech_model_name, financial_model_name):
 
     return out_dict
 
-def ssc_cmod(ssc, dat, name):
+def ssc_cmod(ssc, dat, name, outputs=None):
     # ssc = PySSC()
 
     cmod = ssc.module_create(name.encode("utf-8"))
@@ -290,11 +386,11 @@ def ssc_cmod(ssc, dat, name):
             print(' : ' + msg.decode("utf - 8"))
             msg = ssc.module_log(cmod, idx)
             idx = idx + 1
-        cmod_err_dict = ssc_table_to_dict(ssc, cmod, dat)
+        cmod_err_dict = ssc_table_to_dict(ssc, cmod, dat, name, outputs)
         return [False, cmod_err_dict]
 
     # Get python dictionary representing compute module with all inputs/outputs defined
-    return [True, ssc_table_to_dict(ssc, cmod, dat)]
+    return [True, ssc_table_to_dict(ssc, cmod, dat, name, outputs)]
 
 
 def dict_to_ssc_table(ssc, py_dict, cmod_name):
@@ -305,50 +401,50 @@ def dict_to_ssc_table(ssc, py_dict, cmod_name):
 
 def dict_to_ssc_table_dat(ssc, py_dict, cmod_name, dat):
     # ssc = PySSC()
+    var_info = cmod_var_info(ssc, cmod_name)
 
-    cmod = ssc.module_create(cmod_name.encode("utf-8"))
-
-    dict_keys = list(py_dict.keys())
-    # dat = ssc.data_create()
-
-    ii = 0
-    while (True):
-
-        p_ssc_entry = ssc.module_var_info(cmod, ii)
+    # Set compute module data to dictionary values of INPUT (1) and INOUT (3) variables
+    for ssc_input_data_name in var_info.inputs.intersection(py_dict.keys()):
+        set_ssc_var(var_info.data_types[ssc_input_data_name], ssc, dat, ssc_input_data_name,
+                    py_dict[ssc_input_data_name])
 
-        ssc_input_data_type = ssc.info_data_type(p_ssc_entry)
-
-        # 1 = String, 2 = Number, 3 = Array, 4 = Matrix, 5 = Table
-        if (ssc_input_data_type <= 0 or ssc_input_data_type > 5):
-            break
+    return dat
 
-        ssc_input_var_type = ssc.info_var_type(p_ssc_entry)
 
-        # If the variable type is INPUT (1) or INOUT (3)
-        if (ssc_input_var_type == 1 or ssc_input_var_type == 3):
+class CmodVarInfo:
+    """Compute module variable metadata (name, data type and var type)"""
+    def __init__(self, ssc, cmod_name):
+        cmod = ssc.module_create(cmod_name.encode("utf-8"))
 
-            # Get name of iith variable in compute module table
-            ssc_input_data_name = str(ssc.info_name(p_ssc_entry).decode("ascii"))
+        self.names = []         # variable names, in compute module order
+        self.data_types = {}    # 1 = String, 2 = Number, 3 = Array, 4 = Matrix, 5 = Table
+        self.var_types = {}     # 1 = INPUT, 2 = OUTPUT, 3 = INOUT
+        ii = 0
+        while (True):
+            p_ssc_entry = ssc.module_var_info(cmod, ii)
+            ssc_data_type = ssc.info_data_type(p_ssc_entry)
+            if (ssc_data_type <= 0 or ssc_data_type > 5):
+                break
+            name = str(ssc.info_name(p_ssc_entry).decode("ascii"))
+            self.names.append(name)
+            self.data_types[name] = ssc_data_type
+            self.var_types[name] = ssc.info_var_type(p_ssc_entry)
+            ii = ii + 1
+        ssc.module_free(cmod)
 
-            # Find corresponding 'des_par' dictionary item
-            is_str_test_key = False
-            for i in range(len(dict_keys)):
-                if (dict_keys[i] == ssc_input_data_name):
-                    is_str_test_key = True
-                    # print ("Found key")
-                    break
+        self.inputs = {k for k, v in self.var_types.items() if v == 1 or v == 3}
+        self.outputs = {k for k, v in self.var_types.items() if v == 2}
+        self.inouts = {k for k, v in self.var_types.items() if v == 3}
 
-            # Helpful for debugging:
-            # if(is_str_test_key == False):
-            #    print ("Did not find key: ", ssc_input_data_name)
 
-            # Set compute module data to dictionary value
-            if is_str_test_key:
-                set_ssc_var(ssc_input_data_type, ssc, dat, ssc_input_data_name, py_dict[ssc_input_data_name])
+_cmod_var_info_cache = {}
 
-        ii = ii + 1
 
-    return dat
+def cmod_var_info(ssc, cmod_name):
+    """Returns compute module variable metadata, queried from ssc once per compute module name"""
+    if cmod_name not in _cmod_var_info_cache:
+        _cmod_var_info_cache[cmod_name] = CmodVarInfo(ssc, cmod_name)
+    return _cmod_var_info_cache[cmod_name]
 
 
 def set_ssc_var(ssc_input_data_type, ssc, dat, ssc_input_data_name, value):
@@ -376,8 +472,13 @@ def set_ssc_var(ssc_input_data_type, ssc, dat, ssc_input_data_name, value):
 def ssc_data_type(v):
     if type(v) is str:
         ssc_data_type = 1       # string
-    elif type(v) is int or type(v) is float or type(v) is bool:
+    elif type(v) is int or type(v) is float or type(v) is bool or isinstance(v, (np.number, np.bool_)):
         ssc_data_type = 2       # number
+    elif isinstance(v, np.ndarray):
+        if v.ndim > 1:
+            ssc_data_type = 4   # matrix
+        else:
+            ssc_data_type = 3   # array
     elif type(v) is list:
         if type(v[0]) is list:
             ssc_data_type = 4   # matrix
@@ -391,34 +492,35 @@ def ssc_data_type(v):
 
 
 # Returns python dictionary representing SSC compute module w/ all required inputs/outputs defined
-def ssc_table_to_dict(ssc, cmod, dat):
+# If outputs is provided, only those variables are returned
+def ssc_table_to_dict(ssc, cmod, dat, cmod_name, outputs=None, free=True):
     # ssc = PySSC()
-    i = 0
+    var_info = cmod_var_info(ssc, cmod_name)
+    if outputs is None:
+        names = var_info.names
+    else:
+        names = [name for name in outputs if name in var_info.data_types]
+
     ssc_out = {}
-    while (True):
-        p_ssc_entry = ssc.module_var_info(cmod, i)
-        ssc_output_data_type = ssc.info_data_type(p_ssc_entry)
-        if (ssc_output_data_type <= 0 or ssc_output_data_type > 5):
-            break
-        ssc_output_data_name = str(ssc.info_name(p_ssc_entry).decode("ascii"))
-        ssc_data_query = ssc.data_query(dat, ssc_output_data_name.encode("ascii"))
+    for ssc_output_data_name in names:
+        ssc_output_data_type = var_info.data_types[ssc_output_data_name]
+        name = ssc_output_data_name.encode("ascii")
+        ssc_data_query = ssc.data_query(dat, name)
         if (ssc_data_query > 0):
             if (ssc_output_data_type == 1):
-                ssc_out[ssc_output_data_name] = ssc.data_get_string(dat,
-                                                                    ssc_output_data_name.encode("ascii")).decode(
-                    "ascii")
+                ssc_out[ssc_output_data_name] = ssc.data_get_string(dat, name).decode("ascii")
             elif (ssc_output_data_type == 2):
-                ssc_out[ssc_output_data_name] = ssc.data_get_number(dat, ssc_output_data_name.encode("ascii"))
+                ssc_out[ssc_output_data_name] = ssc.data_get_number(dat, name)
             elif (ssc_output_data_type == 3):
-                ssc_out[ssc_output_data_name] = ssc.data_get_array(dat, ssc_output_data_name.encode("ascii"))
+                ssc_out[ssc_output_data_name] = ssc.data_get_array(dat, name)
             elif (ssc_output_data_type == 4):
-                ssc_out[ssc_output_data_name] = ssc.data_get_matrix(dat, ssc_output_data_name.encode("ascii"))
+                ssc_out[ssc_output_data_name] = ssc.data_get_matrix(dat, name)
             elif (ssc_output_data_type == 5):
-                ssc_out[ssc_output_data_name] = ssc.data_get_table(dat, ssc_output_data_name.encode("ascii"))
-        i = i + 1
+                ssc_out[ssc_output_data_name] = ssc.data_get_table(dat, name)
 
-    ssc.data_free(dat)
-    ssc.module_free(cmod)
+    if free:
+        ssc.data_free(dat)
+        ssc.module_free(cmod)
     return ssc_out
 
 #TODO: verify darwin and linux paths work
@@ -484,10 +586,10 @@ class PySSC:
         self.pdll.ssc_data_set_number(c_void_p(p_data), c_char_p(name), c_number(value))
 
     def data_set_array(self, p_data, name, parr):
-        count = len(parr)
-        arr = (c_number * count)()
-        arr[:] = parr  # set all at once instead of looping
-        return self.pdll.ssc_data_set_array(c_void_p(p_data), c_char_p(name), pointer(arr), c_int(count))
+        # NumPy float64 arrays are passed by pointer without copying, other sequences are converted once
+        arr = np.ascontiguousarray(parr, dtype=c_number).ravel()
+        return self.pdll.ssc_data_set_array(c_void_p(p_data), c_char_p(name), arr.ctypes.data_as(POINTER(c_number)),
+                                            c_int(arr.size))
 
     def data_set_array_from_csv(self, p_data, name, fn):
         f = open(fn, 'rb')
@@ -498,16 +600,13 @@ class PySSC:
         return self.data_set_array(p_data, name, data)
 
     def data_set_matrix(self, p_data, name, mat):
-        nrows = len(mat)
-        ncols = len(mat[0])
-        size = nrows * ncols
-        arr = (c_number * size)()
-        idx = 0
-        for r in range(nrows):
-            for c in range(ncols):
-                arr[idx] = c_number(mat[r][c])
-                idx = idx + 1
-        return self.pdll.ssc_data_set_matrix(c_void_p(p_data), c_char_p(name), pointer(arr), c_int(nrows), c_int(ncols))
+        # NumPy float64 (row-major) matrices are passed by pointer without copying, nested lists are converted once
+        arr = np.ascontiguousarray(mat, dtype=c_number)
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        nrows, ncols = arr.shape
+        return self.pdll.ssc_data_set_matrix(c_void_p(p_data), c_char_p(name), arr.ctypes.data_as(POINTER(c_number)),
+                                             c_int(nrows), c_int(ncols))
 
     def data_set_matrix_from_csv(self, p_data, name, fn):
         f = open(fn, 'rb')
@@ -530,27 +629,24 @@ class PySSC:
         self.pdll.ssc_data_get_number(c_void_p(p_data), c_char_p(name), byref(val))
         return val.value
 
+    # Arrays and matrices are returned as float64 NumPy arrays, copied once from the ssc buffer because the buffer
+    # is owned by the ssc data table
     def data_get_array(self, p_data, name):
         count = c_int()
         self.pdll.ssc_data_get_array.restype = POINTER(c_number)
         parr = self.pdll.ssc_data_get_array(c_void_p(p_data), c_char_p(name), byref(count))
-        arr = parr[0:count.value]  # extract all at once
-        return arr
+        if not parr or count.value <= 0:
+            return np.empty(0, dtype=c_number)
+        return np.ctypeslib.as_array(parr, shape=(count.value,)).copy()
 
     def data_get_matrix(self, p_data, name):
         nrows = c_int()
         ncols = c_int()
         self.pdll.ssc_data_get_matrix.restype = POINTER(c_number)
         parr = self.pdll.ssc_data_get_matrix(c_void_p(p_data), c_char_p(name), byref(nrows), byref(ncols))
-        idx = 0
-        mat = []
-        for r in range(nrows.value):
-            row = []
-            for c in range(ncols.value):
-                row.append(float(parr[idx]))
-                idx = idx + 1
-            mat.append(row)
-        return mat
+        if not parr or nrows.value <= 0 or ncols.value <= 0:
+            return np.empty((0, 0), dtype=c_number)
+        return np.ctypeslib.as_array(parr, shape=(nrows.value, ncols.value)).copy()
 
     # don't call data_free() on the result, it's an internal
     # pointer inside SSC
@@ -0,0 +1,218 @@
+import csv
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+# If True, parsed resource files are persisted next to the resource file as '<resource file>.<kind>.npz' sidecars.
+# Off by default, as resource files may be in shared or read-only directories
+sidecar_enabled = False
+
+# Parsed resource data in this process, keyed by (file path, file size, file modification time)
+_store = {}
+
+
+class SolarResourceTable:
+    """
+    Columnar solar resource data, parsed once from an NSRDB formatted csv file.
+
+    SAM solar resource dictionaries, DataFrames and clustering arrays are served from the same column buffers.
+    """
+    # SAM solar_resource_data key: resource file column
+    sam_columns = {'year': 'Year',
+                   'month': 'Month',
+                   'day': 'Day',
+                   'hour': 'Hour',
+                   'minute': 'Minute',
+                   'dn': 'DNI',
+                   'df': 'DHI',
+                   'gh': 'GHI',
+                   'wspd': 'Wind Speed',
+                   'tdry': 'Temperature'}
+
+    def __init__(self, meta: dict, columns: dict):
+        """
+        :param meta: header metadata, name: value string (e.g., 'Latitude', 'Time Zone')
+        :param columns: resource data, column name: array
+        """
+        self.meta = meta
+        self.columns = columns
+
+    def meta_float(self, name: str) -> float:
+        return float(self.meta[name])
+
+    def column(self, names: list):
+        """
+        Gets the first available column
+
+        :param names: candidate column names
+        :returns: column array or None if not found
+        """
+        for name in names:
+            if name in self.columns:
+                return self.columns[name]
+        return None
+
+    def to_sam_dict(self) -> dict:
+        """
+        Formats as 'solar_resource_data' dictionary for use in PySAM, equivalent to
+        ``PySAM.ResourceTools.SAM_CSV_to_solar_data`` with dew point, relative humidity or pressure added
+
+        :returns: solar_resource_data dictionary
+        """
+        if "Time Zone" not in self.meta:
+            raise ValueError("`Time Zone` field not found in solar resource file.")
+        data = {'tz': self.meta_float('Time Zone'),
+                'elev': self.meta_float('Elevation'),
+                'lat': self.meta_float('Latitude'),
+                'lon': self.meta_float('Longitude')}
+        for key, name in self.sam_columns.items():
+            data[key] = self.columns[name].tolist()
+
+        if 'Dew Point' in self.columns:
+            data['tdew'] = self.columns['Dew Point'].tolist()
+        elif 'RH' in self.columns:
+            data['rh'] = self.columns['RH'].tolist()
+        elif 'Pressure' in self.columns:
+            data['pres'] = self.columns['Pressure'].tolist()
+        return data
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        :returns: resource data as a DataFrame with the resource file column names
+        """
+        return pd.DataFrame({name: values.copy() for name, values in self.columns.items()})
+
+    def to_arrays(self) -> dict:
+        """
+        :returns: flat dictionary of 'meta:' prefixed header and 'col:' prefixed column arrays, used for sidecars
+        """
+        arrays = {'meta:' + k: np.array(v) for k, v in self.meta.items()}
+        arrays.update({'col:' + k: v for k, v in self.columns.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: dict):
+        meta = {k[5:]: str(v) for k, v in arrays.items() if k.startswith('meta:')}
+        columns = {k[4:]: v for k, v in arrays.items() if k.startswith('col:')}
+        return cls(meta, columns)
+
+    @classmethod
+    def from_csv(cls, filename: str):
+        """
+        Parses NSRDB formatted csv file: header names and values in the first two rows, followed by resource data
+
+        :param filename: solar resource file
+        """
+        with open(filename) as file_in:
+            reader = csv.reader(file_in)
+            names = next(reader)
+            values = next(reader)
+        meta = {name.strip(): value.strip() for name, value in zip(names, values) if len(name.strip()) > 0}
+
+        # round trip float conversion matches python's float() of the csv text
+        df = pd.read_csv(filename, skiprows=2, header=0, float_precision='round_trip')
+        columns = {name: df[name].to_numpy(dtype=float) for name in df.columns
+                   if len(name) > 0 and not name.startswith('Unnamed')}
+        return cls(meta, columns)
+
+
+def file_hash(filename: str) -> str:
+    """
+    :returns: sha1 hex digest of file contents
+    """
+    sha = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def sidecar_path(filename: str, kind: str) -> str:
+    return "{}.{}.npz".format(filename, kind)
+
+
+def _load_arrays(filename: str, kind: str, parse):
+    """
+    Loads parsed resource arrays from memory, the file's sidecar if it matches the file hash, or parses the file
+    and writes the sidecar
+
+    :param filename: resource file
+    :param kind: sidecar kind, one per parse function
+    :param parse: function of filename that returns a dictionary of arrays
+    :returns: dictionary of arrays
+    """
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), kind, stat.st_size, stat.st_mtime_ns)
+    if key in _store:
+        return _store[key]
+
+    arrays = None
+    digest = file_hash(filename) if sidecar_enabled else None
+    path = sidecar_path(filename, kind)
+    if sidecar_enabled and os.path.isfile(path):
+        try:
+            with np.load(path, allow_pickle=False) as sidecar:
+                if str(sidecar['__hash']) == digest:
+                    arrays = {k: sidecar[k] for k in sidecar.files if k != '__hash'}
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            arrays = None
+
+    if arrays is None:
+        arrays = parse(filename)
+        if sidecar_enabled:
+            # written to a temporary file first, so other processes never read a partially written sidecar
+            temp_name = None
+            try:
+                with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp',
+                                                 delete=False) as f:
+                    temp_name = f.name
+                    np.savez(f, __hash=np.array(digest), **arrays)
+                os.replace(temp_name, path)
+            except OSError:
+                # e.g. read-only resource directory, the parsed data is still stored in this process
+                if temp_name is not None and os.path.exists(temp_name):
+                    os.remove(temp_name)
+
+    _store[key] = arrays
+    return arrays
+
+
+def load_solar_table(filename: str) -> SolarResourceTable:
+    """
+    Gets solar resource data of an NSRDB formatted csv file, parsing the file only if it is not stored
+
+    :param filename: solar resource file
+    :returns: SolarResourceTable
+    """
+    filename = str(filename)
+    if not os.path.isfile(filename):
+        raise FileNotFoundError(filename + " does not exist.")
+    arrays = _load_arrays(filename, 'solar', lambda f: SolarResourceTable.from_csv(f).to_arrays())
+    return SolarResourceTable.from_arrays(arrays)
+
+
+def load_wind_data(filename: str) -> dict:
+    """
+    Gets 'wind_resource_data' dictionary of an SRW file (see PySAM.ResourceTools.SRW_to_wind_data), parsing the file
+    only if it is not stored
+
+    :param filename: wind resource file
+    :returns: wind_resource_data dictionary
+    """
+    from PySAM.ResourceTools import SRW_to_wind_data     # imported here so solar data does not require PySAM
+
+    filename = str(filename)
+    if not os.path.isfile(filename):
+        raise FileNotFoundError(filename + " does not exist.")
+    arrays = _load_arrays(filename, 'wind', lambda f: {k: np.array(v) for k, v in SRW_to_wind_data(f).items()})
+    return {k: v.tolist() for k, v in arrays.items()}
+
+
+def clear():
+    """Clears resource data stored in this process"""
+    _store.clear()
@@ -1,11 +1,9 @@
-import csv
-from collections import defaultdict
 import numpy as np
-from PySAM.ResourceTools import SAM_CSV_to_solar_data
 
 from hybrid.keys import get_developer_nrel_gov_key
 from hybrid.log import hybrid_logger as logger
 from hybrid.resource.resource import *
+from hybrid.resource.resource_store import load_solar_table
 
 
 class SolarResource(Resource):
@@ -92,24 +90,8 @@ class SolarResource(Resource):
         :key tdew: array, dew point temp [C]
         :key press: array, atmospheric pressure [mbar]
         """
-        self._data = SAM_CSV_to_solar_data(data_dict)
-        # TODO: Update ResourceTools.py in pySAM to include pressure and dew point or relative humidity
-        with open(data_dict) as file_in:
-            wfd = defaultdict(list)
-            for i in range(2):
-                file_in.readline()
-            reader = csv.DictReader(file_in)
-            for row in reader:
-                for col, dat in row.items():
-                    if len(col) > 0:
-                        wfd[col].append(float(dat))
-
-        if 'Dew Point' in wfd:
-            self._data['tdew'] = wfd.pop('Dew Point')
-        elif 'RH' in wfd:
-            self._data['rh'] = wfd.pop('RH')
-        elif 'Pressure' in wfd:
-            self._data['pres'] = wfd.pop('Pressure')
+        # File is parsed once per process (and optionally cached in a sidecar), see hybrid.resource.resource_store
+        self._data = load_solar_table(data_dict).to_sam_dict()
 
 
     def roll_timezone(self, roll_hours, timezone):
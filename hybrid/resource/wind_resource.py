@@ -1,11 +1,11 @@
 import csv
 from collections import defaultdict
 import numpy as np
-from PySAM.ResourceTools import SRW_to_wind_data
 
 from hybrid.keys import get_developer_nrel_gov_key
 from hybrid.log import hybrid_logger as logger
 from hybrid.resource.resource import *
+from hybrid.resource.resource_store import load_wind_data
 
 
 class WindResource(Resource):
@@ -163,4 +163,4 @@ class WindResource(Resource):
         Sets the wind resource data to a dictionary in SAM Wind format (see Pysam.ResourceTools.SRW_to_wind_data)
         """
 
-        self._data = SRW_to_wind_data(data_file)
+        self._data = load_wind_data(data_file)
@@ -0,0 +1,123 @@
+import hashlib
+import pickle
+
+from hybrid.power_source import export_pysam_inputs
+
+
+class SimulationStageTracker:
+    """
+    Tracks which stages of a hybrid simulation are stale, so that ``HybridSimulation.simulate(incremental=True)`` only
+    re-runs those stages.
+
+    Stages are ordered, a stale stage makes all later stages stale:
+
+        #. ``generation``: non-dispatchable technology simulations (e.g., PV and wind)
+        #. ``dispatch``: storage dispatch, hybrid generation and grid connection
+        #. ``financials``: installed costs and financial models
+
+    Each input is tagged with the first stage it invalidates. Inputs of PV and wind system models invalidate
+    ``generation``, inputs of the battery and grid system models, site schedule and prices, dispatch options and the
+    financial inputs read by dispatch (``dispatch_financial_inputs``) invalidate ``dispatch``, all other inputs
+    invalidate ``financials``.
+
+    A fingerprint of the inputs of each stage is stored after a simulation; a stage is stale if its fingerprint
+    changed. Inputs that cannot be fingerprinted, e.g., python system models, CSP plants, leave their stage stale.
+    Changes not covered by the tagged inputs, e.g., to dispatch models, can be flagged with ``invalidate``.
+    """
+    stages = ('generation', 'dispatch', 'financials')
+    dispatch_technologies = ('battery', 'grid')
+    dispatch_financial_inputs = ('system_capacity', 'om_capacity', 'ppa_price_input', 'dispatch_factors_ts')
+
+    def __init__(self):
+        self._fingerprints = {}     # stage: fingerprint of the stage inputs when last simulated
+
+    def invalidate(self, stage: str = 'generation'):
+        """
+        Flags a stage, and all later stages, as stale
+
+        :param stage: first stale stage
+        """
+        for name in self.stages[self.stages.index(stage):]:
+            self._fingerprints.pop(name, None)
+
+    def stale_stages(self, simulation, project_life: int, lifetime_sim: bool) -> tuple:
+        """
+        :param simulation: hybrid simulation
+        :param project_life: Number of year in the analysis period [years]
+        :param lifetime_sim: whether each year of the project life is simulated
+        :returns: stale stages in simulation order
+        """
+        fingerprints = self.fingerprints(simulation, project_life, lifetime_sim)
+        for i, stage in enumerate(self.stages):
+            fingerprint = self._fingerprints.get(stage)
+            if fingerprint is None or fingerprint != fingerprints[stage]:
+                return self.stages[i:]
+        return ()
+
+    def update(self, simulation, project_life: int, lifetime_sim: bool):
+        """
+        Stores the fingerprints of the stage inputs after a simulation
+
+        :param simulation: hybrid simulation
+        :param project_life: Number of year in the analysis period [years]
+        :param lifetime_sim: whether each year of the project life is simulated
+        """
+        self._fingerprints = self.fingerprints(simulation, project_life, lifetime_sim)
+
+    def fingerprints(self, simulation, project_life: int, lifetime_sim: bool) -> dict:
+        """
+        :returns: dict of stage: fingerprint of its inputs, None if the inputs cannot be fingerprinted
+        """
+        inputs = {stage: {} for stage in self.stages}
+        untracked = set()
+        inputs['generation']['project_life'] = (project_life, lifetime_sim)
+        inputs['financials']['project_life'] = project_life
+        for name, tech in simulation.power_sources.items():
+            if name in ('tower', 'trough'):
+                return dict.fromkeys(self.stages)
+            system_stage = 'dispatch' if name in self.dispatch_technologies else 'generation'
+            system_inputs = self._model_inputs(tech._system_model)
+            if system_inputs is None:
+                untracked.add(system_stage)
+            inputs[system_stage][name] = (system_inputs, tech._assigned_generation)
+
+            financial_inputs = self._model_inputs(tech._financial_model)
+            if financial_inputs is None:
+                untracked.update(('dispatch', 'financials'))
+                continue
+            dispatch_inputs = {}
+            for group_values in financial_inputs.values():
+                for var_name in self.dispatch_financial_inputs:
+                    if var_name in group_values:
+                        dispatch_inputs[var_name] = group_values[var_name]
+            inputs['dispatch'][name + '_financial'] = dispatch_inputs
+            inputs['financials'][name] = financial_inputs
+
+        site = simulation.site
+        inputs['dispatch']['site'] = (getattr(site, 'follow_desired_schedule', None),
+                                      getattr(site, 'desired_schedule', None),
+                                      getattr(getattr(site, 'elec_prices', None), 'data', None))
+        if simulation.dispatch_builder is not None:
+            inputs['dispatch']['options'] = vars(simulation.dispatch_builder.options)
+        inputs['financials']['site'] = getattr(site, 'capacity_hours', None)
+        inputs['financials']['cost_model'] = vars(simulation.cost_model) if simulation.cost_model else None
+        inputs['financials']['sim_options'] = simulation.sim_options
+
+        return {stage: None if stage in untracked else self._fingerprint(stage_inputs)
+                for stage, stage_inputs in inputs.items()}
+
+    @staticmethod
+    def _model_inputs(model):
+        """PySAM model inputs, None for models that cannot be fingerprinted"""
+        if model is None:
+            return {}
+        if hasattr(model, 'get_data_ptr'):
+            return export_pysam_inputs(model)
+        return None
+
+    @staticmethod
+    def _fingerprint(stage_inputs: dict):
+        try:
+            return hashlib.sha1(pickle.dumps(stage_inputs, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
@@ -62,6 +62,15 @@ class TowerPlant(CspPlant):
         rel_path_to_param_files = os.path.join('pySSC_daotk', 'tower_data')
         self.param_file_paths(rel_path_to_param_files)
 
+        # SSC time series stored during simulation with dispatch
+        self.ssc_time_series_outputs = ['gen', 'P_out_net', 'P_cycle', 'eta', 'q_pb', 'q_dot_pc_startup', 'q_pc_startup',
+                                        'e_ch_tes', 'q_dc_tes', 'q_ch_tes', 'Q_thermal', 'q_dot_rec_inc', 'q_startup',
+                                        'm_dot_rec', 'T_tes_hot', 'T_tes_cold', 'tank_losses', 'P_tower_pump',
+                                        'pparasi', 'P_cooling_tower_tot', 'beam', 'tdry',
+                                        'is_rec_su_allowed', 'is_pc_su_allowed', 'is_pc_sb_allowed',
+                                        'q_dot_pc_target_on', 'q_dot_pc_max', 'defocus', 'rec_op_mode_final',
+                                        'pc_op_mode_final']
+
         super().__init__("TowerPlant", 'tcsmolten_salt', site, financial_model, tower_config)
 
         self.optimize_field_before_sim = True
@@ -82,8 +91,7 @@ class TowerPlant(CspPlant):
 
         # load heliostat field  # TODO: this is required but is replaced when new field is generated
         heliostat_layout = np.genfromtxt(self.param_files['helio_positions_path'], delimiter=',')
-        N_hel = heliostat_layout.shape[0]
-        helio_positions = [heliostat_layout[j, 0:2].tolist() for j in range(N_hel)]
+        helio_positions = np.ascontiguousarray(heliostat_layout[:, 0:2])
         self.ssc.set({'helio_positions': helio_positions})
 
     def scale_params(self, params_names: list = ['tank_heaters', 'tank_height']):
@@ -177,7 +185,7 @@ class TowerPlant(CspPlant):
              (tech_outputs['N_hel'], tech_outputs['h_tower'], tech_outputs['rec_height'], tech_outputs['D_rec']))
         self.ssc.set(original_values)
         eta_map = tech_outputs["eta_map_out"]
-        flux_maps = [r[2:] for r in tech_outputs['flux_maps_for_import']]  # don't include first two columns
+        flux_maps = np.ascontiguousarray(np.asarray(tech_outputs['flux_maps_for_import'])[:, 2:])  # don't include first two columns
         A_sf_in = tech_outputs["A_sf"]
         field_and_flux_maps = {'eta_map': eta_map, 'flux_maps': flux_maps, 'A_sf_in': A_sf_in}
         for k in ['helio_positions', 'N_hel', 'D_rec', 'rec_height', 'h_tower', 'land_area_base']:
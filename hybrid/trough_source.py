@@ -38,6 +38,15 @@ class TroughPlant(CspPlant):
         rel_path_to_param_files = os.path.join('pySSC_daotk', 'trough_data')
         self.param_file_paths(rel_path_to_param_files)
 
+        # SSC time series stored during simulation with dispatch
+        self.ssc_time_series_outputs = ['gen', 'P_out_net', 'P_cycle', 'eta', 'q_pb', 'q_dot_pc_startup', 'q_pc_startup',
+                                        'e_ch_tes', 'q_dc_tes', 'q_ch_tes', 'Q_thermal', 'qsf_expected', 'qinc_costh',
+                                        'm_dot_field_delivered', 'T_tes_hot', 'T_tes_cold', 'tank_losses', 'pparasi',
+                                        'P_cooling_tower_tot', 'beam', 'tdry',
+                                        'is_rec_su_allowed', 'is_pc_su_allowed', 'is_pc_sb_allowed',
+                                        'q_dot_pc_target', 'q_dot_pc_max', 'defocus', 'rec_op_mode_final',
+                                        'pc_op_mode_final']
+
         super().__init__("TroughPlant", 'trough_physical', site, financial_model, trough_config)
 
         self._dispatch: TroughDispatch = None
@@ -50,7 +59,7 @@ class TroughPlant(CspPlant):
         """
         self.ssc.set({'time_start': 0.0, 'time_stop': 0.0})
         self.ssc.set({'is_dispatch_targets': 0})
-        tech_outputs = self.ssc.execute()
+        tech_outputs = self.ssc.execute(outputs=['total_aperture', 'total_land_area'])
         return tech_outputs['total_aperture'], tech_outputs['total_land_area']
 
     def calculate_total_installed_cost(self) -> float:
@@ -67,5 +67,6 @@ setup(name='HOPP',
       package_data=package_data,
       include_package_data=True,
       install_requires=open("requirements.txt").readlines(),
+      extras_require={'sparse': ['scipy>=1.9']},
       tests_require=['pytest']
       )
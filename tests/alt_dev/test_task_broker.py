@@ -0,0 +1,168 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from alt_dev.task_broker import connect_broker, run_worker, task_id_from, SQLiteBroker
+
+
+class SquareProblem:
+    """Stub design problem, fails for negative x"""
+    def evaluate_objective(self, candidate: tuple) -> dict:
+        x = dict(candidate)['x']
+        if x < 0:
+            raise ValueError("x must be positive")
+        return {'x': x, 'y': np.full(3, x ** 2), 'n': np.int64(x)}
+
+
+@pytest.fixture
+def broker_url(tmp_path):
+    return 'sqlite://' + str(tmp_path / 'broker.db')
+
+
+def test_submit_lease_complete(broker_url):
+    broker = connect_broker(broker_url)
+    assert isinstance(broker, SQLiteBroker)
+    task_id = task_id_from((('x', 1.0),))
+    broker.submit(task_id, ['sample', 1])
+    broker.submit(task_id, ['sample', 2])     # already queued
+
+    assert broker.lease('w1', 60.) == (task_id, ['sample', 1])
+    assert broker.lease('w2', 60.) is None
+    assert broker.pop_results() == []
+
+    broker.complete(task_id, 'w1', {'y': np.arange(3), 'flag': np.bool_(True)})
+    assert broker.pop_results() == [(task_id, {'y': [0, 1, 2], 'flag': True, 'caller': [['sample', 1]]})]
+    assert broker.pop_results() == []
+
+    with pytest.raises(ValueError):
+        connect_broker('unknown://broker')
+
+
+def test_lease_expiry_and_heartbeat(broker_url):
+    broker = connect_broker(broker_url, max_attempts=2)
+    task_id = task_id_from((('x', 1.0),))
+    broker.submit(task_id, ['sample', 1])
+    assert broker.lease('w1', 0.2) is not None
+
+    # heartbeats extend the lease
+    broker.heartbeat('w1', 60.)
+    time.sleep(0.3)
+    assert broker.lease('w2', 0.2) is None
+    assert 'w1' in broker.worker_heartbeats()
+
+    # an expired lease is re-queued to another worker
+    broker.heartbeat('w1', 0.0)
+    time.sleep(0.05)
+    assert broker.lease('w2', 0.2) == (task_id, ['sample', 1])
+
+    # the task fails once its lease expired max_attempts times, late results are discarded
+    time.sleep(0.3)
+    assert broker.lease('w3', 0.2) is None
+    results = broker.pop_results()
+    assert len(results) == 1 and results[0][0] == task_id
+    assert 'exception' in results[0][1]
+    broker.complete(task_id, 'w1', {'y': 1.0})
+    assert broker.pop_results() == []
+
+
+def test_shutdown(broker_url):
+    broker = connect_broker(broker_url)
+    assert not broker.is_shutdown()
+    broker.shutdown()
+    assert connect_broker(broker_url).is_shutdown()
+    broker.reset()
+    assert not broker.is_shutdown()
+
+
+def test_reset_clears_earlier_run(broker_url):
+    # a run interrupted with a queued task and an uncollected result
+    broker = connect_broker(broker_url)
+    stale_id, queued_id = task_id_from((('x', 1.0),)), task_id_from((('x', 2.0),))
+    broker.submit(stale_id, ['run-1', 0])
+    broker.submit(queued_id, ['run-1', 1])
+    assert broker.lease('w1', 60.)[0] == stale_id
+    broker.complete(stale_id, 'w1', {'y': -1.0})
+    broker.shutdown()
+    broker.close()
+
+    # the next run with the same database starts without tasks, results or workers of the earlier run
+    broker = connect_broker(broker_url)
+    broker.reset()
+    assert broker.pop_results() == []
+    assert broker.lease('w2', 60.) is None
+    assert broker.worker_heartbeats() == {}
+
+    broker.submit(stale_id, ['run-2', 0])
+    assert broker.lease('w2', 60.) == (stale_id, ['run-2', 0])
+
+
+def test_run_worker(broker_url):
+    broker = connect_broker(broker_url)
+    candidates = [(('x', 2.0),), (('x', -1.0),)]
+    for i, candidate in enumerate(candidates):
+        broker.submit(task_id_from(candidate), ['sample', i])
+
+    num_tasks = []
+    worker = threading.Thread(target=lambda: num_tasks.append(
+        run_worker(broker_url, SquareProblem, worker_id='w1', lease_time=0.3, poll_interval=0.01)))
+    worker.start()
+
+    results = {}
+    deadline = time.time() + 30
+    while len(results) < len(candidates) and time.time() < deadline:
+        results.update(broker.pop_results())
+        time.sleep(0.01)
+    broker.shutdown()
+    worker.join()
+
+    assert num_tasks == [2]
+    result = results[task_id_from(candidates[0])]
+    assert result['y'] == [4.0, 4.0, 4.0] and result['n'] == 2
+    assert result['caller'] == [['sample', 0]] and result['eval_time'] >= 0.0
+    # exceptions of the evaluation are returned as results instead of stopping the worker
+    assert 'x must be positive' in results[task_id_from(candidates[1])]['exception']
+
+
+class SquareSamplingProblem(SquareProblem):
+    """Stub design problem with the interface used by the optimization driver"""
+    sep = '__'
+    candidate_fields = ['x']
+    design_variables = {'x': {'lower': 0.0, 'upper': 1.0}}
+    fixed_variables = {}
+
+    def init_simulation(self):
+        pass
+
+    def candidate_from_unit_array(self, x) -> tuple:
+        return (('x', float(x[0])),)
+
+    candidate_from_array = candidate_from_unit_array
+
+
+def test_drivers_sharing_broker(broker_url, tmp_path):
+    diskcache = pytest.importorskip('diskcache')
+    from alt_dev.optimization_driver_alt import OptimizationDriver
+
+    def sample(name: str, x: float) -> dict:
+        driver = OptimizationDriver(SquareSamplingProblem, n_proc=1, broker=broker_url, lease_time=5.,
+                                    cache_dir=str(tmp_path / name))
+        driver.parallel_sample([[x]])
+        with diskcache.Cache(driver.options['cache_dir'], disk=diskcache.JSONDisk) as cache:
+            return cache[(('x', x),)]
+
+    assert sample('run-1', 0.5)['y'] == [0.25] * 3
+
+    # an interrupted run left a queued task and an uncollected result of the candidate evaluated by the next run
+    broker = connect_broker(broker_url)
+    stale_id = task_id_from((('x', 0.25),))
+    broker.submit(stale_id, ['run-1', 1])
+    broker.submit(task_id_from((('x', 0.75),)), ['run-1', 2])
+    broker.lease('w1', 60.)
+    broker.complete(stale_id, 'w1', {'x': 0.25, 'y': [-1.0] * 3})
+    broker.close()
+
+    # the second driver evaluates its candidate instead of collecting the stale result
+    assert sample('run-2', 0.25)['y'] == [0.0625] * 3
+    assert connect_broker(broker_url).pop_results() == []
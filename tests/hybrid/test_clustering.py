@@ -229,6 +229,42 @@ def test_various_simulation_days():
         [0, 7, 15, 26, 27, 42, 43, 63, 73, 74, 75, 77, 78, 80, 84, 89, 103, 107, 112, 117]
 
 
+def test_warm_start_and_k_medoids():
+    clusterer = clustering.Clustering(
+        power_sources=['tower'],
+        solar_resource_file="resource_files/solar/35.2018863_-101.945027_psmv3_60_2012.csv")
+    clusterer.run_clustering()
+    wcss = clusterer.clusters['wcss']
+
+    clusterer.afp_warm_start = True
+    clusterer.run_clustering()
+    assert clusterer.clusters['n_cluster'] == 20
+    assert clusterer.clusters['wcss'] == approx(wcss, 0.05)
+
+    clusterer.algorithm = 'k-medoids'
+    for n_cluster in (7, 20):
+        clusterer.n_cluster = n_cluster
+        clusterer.run_clustering()
+        assert clusterer.clusters['n_cluster'] == n_cluster
+        assert len(clusterer.sim_start_days) == n_cluster
+        assert list(clusterer.clusters['exemplars']) == sorted(clusterer.clusters['exemplars'])
+        assert clusterer.clusters['weights_adjusted'].sum() == approx(1.0)
+    assert clusterer.clusters['wcss'] == approx(wcss, 0.15)
+
+
+def test_k_medoids_many_observations():
+    np.random.seed(0)
+    centers = np.random.rand(5, 8) * 10
+    data = np.concatenate([center + np.random.rand(300, 8) for center in centers])
+    alg = clustering.KMedoids(n_clusters=5).fit_predict(data)
+    assert alg.converged
+    assert len(np.unique(alg.cluster_index)) == 5
+    for k in range(5):
+        assert len(np.unique(alg.cluster_index[k*300:(k+1)*300])) == 1
+    assert np.allclose(clustering.squared_distances(data, max_block_size=1000),
+                       ((data[:, None, :] - data[None, :, :]) ** 2).sum(2))
+
+
 def test_custom_weights_and_divisions():
     clusterer = clustering.Clustering(
         power_sources=['tower'],
@@ -412,3 +448,58 @@ def test_cluster_avgs_from_timeseries():
     assert max(list_lengths) == min(list_lengths)
     assert sum(cluster_averages[0]) == approx(495893, 1e-3)
     assert sum(cluster_averages[-1]) == approx(2734562, 1e-3)
+
+
+def test_division_weights():
+    # 10 points averaged over 3 divisions of 3.33 points
+    points, divisions, weights = clustering.division_weights(10, 3)
+    assert list(divisions) == [0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2]
+    assert list(points) == [0, 1, 2, 3, 3, 4, 5, 6, 6, 7, 8, 9]
+    assert weights[:4] == approx([0.3, 0.3, 0.3, 0.1])
+    for i in range(3):
+        assert weights[divisions == i].sum() == approx(1.0)
+
+    # full day at a 5-minute resolution
+    points, divisions, weights = clustering.division_weights(288, 4)
+    assert points.max() == 287
+    assert np.bincount(divisions, weights) == approx(np.ones(4))
+
+
+def test_cached_results(tmp_path):
+    clustering.clear_cached_results()
+    price_data = parse_price_data()
+
+    def run_clustering(**parameters):
+        clusterer = clustering.Clustering(
+            power_sources=['tower', 'pv', 'battery'],
+            solar_resource_file="resource_files/solar/35.2018863_-101.945027_psmv3_60_2012.csv",
+            price_data=price_data)
+        for name, value in parameters.items():
+            setattr(clusterer, name, value)
+        clusterer.run_clustering()
+        return clusterer
+
+    clusterer = run_clustering(use_cache=False)
+    key = clusterer.fingerprint()
+    assert len(clustering._results) == 0
+
+    # results are stored in this process and the cache directory
+    cached = run_clustering(cache_dir=str(tmp_path))
+    assert key in clustering._results
+    assert (tmp_path / 'clusters_{}.npz'.format(key)).is_file()
+    assert list(tmp_path.glob('*.tmp')) == []
+
+    for cached in (run_clustering(), run_clustering(use_cache=False, cache_dir=str(tmp_path))):
+        assert cached.weights == clusterer.weights
+        assert (cached.index_first, cached.index_last) == (clusterer.index_first, clusterer.index_last)
+        assert cached.sim_start_days == clusterer.sim_start_days
+        assert cached.daylight_cutoffs == clusterer.daylight_cutoffs
+        assert cached.clusters['n_cluster'] == clusterer.clusters['n_cluster']
+        assert np.array_equal(cached.clusters['weights_adjusted'], clusterer.clusters['weights_adjusted'])
+        assert np.array_equal(cached.data, clusterer.data)
+        assert cached.get_sim_start_end_times(0) == clusterer.get_sim_start_end_times(0)
+        assert cached.battery_soc_heuristic(0) == clusterer.battery_soc_heuristic(0)
+
+    # other inputs are not served from the cache
+    assert run_clustering(n_cluster=10).clusters['n_cluster'] == 10
+    clustering.clear_cached_results()
@@ -81,6 +81,60 @@ def test_pySSC_tower_increment_simulation(site):
     assert increments_annual_energy == pytest.approx(wo_increments_annual_energy, 1e-5)
 
 
+def test_pySSC_persistent_data_table(site):
+    """Testing pySSC persistent data table matches a fresh data table on every execute"""
+    trough_config = {'cycle_capacity_kw': 100 * 1000,
+                     'solar_multiple': 1.5,
+                     'tes_hours': 5.0}
+
+    csp = TroughPlant(site, trough_config)
+    assert csp.ssc.persistent
+
+    start_datetime, end_datetime = CspDispatch.get_start_end_datetime(293*24, 72)
+    increment_duration = datetime.timedelta(hours=24)
+
+    n = int((end_datetime - start_datetime).total_seconds() / increment_duration.total_seconds())
+    for j in range(n):
+        start_datetime_new = start_datetime + j * increment_duration
+        end_datetime_new = start_datetime_new + increment_duration
+        csp.ssc.set({'time_start': CspDispatch.seconds_since_newyear(start_datetime_new)})
+        csp.ssc.set({'time_stop': CspDispatch.seconds_since_newyear(end_datetime_new)})
+        csp.update_ssc_inputs_from_plant_state()
+
+        persistent_outputs = csp.ssc.execute()
+        csp.ssc.persistent = False
+        fresh_outputs = csp.ssc.execute()
+        csp.ssc.persistent = True
+
+        assert persistent_outputs['annual_energy'] == pytest.approx(fresh_outputs['annual_energy'], 1e-8)
+        assert persistent_outputs['e_ch_tes'] == pytest.approx(fresh_outputs['e_ch_tes'], 1e-8)
+        csp.set_plant_state_from_ssc_outputs(persistent_outputs, increment_duration.total_seconds())
+
+
+def test_pySSC_requested_outputs(site):
+    """Testing pySSC returns only requested outputs with the same values as the full output dictionary"""
+    trough_config = {'cycle_capacity_kw': 100 * 1000,
+                     'solar_multiple': 1.5,
+                     'tes_hours': 5.0}
+
+    csp = TroughPlant(site, trough_config)
+
+    start_datetime, end_datetime = CspDispatch.get_start_end_datetime(293*24, 24)
+    csp.ssc.set({'time_start': CspDispatch.seconds_since_newyear(start_datetime)})
+    csp.ssc.set({'time_stop': CspDispatch.seconds_since_newyear(end_datetime)})
+
+    all_outputs = csp.ssc.execute()
+    requested = csp.get_dispatch_ssc_outputs()
+    outputs = csp.ssc.execute(requested)
+
+    assert outputs['cmod_success']
+    assert len(outputs) < len(all_outputs)
+    for name in ['time_start', 'gen', 'e_ch_tes', 'T_out_scas_last_final']:
+        assert name in outputs
+        assert outputs[name] == pytest.approx(all_outputs[name], 1e-8)
+    assert 'annual_energy' not in outputs
+
+
 def test_pySSC_trough_model(site):
     """Testing pySSC trough model using heuristic dispatch method"""
     trough_config = {'cycle_capacity_kw': 100 * 1000,
@@ -1,8 +1,10 @@
 import pytest
+import numpy as np
+import scipy.optimize
 from pathlib import Path
 import pyomo.environ as pyomo
 from pyomo.environ import units as u
-from pyomo.opt import TerminationCondition
+from pyomo.opt import SolverResults, TerminationCondition
 from pyomo.util.check_units import assert_units_consistent
 
 from hybrid.sites import SiteInfo, flatirons_site
@@ -15,6 +17,7 @@ from hybrid.hybrid_simulation import HybridSimulation
 
 from hybrid.dispatch import *
 from hybrid.dispatch.hybrid_dispatch_builder_solver import HybridDispatchBuilderSolver
+from hybrid.dispatch.dispatch_solver_session import DispatchSolverSession, SolverSessionBackend
 
 
 @pytest.fixture
@@ -433,6 +436,36 @@ def test_simple_battery_dispatch(site):
         assert battery.Outputs.P[i] == pytest.approx(dispatch_power, 1e-3 * abs(dispatch_power))
 
 
+def test_battery_simulate_control_sequence(site):
+    control_kw = [-2000.0, -2000.0, -1000.0, 0.0, 1500.0, 3000.0, 500.0, 0.0]     # charging (-), discharging (+)
+    batteries = []
+    for _ in range(2):
+        battery = Battery(site, technologies['battery'])
+        model = pyomo.ConcreteModel(name='battery_only')
+        model.forecast_horizon = pyomo.Set(initialize=range(len(control_kw)))
+        battery._dispatch = SimpleBatteryDispatch(model,
+                                                  model.forecast_horizon,
+                                                  battery._system_model,
+                                                  battery._financial_model,
+                                                  include_lifecycle_count=False)
+        batteries.append(battery)
+    sequence_battery, step_battery = batteries
+
+    outputs = sequence_battery.simulate_control_sequence(control_kw, [1.0] * len(control_kw))
+
+    # same control inputs stepped one period at a time
+    for t, control in enumerate(control_kw):
+        step_battery._system_model.Controls.dt_hr = 1.0
+        step_battery._system_model.Controls.input_power = control
+        step_battery.simulate_power(time_step=t)
+
+    n = len(control_kw)
+    assert outputs['SOC'] == pytest.approx(np.asarray(step_battery.Outputs.SOC[:n]))
+    assert outputs['P'] == pytest.approx(np.asarray(step_battery.Outputs.P[:n]))
+    assert outputs['gen'] == pytest.approx(outputs['P'])
+    assert outputs['SOC'][2] > outputs['SOC'][0] and outputs['SOC'][5] < outputs['SOC'][3]
+
+
 def test_simple_battery_dispatch_lifecycle_count(site):
     expected_objective = 17024.52
     expected_lifecycles = 2.2514
@@ -611,6 +644,32 @@ def test_pv_wind_battery_hybrid_dispatch(site):
         assert system_generation[t] * 1e3 >= 0.0
 
 
+def test_dispatch_time_series_parameter_update(site):
+    wind_solar_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(wind_solar_battery, site)
+    hybrid_plant.pv.simulate(1)
+    hybrid_plant.wind.simulate(1)
+
+    dispatch = hybrid_plant.dispatch_builder.dispatch
+    dispatch.initialize_parameters()
+    n_horizon = hybrid_plant.dispatch_builder.options.n_look_ahead_periods
+    start_time = 8760 - 24      # horizon wraps to the start of the year
+    dispatch.update_time_series_parameters(start_time)
+    assert len(dispatch.parameter_update_times) == 1
+
+    generation = list(hybrid_plant.wind.generation_profile)
+    horizon_gen = generation[start_time:] + generation[:n_horizon - 24]
+    assert hybrid_plant.wind.dispatch.available_generation == pytest.approx([round(gen / 1e3, 4)
+                                                                            for gen in horizon_gen])
+    assert min(hybrid_plant.pv.dispatch.available_generation) >= 0.0
+
+    dispatch_factors = hybrid_plant.grid.value("dispatch_factors_ts")
+    ppa_price = hybrid_plant.grid.value("ppa_price_input")[0]
+    prices = list(dispatch_factors[start_time:]) + list(dispatch_factors[:n_horizon - 24])
+    assert hybrid_plant.grid.dispatch.electricity_sell_price == pytest.approx([round(p * ppa_price * 1e3, 4)
+                                                                              for p in prices])
+
+
 def test_hybrid_dispatch_heuristic(site):
     dispatch_options = {'battery_dispatch': 'heuristic',
                         'grid_charging': False}
@@ -645,6 +704,35 @@ def test_hybrid_dispatch_one_cycle_heuristic(site):
     assert sum(hybrid_plant.battery.Outputs.P) < 0.0
     
 
+def test_hybrid_dispatch_fast_heuristic(site):
+    wind_solar_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    fixed_dispatch = [0.0]*6
+    fixed_dispatch.extend([-1.0]*6)
+    fixed_dispatch.extend([1.0]*6)
+    fixed_dispatch.extend([0.0]*6)
+
+    for battery_dispatch in ('heuristic', 'one_cycle_heuristic'):
+        outputs = {}
+        for fast_heuristic in (False, True):
+            dispatch_options = {'battery_dispatch': battery_dispatch,
+                                'grid_charging': False,
+                                'fast_heuristic': fast_heuristic}
+            hybrid_plant = HybridSimulation(wind_solar_battery,
+                                            site,
+                                            dispatch_options=dispatch_options)
+            assert hybrid_plant.dispatch_builder.is_fast_heuristic == fast_heuristic
+            assert (hybrid_plant.dispatch_builder.pyomo_model is None) == fast_heuristic
+            if battery_dispatch == 'heuristic':
+                hybrid_plant.battery.dispatch.user_fixed_dispatch = fixed_dispatch
+            hybrid_plant.simulate(1)
+            outputs[fast_heuristic] = {key: np.array(getattr(hybrid_plant.battery.Outputs, key))
+                                       for key in ('P', 'SOC', 'dispatch_P', 'dispatch_SOC')}
+
+        assert sum(abs(outputs[True]['dispatch_P'])) > 0.0
+        for key in outputs[False].keys():
+            assert outputs[True][key] == pytest.approx(outputs[False][key], abs=1e-6)
+
+
 def test_hybrid_solar_battery_dispatch(site):
     expected_objective = 20819.456
 
@@ -709,6 +797,257 @@ def test_hybrid_dispatch_financials(site):
     assert sum(hybrid_plant.battery.Outputs.P) < 0.0
 
 
+class RecordingPersistentSolver:
+    """Persistent solver stand-in recording the model state of each solve, the solution is the price of each period"""
+    def __init__(self, supports_warm_start: bool = True):
+        self.update_config = type('UpdateConfig', (), {})()
+        self.solves = []
+        self.model = None
+        if not supports_warm_start:
+            self.solve = self.solve_without_warm_start
+
+    def solve(self, model, load_solutions=True, options=None, warmstart=False):
+        self.solves.append({'model': model,
+                            'price': [model.blocks[t].price.value for t in model.forecast_horizon],
+                            'power': [model.blocks[t].power.value for t in model.forecast_horizon],
+                            'warmstart': warmstart})
+        self.model = model
+        results = SolverResults()
+        results.problem.sense = pyomo.minimize
+        results.problem.upper_bound = 1.0
+        results.solver.termination_condition = TerminationCondition.optimal
+        return results
+
+    def solve_without_warm_start(self, model, load_solutions=True, options=None):
+        return RecordingPersistentSolver.solve(self, model, load_solutions, options)
+
+    def load_vars(self):
+        for t in self.model.forecast_horizon:
+            self.model.blocks[t].power.set_value(self.model.blocks[t].price.value)
+
+
+@pytest.mark.parametrize('supports_warm_start', [True, False])
+def test_dispatch_solver_session_reuse(monkeypatch, supports_warm_start):
+    created = []
+
+    def create(backend):
+        created.append(RecordingPersistentSolver(supports_warm_start))
+        return created[-1]
+
+    monkeypatch.setattr(SolverSessionBackend, 'create', create)
+
+    model = pyomo.ConcreteModel()
+    model.forecast_horizon = pyomo.Set(initialize=range(4))
+
+    def block_rule(b, t):
+        b.price = pyomo.Param(mutable=True, initialize=0.0)
+        b.power = pyomo.Var(bounds=(0, 100))
+    model.blocks = pyomo.Block(model.forecast_horizon, rule=block_rule)
+
+    session = DispatchSolverSession(model, 'appsi_highs', n_roll_periods=2)
+    assert session.warm_start == supports_warm_start
+    daily_prices = [[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0], [9.0, 10.0, 11.0, 12.0]]
+    for prices in daily_prices:
+        # parameters are updated in place, the model is not rebuilt
+        for t, price in zip(model.forecast_horizon, prices):
+            model.blocks[t].price = price
+        session.solve()
+
+    # one solver holds the model for all days and sees each day's parameter values
+    assert len(created) == 1 and session.n_solves == 3
+    solves = created[0].solves
+    assert all(solve['model'] is model for solve in solves)
+    assert [solve['price'] for solve in solves] == daily_prices
+    if supports_warm_start:
+        # the previous day's solution is shifted forward by the roll period
+        assert [solve['warmstart'] for solve in solves] == [False, True, True]
+        assert solves[1]['power'] == [3.0, 4.0, 4.0, 4.0]
+    else:
+        assert [solve['warmstart'] for solve in solves] == [False, False, False]
+    assert [model.blocks[t].power.value for t in model.forecast_horizon] == daily_prices[-1]
+
+
+@pytest.mark.skipif(not pyomo.SolverFactory('appsi_highs').available(exception_flag=False),
+                    reason="appsi_highs requires highspy")
+def test_hybrid_dispatch_solver_session(site):
+    wind_solar_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(wind_solar_battery,
+                                    site,
+                                    dispatch_options={'solver': 'appsi_highs',
+                                                      'is_test_start_year': True})
+    hybrid_plant.ppa_price = (0.06,)
+    hybrid_plant.simulate(1)
+
+    dispatch_builder = hybrid_plant.dispatch_builder
+    assert dispatch_builder.opt.n_solves == 5
+    assert all(condition == 'optimal' for condition in dispatch_builder.problem_state.termination_condition)
+    assert sum(hybrid_plant.battery.Outputs.P) < 0.0
+
+
+@pytest.mark.skipif(not hasattr(scipy.optimize, 'milp'),
+                    reason="sparse_highs requires scipy>=1.9")
+def test_sparse_dispatch_solver(site):
+    expected_objective = 39460.698
+
+    wind_solar_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(wind_solar_battery,
+                                    site,
+                                    dispatch_options={'solver': 'sparse_highs',
+                                                      'grid_charging': False,
+                                                      'include_lifecycle_count': False})
+    hybrid_plant.grid.value("federal_tax_rate", (0., ))
+    hybrid_plant.grid.value("state_tax_rate", (0., ))
+    hybrid_plant.ppa_price = (0.06, )
+    hybrid_plant.pv.dc_degradation = [0.5] * 1
+
+    hybrid_plant.pv.simulate(1)
+    hybrid_plant.wind.simulate(1)
+
+    hybrid_plant.dispatch_builder.dispatch.initialize_parameters()
+    hybrid_plant.dispatch_builder.dispatch.update_time_series_parameters(0)
+    hybrid_plant.battery.dispatch.initial_SOC = hybrid_plant.battery.dispatch.minimum_soc   # Set to min SOC
+
+    # same model as test_pv_wind_battery_hybrid_dispatch, solved in-process as sparse matrices
+    results = hybrid_plant.dispatch_builder.sparse_solve()
+
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    assert hybrid_plant.dispatch_builder.dispatch.objective_value == pytest.approx(expected_objective, 1e-3)
+    assert (sum(hybrid_plant.battery.dispatch.charge_power)
+            * hybrid_plant.battery.dispatch.round_trip_efficiency / 100.0
+            == pytest.approx(sum(hybrid_plant.battery.dispatch.discharge_power)))
+
+    # the model is compiled once, later horizons only update the coefficients depending on time series parameters
+    columns = hybrid_plant.dispatch_builder.opt.columns
+    hybrid_plant.dispatch_builder.dispatch.update_time_series_parameters(24)
+    results = hybrid_plant.dispatch_builder.sparse_solve()
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    assert hybrid_plant.dispatch_builder.opt.columns is columns
+    assert hybrid_plant.dispatch_builder.opt.n_solves == 2
+    assert hybrid_plant.dispatch_builder.opt.n_compiles == 1
+
+
+def test_dispatch_problem_state_telemetry(site, tmp_path):
+    solar_battery = {key: technologies[key] for key in ('pv', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(solar_battery,
+                                    site,
+                                    dispatch_options={'is_test_start_year': True})
+    hybrid_plant.simulate(1)
+
+    problem_state = hybrid_plant.dispatch_builder.problem_state
+    assert problem_state.n_solves == 5
+    assert problem_state.model_build_time > 0.0
+
+    df = problem_state.to_dataframe()
+    assert len(df) == 5
+    assert list(df['start_time']) == list(problem_state.start_time)
+    for phase in DispatchProblemState.phase_names:
+        assert (df[phase] >= 0.0).all()
+
+    summary = problem_state.summary(n_slowest=2)
+    assert sum(summary['phase_share'].values()) == pytest.approx(1.0)
+    assert len(summary['slowest_horizons']) == 2
+    assert summary['slowest_horizons']['total_time'].is_monotonic_decreasing
+
+    problem_state.to_csv(tmp_path / "dispatch_telemetry.csv")
+    assert (tmp_path / "dispatch_telemetry.csv").exists()
+
+    merged_state = DispatchProblemState()
+    merged_state.append_metrics(problem_state.get_metrics(3))
+    assert merged_state.start_time == problem_state.start_time[3:]
+
+
+def test_hybrid_dispatch_pipelined(site):
+    solar_battery = {key: technologies[key] for key in ('pv', 'battery', 'grid')}
+    hybrid_plants = []
+    for pipeline in [False, True]:
+        hybrid_plant = HybridSimulation(solar_battery,
+                                        site,
+                                        dispatch_options={'is_test_start_year': True,
+                                                          'pipeline_dispatch': pipeline})
+        hybrid_plant.simulate(1)
+        hybrid_plants.append(hybrid_plant)
+
+    serial, pipelined = [plant.dispatch_builder for plant in hybrid_plants]
+    report = pipelined.pipeline_report()
+    assert report['hits'] + report['misses'] == 4
+    assert 0.0 <= report['hit_rate'] <= 1.0
+    assert serial.pipeline_report()['hits'] == 0
+
+    # metrics of speculative solves that missed are replaced by the re-solve, re-solved horizons start from the same
+    # plant state as in series
+    assert pipelined.problem_state.n_solves == 5
+    assert pipelined.problem_state.start_time == (0, 24, 48, 72, 96)
+    battery_gen = [np.array(plant.battery.Outputs.gen[:5 * 24]) for plant in hybrid_plants]
+    assert battery_gen[1].sum() == pytest.approx(battery_gen[0].sum(), rel=5e-2)
+
+
+def test_hybrid_dispatch_lp_relaxation(site):
+    solar_battery = {key: technologies[key] for key in ('pv', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(solar_battery,
+                                    site,
+                                    dispatch_options={'is_test_start_year': True,
+                                                      'lp_relaxation': True})
+    hybrid_plant.simulate(1)
+
+    builder = hybrid_plant.dispatch_builder
+    assert builder.relaxation.n_solves == 5
+    assert builder.problem_state.n_solves == 5
+    # relaxed objective bounds the repaired objective
+    assert all(gap >= -1e-6 for gap in builder.problem_state.gap)
+    assert sum(hybrid_plant.battery.Outputs.dispatch_P[:5 * 24] ** 2) > 0.0
+    battery_blocks = hybrid_plant.battery.dispatch.blocks
+    for t in battery_blocks.index_set():
+        assert battery_blocks[t].is_charging.domain is pyomo.Binary
+        assert not battery_blocks[t].is_charging.fixed
+
+    benchmark = builder.benchmark_relaxation([0, 24, 48])
+    assert len(benchmark['horizons']) == 3
+    assert -1e-6 <= benchmark['objective_gap'] <= 0.05
+    assert benchmark['speedup'] > 0.0
+
+
+def test_hybrid_dispatch_parallel_clustering(site):
+    solar_battery = {key: technologies[key] for key in ('pv', 'battery', 'grid')}
+    battery_gen = []
+    for n_processes in [1, 2]:
+        hybrid_plant = HybridSimulation(solar_battery,
+                                        site,
+                                        dispatch_options={'use_clustering': True,
+                                                          'n_clusters': 4,
+                                                          'clustering_n_processes': n_processes})
+        hybrid_plant.simulate(1)
+        battery_gen.append(np.array(hybrid_plant.battery.Outputs.gen))
+        assert len(hybrid_plant.dispatch_builder.problem_state.start_time) > 0
+
+    # waves of two processes see fewer solved neighbours than the serial simulation
+    assert battery_gen[1].sum() == pytest.approx(battery_gen[0].sum(), rel=5e-2)
+
+
+def test_hybrid_dispatch_segments(site):
+    solar_battery = {key: technologies[key] for key in ('pv', 'battery', 'grid')}
+    n_days = 10
+    builders = []
+    for n_segments in [1, 2]:
+        hybrid_plant = HybridSimulation(solar_battery,
+                                        site,
+                                        dispatch_options={'n_segments': n_segments})
+        hybrid_plant.pv.simulate(1)
+        hybrid_plant.dispatch_builder.dispatch.initialize_parameters()
+        builders.append(hybrid_plant.dispatch_builder)
+
+    # the first days of the year, in series and as two segments
+    serial, segmented = builders
+    assert segmented.get_segment_days() == [(0, 182), (182, 365)]
+    serial.simulate_with_dispatch(0, n_days)
+    segmented.simulate_segments_parallel(n_days)
+    assert segmented.segment_start_days == [0, 5]
+    assert len(segmented.problem_state.objective) == len(serial.problem_state.objective) == n_days
+
+    report = segmented.dispatch_deviation_report(serial)
+    assert abs(report['objective_deviation']) < 5e-2
+    assert abs(report['battery_energy_deviation']) < 5e-2
+
+
 def test_desired_schedule_dispatch():
 
     # Creating a contrived schedule
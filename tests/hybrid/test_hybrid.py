@@ -9,7 +9,8 @@ from hybrid.detailed_pv_plant import DetailedPVPlant
 from examples.Detailed_PV_Layout.detailed_pv_layout import DetailedPVParameters, DetailedPVLayout
 from examples.Detailed_PV_Layout.detailed_pv_config import PVLayoutConfig
 import PySAM.Singleowner as Singleowner
-from hybrid.grid import Grid
+from hybrid.grid import Grid, calc_schedule_deviation
+from hybrid.power_source import lifetime_series
 from hybrid.keys import set_nrel_key_dot_env
 from hybrid.layout.pv_design_utils import size_electrical_parameters
 from copy import deepcopy
@@ -710,6 +711,145 @@ def test_hybrid_tax_incentives(site):
     assert ptc_hybrid == approx(ptc_fed_amount * hybrid_plant.grid._financial_model.value('cf_energy_net')[1], rel=1e-3)
 
 
+def test_lifetime_series():
+    assert lifetime_series([1, 2], 3).tolist() == [1, 2, 1, 2, 1, 2]
+
+
+def test_calc_schedule_deviation():
+    generation_kw = [0, 500, 1500, 800]
+    schedule_kw = [100, 1000, 1000, 800]
+    delivered, missed_load, schedule_curtailed = calc_schedule_deviation(generation_kw, schedule_kw)
+    assert delivered.tolist() == [0, 500, 1000, 800]
+    assert missed_load.tolist() == [100, 500, 0, 0]
+    assert schedule_curtailed.tolist() == [0, 0, 500, 0]
+
+
+def test_power_source_values(site):
+    hybrid_plant = HybridSimulation({key: technologies[key] for key in ('pv', 'grid')}, site)
+    pv = hybrid_plant.pv
+    pv.values({'system_capacity': 4000, 'debt_percent': 20})
+    assert pv.values(['system_capacity', 'debt_percent']) == {'system_capacity': 4000, 'debt_percent': 20}
+
+    # values are set in the system and financial models, and read back from them
+    pv.value('debt_percent', 30)
+    assert pv.value('debt_percent') == 30
+    assert pv._financial_model.value('debt_percent') == 30
+    assert pv._system_model.value('system_capacity') == 4000
+
+    # values reach a replaced financial model
+    pv._financial_model = Singleowner.from_existing(pv._system_model, 'PVWattsSingleOwner')
+    pv.value('debt_percent', 25)
+    assert pv.value('debt_percent') == 25
+    assert pv._financial_model.value('debt_percent') == 25
+
+
+def test_hybrid_copy_and_restore(site):
+    wind_pv_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(wind_pv_battery,
+                                    site,
+                                    dispatch_options={'battery_dispatch': 'one_cycle_heuristic'})
+    hybrid_plant.ppa_price = (0.03, )
+    hybrid_plant.pv.dc_degradation = [0] * 25
+    state = hybrid_plant.snapshot()
+
+    clone = hybrid_plant.copy()
+    assert clone.site is hybrid_plant.site
+    assert clone.pv._system_model is not hybrid_plant.pv._system_model
+    assert clone.battery._dispatch is not hybrid_plant.battery._dispatch
+    assert clone.ppa_price == hybrid_plant.ppa_price
+
+    hybrid_plant.simulate()
+    npvs = hybrid_plant.net_present_values
+
+    # a different candidate changes the results, restoring the initial state reproduces them
+    hybrid_plant.pv.system_capacity_kw = pv_kw * 2
+    hybrid_plant.simulate()
+    assert hybrid_plant.net_present_values.pv != approx(npvs.pv, 1e-3)
+
+    builder = hybrid_plant.dispatch_builder
+    builder.pipeline_stats['hits'] = 3
+    problem_state = builder.problem_state
+    hybrid_plant.restore(state)
+    assert hybrid_plant.pv.system_capacity_kw == approx(pv_kw)
+    assert hybrid_plant.dispatch_builder is builder
+    assert builder.problem_state is not problem_state and builder.problem_state.n_solves == 0
+    assert builder.pipeline_stats['hits'] == 0
+    hybrid_plant.simulate()
+    assert hybrid_plant.net_present_values.hybrid == approx(npvs.hybrid, 1e-6)
+
+    clone.simulate()
+    assert clone.net_present_values.hybrid == approx(npvs.hybrid, 1e-6)
+
+
+def test_hybrid_simulate_incremental(site):
+    wind_pv_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(wind_pv_battery,
+                                    site,
+                                    dispatch_options={'battery_dispatch': 'one_cycle_heuristic'})
+    hybrid_plant.ppa_price = (0.03, )
+    hybrid_plant.pv.dc_degradation = [0] * 25
+    tracker = hybrid_plant.stage_tracker
+
+    assert tracker.stale_stages(hybrid_plant, 25, False) == tracker.stages
+    hybrid_plant.simulate(incremental=True)
+    assert tracker.stale_stages(hybrid_plant, 25, False) == ()
+
+    # a financial-only change only re-runs the financials
+    hybrid_plant.pv._financial_model.value('ppa_escalation', 2)
+    hybrid_plant.grid._financial_model.value('ppa_escalation', 2)
+    assert tracker.stale_stages(hybrid_plant, 25, False) == ('financials', )
+    hybrid_plant.simulate(incremental=True)
+
+    # a price change re-runs the dispatch and financials
+    hybrid_plant.ppa_price = (0.04, )
+    assert tracker.stale_stages(hybrid_plant, 25, False) == ('dispatch', 'financials')
+    hybrid_plant.simulate(incremental=True)
+    npvs = hybrid_plant.net_present_values
+
+    # a full simulation gives the same results
+    hybrid_plant.simulate()
+    assert tracker.stale_stages(hybrid_plant, 25, False) == tracker.stages
+    assert hybrid_plant.net_present_values.hybrid == approx(npvs.hybrid, 1e-6)
+
+    # a generation change re-runs all stages
+    hybrid_plant.simulate(incremental=True)
+    hybrid_plant.pv.system_capacity_kw = pv_kw * 2
+    assert tracker.stale_stages(hybrid_plant, 25, False) == tracker.stages
+
+
+def test_hybrid_simulate_batch(site):
+    wind_pv_battery = {key: technologies[key] for key in ('pv', 'wind', 'battery', 'grid')}
+    hybrid_plant = HybridSimulation(wind_pv_battery,
+                                    site,
+                                    dispatch_options={'battery_dispatch': 'one_cycle_heuristic'})
+    hybrid_plant.ppa_price = (0.03, )
+    hybrid_plant.pv.dc_degradation = [0] * 25
+
+    candidates = [(pv_kw, wind_kw, batt_kw, batt_kw * 4, interconnection_size_kw),
+                  {'pv_kw': pv_kw * 2, 'battery_kwh': batt_kw * 2},
+                  (pv_kw, wind_kw, batt_kw, batt_kw * 4, interconnection_size_kw)]
+    results = hybrid_plant.simulate_batch(candidates, n_processes=2)
+    assert len(results) == 3
+    assert list(results.columns[:5]) == list(HybridSimulation.batch_fields)
+    assert results['Hybrid Net Present Value ($-million)'][0] == results['Hybrid Net Present Value ($-million)'][2]
+    assert results['Pv AEP (GWh)'][1] == approx(2 * results['Pv AEP (GWh)'][0], 1e-3)
+    # the simulation is restored after the batch
+    assert hybrid_plant.pv.system_capacity_kw == approx(pv_kw)
+
+    # rescaled generation matches a simulation at the candidate size
+    hybrid_plant.pv.system_capacity_kw = pv_kw * 2
+    hybrid_plant.battery.system_capacity_kwh = batt_kw * 2
+    hybrid_plant.simulate()
+    assert results['Pv AEP (GWh)'][1] == approx(hybrid_plant.annual_energies.pv / 1e6, 1e-3)
+    assert results['Hybrid Net Present Value ($-million)'][1] == approx(hybrid_plant.net_present_values.hybrid / 1e6,
+                                                                        1e-3)
+
+    # candidates that keep the current size are simulated at that size, not the size of the previous candidate
+    profiles = hybrid_plant.simulate_generation_profiles([(pv_kw, None, None, None, None),
+                                                          (None, None, None, batt_kw * 2, None)])
+    assert sorted(size_kw for tech, size_kw in profiles.keys() if tech == 'pv') == approx([pv_kw, pv_kw * 2])
+
+
 def test_capacity_credit(site):
     site = SiteInfo(data=flatirons_site,
                     solar_resource_file=solar_resource_file,
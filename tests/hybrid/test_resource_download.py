@@ -3,7 +3,9 @@ from pytest import approx
 import os
 from pathlib import Path
 
+import shutil
 from hybrid.resource import SolarResource, WindResource
+from hybrid.resource import resource_store
 from hybrid.keys import set_nrel_key_dot_env
 
 import PySAM.Windpower as wp
@@ -88,3 +90,43 @@ def test_from_file():
     solarfile = Path(__file__).parent.parent.parent / "resource_files" / "solar" / "35.2018863_-101.945027_psmv3_60_2012.csv"
     solar_resource = SolarResource(lat=lat, lon=lon, year=year, filepath=solarfile)
     assert(len(solar_resource.data['gh']) > 0)
+
+
+def test_resource_store(tmp_path, monkeypatch):
+    solarfile = Path(__file__).parent.parent.parent / "resource_files" / "solar" / "35.2018863_-101.945027_psmv3_60_2012.csv"
+    filename = tmp_path / solarfile.name
+    shutil.copy(solarfile, filename)
+
+    # sidecars are only written once enabled
+    resource_store.clear()
+    resource_store.load_solar_table(filename)
+    assert not os.path.isfile(resource_store.sidecar_path(str(filename), 'solar'))
+
+    monkeypatch.setattr(resource_store, 'sidecar_enabled', True)
+    resource_store.clear()
+    data = SolarResource(lat=lat, lon=lon, year=year, filepath=filename).data
+    assert os.path.isfile(resource_store.sidecar_path(str(filename), 'solar'))
+    assert data['tdew'][:3] == [-6.0, -7.0, -7.0]
+
+    # served from sidecar in a new process
+    resource_store.clear()
+    table = resource_store.load_solar_table(filename)
+    assert table.to_sam_dict() == data
+    assert table.to_dataframe()['GHI'].sum() == approx(sum(data['gh']))
+
+    # stale sidecar is not used once the file changes
+    with open(filename, 'a') as f:
+        f.write("2012,12,31,23,30,0,0,0,1.0,-2,160,900,-7\n")
+    assert len(resource_store.load_solar_table(filename).to_sam_dict()['gh']) == len(data['gh']) + 1
+
+    # partially written or empty sidecars are parsed again and replaced
+    sidecar = resource_store.sidecar_path(str(filename), 'solar')
+    with open(sidecar, 'rb') as f:
+        partial_contents = f.read()[:100]
+    for contents in (b'', partial_contents):
+        with open(sidecar, 'wb') as f:
+            f.write(contents)
+        resource_store.clear()
+        assert resource_store.load_solar_table(filename).to_sam_dict()['gh'][:3] == data['gh'][:3]
+    # no temporary files are left next to the sidecar
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([filename.name, Path(sidecar).name])
@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+
+from tools.optimization import DataRecorder
+from tools.optimization.optimization_driver import OptimizationDriver
+from tools.optimization.optimization_problem import OptimizationProblem
+
+
+class QuadraticProblem(OptimizationProblem):
+    """Cheap objective with uneven evaluation times"""
+    def __init__(self):
+        super().__init__()
+        for name in ('x', 'y'):
+            self.candidate_dict[name] = {"min": -1.0, "max": 1.0, "prior": {"mu": 0.5, "sigma": 0.5}}
+
+    def _set_simulation_to_candidate(self, candidate: np.ndarray):
+        return 0.0, candidate
+
+    def objective(self, candidate: np.ndarray):
+        conforming_candidate, penalty = self.conform_candidate_and_get_penalty(candidate)
+        time.sleep(0.002 + 0.02 * (abs(float(candidate[0])) % 1.0))
+        evaluation = -float(np.sum(conforming_candidate ** 2))
+        return evaluation - penalty, evaluation, conforming_candidate
+
+
+def test_async_driver():
+    generation_size = 6
+    recorder = DataRecorder()
+    driver = OptimizationDriver(QuadraticProblem(), 'CEM', recorder, nprocs=2, asynchronous=True,
+                                generation_size=generation_size, selection_proportion=0.5, prior_scale=1.0)
+
+    told = []
+    tell = driver._optimizer.tell
+
+    def record_tell(evaluations):
+        told.append(len(evaluations))
+        tell(evaluations)
+
+    driver._optimizer.tell = record_tell
+    for _ in range(4):
+        driver.step()
+
+    # workers are not held at generation barriers, but the optimizer is told full generations
+    assert told == [generation_size] * 4
+    assert driver.num_iterations() == 4
+    assert driver.num_evaluations() >= 4 * generation_size
+    best_score, best_evaluation, best_solution = driver.best_solution()
+    assert best_score <= 0.0
+
+    utilization = recorder.get_column('worker_utilization')
+    assert len(utilization) == 4
+    assert all(0 < len(by_worker) <= 2 for by_worker in utilization)
+    assert all(0.0 < value <= 1.0 for value in utilization[-1].values())
+    assert 0.0 < driver._driver.get_utilization() <= 1.0
+
+    # closing terminates the worker pool, discarding pending evaluations
+    processes = list(driver._driver._pool._pool)
+    driver.close()
+    assert driver._driver._pool is None
+    assert not any(process.is_alive() for process in processes)
@@ -0,0 +1,161 @@
+import queue
+import time
+from multiprocessing import Pool, cpu_count
+from typing import (
+    Callable,
+    Optional,
+    Tuple,
+    )
+
+from ..data_logging.data_recorder import DataRecorder
+from ..driver.ask_tell_driver import AskTellDriver
+from ..optimizer.ask_tell_optimizer import AskTellOptimizer
+from .ask_tell_parallel_driver_fns import *
+
+
+class AskTellAsyncDriver(AskTellDriver):
+    """
+    Steady-state parallel driver without generation barriers. Candidates are submitted to the pool individually and a
+    new candidate is submitted as soon as a worker finishes, so workers do not wait for the slowest candidate of a
+    generation.
+
+    Evaluations are buffered as they arrive and told to the optimizer in batches of tell_size (by default the
+    optimizer's number of candidates, i.e. one generation), so generational optimizers (CEM, GA, CMA-ES) are used
+    unchanged. Candidates submitted while a batch completes are sampled before the optimizer is updated and are told
+    with the next batch; asked candidates that were not submitted yet are discarded when the optimizer is updated.
+    """
+    
+    def __init__(self,
+                 nprocs: int = cpu_count(),
+                 tell_size: Optional[int] = None):
+        """
+        :param nprocs: number of worker processes
+        :param tell_size: number of evaluations per call to optimizer.tell(), or None to use the optimizer's number of
+            candidates
+        """
+        self._num_evaluations: int = 0
+        self._num_iterations: int = 0
+        self._nprocs = nprocs if nprocs else cpu_count()
+        self._tell_size = tell_size
+        self._pool = None
+        self._recorder = None
+        
+        self._num_pending: int = 0
+        self._candidates: [any] = []  # asked candidates that are not submitted yet
+        self._results = queue.Queue()  # results of evaluations, put by the pool's result handler thread
+        self._evaluations: [Tuple[float, float, any]] = []  # evaluations that are not told yet
+        self._busy_time: {int: float} = {}  # process id: total evaluation time [s]
+        self._start_time: Optional[float] = None
+    
+    def __getstate__(self):
+        """
+        This prevents the pool and the result queue from being pickled
+        """
+        self_dict = self.__dict__.copy()
+        for name in ('_pool', '_results'):
+            self_dict.pop(name, None)
+        return self_dict
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool = None
+        self._results = queue.Queue()
+    
+    def __del__(self):
+        # noinspection PyBroadException
+        try:
+            self.close()
+        except:
+            pass
+    
+    def setup(
+            self,
+            objective: Callable[[any], Tuple[float, float, any]],
+            recorder: DataRecorder,
+            ) -> None:
+        """
+        Must be called before calling step() or run().
+        Sets the objective function for this driver and the data recorder.
+        :param objective: objective function for evaluating candidate solutions
+        :param recorder: data recorder
+        :return:
+        """
+        self._pool = Pool(
+            initializer=make_initializer(objective),
+            processes=self._nprocs)
+        self._recorder = recorder
+        self._recorder.add_columns('worker_utilization')
+        self._start_time = time.time()
+    
+    def step(self,
+             optimizer: AskTellOptimizer,
+             ) -> bool:
+        """
+        Evaluates candidates until tell_size evaluations are available, then updates the optimizer with them. Workers
+        are kept busy with new candidates between calls.
+        :param optimizer: the optimizer to use
+        :return: True if the optimizer reached a stopping point (via calling optimizer.stop())
+        """
+        tell_size = self._tell_size or optimizer.get_num_candidates() or self._nprocs
+        while len(self._evaluations) < tell_size:
+            self._submit(optimizer)
+            result = self._results.get()
+            self._num_pending -= 1
+            if isinstance(result, BaseException):
+                raise result
+            pid, start, end, evaluation = result
+            self._busy_time[pid] = self._busy_time.get(pid, 0.0) + end - start
+            self._evaluations.append(evaluation)
+            self._num_evaluations += 1
+        
+        evaluations = self._evaluations[:tell_size]
+        del self._evaluations[:tell_size]
+        self._candidates.clear()
+        optimizer.tell(evaluations)
+        self._recorder.accumulate(self.get_worker_utilization())
+        self._num_iterations += 1
+        
+        # keep the workers busy while the iteration is recorded
+        self._submit(optimizer)
+        return optimizer.stop()
+    
+    def _submit(self, optimizer: AskTellOptimizer) -> None:
+        """
+        Submits candidates until every worker has a pending evaluation
+        """
+        while self._num_pending < self._nprocs:
+            if len(self._candidates) == 0:
+                self._candidates.extend(optimizer.ask(optimizer.get_candidate_block_size()))
+            self._pool.apply_async(evaluate_timed, (self._candidates.pop(0),),
+                                   callback=self._results.put,
+                                   error_callback=self._results.put)
+            self._num_pending += 1
+    
+    def close(self) -> None:
+        """
+        Terminates the pool, discarding pending evaluations
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._num_pending = 0
+    
+    def get_num_evaluations(self) -> int:
+        return self._num_evaluations
+    
+    def get_num_iterations(self) -> int:
+        return self._num_iterations
+    
+    def get_worker_utilization(self) -> {int: float}:
+        """
+        :return: fraction of the time since setup() each worker process spent evaluating candidates, by process id
+        """
+        elapsed = time.time() - self._start_time
+        return {pid: busy_time / elapsed for pid, busy_time in self._busy_time.items()}
+    
+    def get_utilization(self) -> float:
+        """
+        :return: fraction of the available worker time since setup() spent evaluating candidates
+        """
+        return sum(self._busy_time.values()) / ((time.time() - self._start_time) * self._nprocs)
@@ -54,6 +54,12 @@ class AskTellDriver:
             i += 1
         return i
     
+    def close(self) -> None:
+        """
+        Releases resources used for evaluations, e.g. worker processes
+        """
+        pass
+    
     @abstractmethod
     def get_num_evaluations(self) -> int:
         pass
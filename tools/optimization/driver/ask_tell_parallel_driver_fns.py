@@ -1,3 +1,5 @@
+import os
+import time
 from functools import partial
 
 """
@@ -29,6 +31,17 @@ def evaluate(candidate):
     global __objective
     return __objective(candidate)
 
+
+def evaluate_timed(candidate):
+    """
+    Evaluates the given candidate
+    :return: tuple of (process id, evaluation start time, evaluation end time, evaluation)
+    """
+    global __objective
+    start = time.time()
+    evaluation = __objective(candidate)
+    return os.getpid(), start, time.time(), evaluation
+
 # def flatten_list(nested_list: [[any]]) -> [any]:
 #     result = []
 #     for sublist in nested_list:
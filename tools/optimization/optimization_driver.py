@@ -8,6 +8,7 @@ from .data_logging.data_recorder import DataRecorder
 from .data_logging.null_data_recorder import NullDataRecorder
 
 from .optimization_problem import OptimizationProblem
+from .driver.ask_tell_async_driver import AskTellAsyncDriver
 from .driver.ask_tell_parallel_driver import AskTellDriver, AskTellParallelDriver
 from .driver.ask_tell_serial_driver import AskTellSerialDriver
 from .optimizer.CEM_optimizer import CEMOptimizer
@@ -106,6 +107,7 @@ class ConvertingOptimizationDriver:
         return score, evaluation, self._conformer(solution)[0]
 
     def close(self) -> None:
+        self._driver.close()
         self.recorder.close()
 
 
@@ -120,8 +122,13 @@ class OptimizationDriver(ConvertingOptimizationDriver):
                  method: str,
                  recorder: DataRecorder,
                  nprocs: Optional[int] = None,
+                 asynchronous: bool = False,
                  **kwargs
                  ) -> None:
+        """
+        :param asynchronous: if True and nprocs > 1, candidates are evaluated without waiting for the rest of their
+            generation (see AskTellAsyncDriver)
+        """
         self.problem: OptimizationProblem = problem
 
         optimizer: AskTellOptimizer
@@ -139,7 +146,12 @@ class OptimizationDriver(ConvertingOptimizationDriver):
         else:
             raise ValueError('Unknown optimizer: "' + method + '"')
 
-        driver = AskTellSerialDriver() if nprocs == 1 else AskTellParallelDriver(nprocs)
+        if nprocs == 1:
+            driver = AskTellSerialDriver()
+        elif asynchronous:
+            driver = AskTellAsyncDriver(nprocs)
+        else:
+            driver = AskTellParallelDriver(nprocs)
         super().__init__(
             driver,
             optimizer,